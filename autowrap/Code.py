@@ -2,7 +2,7 @@
 
 from __future__ import print_function
 from __future__ import annotations
-from typing import Union, List
+from typing import Iterator, Union, List
 
 __license__ = """
 
@@ -36,6 +36,67 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import string
 import re
+import time
+
+# Cache of preprocessed templates used by Code.add, see _compile_template
+_template_cache = dict()
+_TEMPLATE_CACHE_SIZE = 4096
+
+# accumulated over all Code.add calls with a template
+template_stats = dict(seconds=0.0, hits=0, misses=0, fallbacks=0)
+
+
+def _compile_template(what):
+    """Preprocesses a template for Code.add
+
+    Code.add substitutes the template first and then trims the first line,
+    joins lines continued with "+" and splits the lines at "|". Here the same
+    is done on the template itself, with the placeholders replaced by tokens
+    which can not take part in these steps. Each resulting line is stored as
+    a list of literal strings and placeholder names.
+
+    This gives the same result as long as the substituted values do not
+    contain newlines. For placeholders which are only preceded by blanks on
+    their line, the value must also start with something else than a blank,
+    "|" or "+". Values which do not meet this are handled by the slow path.
+
+    Returns (lines, names, names at line start) or None if the template is
+    invalid.
+    """
+    names = []
+    line_start_names = set()
+
+    def replace(m):
+        if m.group("escaped") is not None:
+            return "\x00$\x00"
+        name = m.group("named") or m.group("braced")
+        if name is None:
+            raise ValueError("invalid placeholder")
+        line = what[what.rfind("\n", 0, m.start()) + 1 : m.start()]
+        if not line.strip(" "):
+            line_start_names.add(name)
+        names.append(name)
+        return "\x00%d\x00" % (len(names) - 1)
+
+    try:
+        res = string.Template.pattern.sub(replace, what)
+    except ValueError:
+        return None
+    res = re.sub(r"^[ ]*\n[ ]*\|", "", res)  # ltrim first line
+    res = re.sub(r"\n+ *\+", "", res)
+    lines = []
+    for line in re.split(r"\n *\|", res):
+        pieces = []
+        for i, piece in enumerate(line.split("\x00")):
+            if i % 2 == 0:
+                pieces.append(piece)
+            elif piece == "$":
+                pieces.append("$")
+            else:
+                # odd pieces are names, marked by a tuple
+                pieces.append((names[int(piece)],))
+        lines.append(pieces)
+    return lines, set(names), line_start_names
 
 
 class Code(object):
@@ -59,32 +120,85 @@ class Code(object):
             kw.update(a[0])
         if "self" in kw:
             del kw["self"]  # self causes problems in substitute call below
-        if isinstance(what, (str, bytes)):
-            try:
-                res = string.Template(what).substitute(**kw)
-            except ValueError:
-                print(what)
-                print(kw)
-                raise
-            res = re.sub(r"^[ ]*\n[ ]*\|", "", res)  # ltrim first line
-            res = re.sub(r"\n+ *\+", "", res)
-            for line in re.split(r"\n *\|", res):
-                self.content.append(line.rstrip())
+        if isinstance(what, str):
+            start = time.perf_counter()
+            self._add_template(what, kw)
+            template_stats["seconds"] += time.perf_counter() - start
+        elif isinstance(what, bytes):
+            self._add_template_uncached(what, kw)
         else:  # TODO do we really want to allow adding "ANYTHING" e.g. even None?
             self.content.append(what)
         return self
 
-    def _render(self, _indent="") -> List[str]:
-        result = []
-        for content in self.content:
-            if isinstance(content, (str, bytes)):
-                result.append(_indent + content)
+    def _add_template(self, what: str, kw: dict) -> None:
+        try:
+            compiled = _template_cache[what]
+            template_stats["hits"] += 1
+        except KeyError:
+            template_stats["misses"] += 1
+            compiled = _compile_template(what)
+            if len(_template_cache) >= _TEMPLATE_CACHE_SIZE:
+                _template_cache.clear()
+            _template_cache[what] = compiled
+        if compiled is not None:
+            lines, names, line_start_names = compiled
+            try:
+                values = dict((name, str(kw[name])) for name in names)
+            except KeyError:
+                values = None
+            if values is not None and not any("\n" in v for v in values.values()):
+                if all(
+                    values[name].lstrip(" ")[:1] not in ("", "|", "+") for name in line_start_names
+                ):
+                    for pieces in lines:
+                        line = "".join(p if p.__class__ is str else values[p[0]] for p in pieces)
+                        self.content.append(line.rstrip())
+                    return
+        template_stats["fallbacks"] += 1
+        self._add_template_uncached(what, kw)
+
+    def _add_template_uncached(self, what: Union[str, bytes], kw: dict) -> None:
+        try:
+            res = string.Template(what).substitute(**kw)
+        except ValueError:
+            print(what)
+            print(kw)
+            raise
+        res = re.sub(r"^[ ]*\n[ ]*\|", "", res)  # ltrim first line
+        res = re.sub(r"\n+ *\+", "", res)
+        for line in re.split(r"\n *\|", res):
+            self.content.append(line.rstrip())
+
+    def iter_lines(self, indent=0) -> Iterator[str]:
+        """Yields the indented lines of the code one by one
+
+        Nested Code objects are walked with an explicit stack, so no
+        intermediate lists are built for the nesting levels.
+        """
+        stack = [(iter(self.content), " " * indent)]
+        while stack:
+            contents, _indent = stack[-1]
+            for content in contents:
+                if isinstance(content, (str, bytes)):
+                    yield _indent + content
+                else:
+                    stack.append((iter(content.content), _indent + " " * 4))
+                    break
             else:
-                newindent = _indent + " " * 4
-                for line in content._render(_indent=newindent):
-                    result.append(line)
-        return result
+                stack.pop()
+
+    def _render(self, _indent="") -> List[str]:
+        return list(self.iter_lines(len(_indent)))
 
     def render(self, indent=0) -> str:
-        i = " " * indent
-        return "\n".join(self._render(_indent=i))
+        return "\n".join(self.iter_lines(indent))
+
+    def write_to(self, fp, indent=0) -> None:
+        """Writes the same text as render() to the file object fp, line by
+        line, without building the complete string in memory."""
+        first = True
+        for line in self.iter_lines(indent):
+            if not first:
+                fp.write("\n")
+            fp.write(line)
+            first = False
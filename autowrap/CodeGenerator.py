@@ -34,9 +34,12 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 from contextlib import contextmanager
+import hashlib
+import io
 import os.path
 import sys
 import re
+import time
 from collections import defaultdict
 from typing import (
     TypeVar,
@@ -49,11 +52,19 @@ from typing import (
     AnyStr,
     List,
     Optional,
+    Any,
+    Set,
 )
 
 import Cython.Compiler.Version
 
-from autowrap.ConversionProvider import setup_converter_registry, ConverterRegistry
+from autowrap.ConversionProvider import (
+    setup_converter_registry,
+    ConverterRegistry,
+    StdVectorAsNumpyConverter,
+    StdVectorAsViewConverter,
+    EnumConverter,
+)
 from autowrap.DeclResolver import (
     ResolvedClass,
     ResolvedEnum,
@@ -72,7 +83,8 @@ ResolvedDecl = TypeVar(
 )
 from autowrap.Types import CppType  # , printable
 from autowrap.version import version as autowrap_version
-from autowrap.Code import Code
+from autowrap.Code import Code, template_stats
+import autowrap.Utils as Utils
 
 CodeDict = Dict[AnyStr, Code]
 
@@ -80,6 +92,22 @@ import logging as L
 
 special_class_doc = ""
 
+# numpy dtype -> (C type, ArrayWrapper class) for the "<name>_batch" variants
+# of methods annotated with wrap-batch, the C types are cimported by the
+# inlined ArrayWrappers.pyx
+BATCH_TYPES = {
+    "float32": ("float", "ArrayWrapperFloat"),
+    "float64": ("double", "ArrayWrapperDouble"),
+    "int8": ("int8_t", "ArrayWrapperInt8"),
+    "int16": ("int16_t", "ArrayWrapperInt16"),
+    "int32": ("int32_t", "ArrayWrapperInt32"),
+    "int64": ("int64_t", "ArrayWrapperInt64"),
+    "uint8": ("uint8_t", "ArrayWrapperUInt8"),
+    "uint16": ("uint16_t", "ArrayWrapperUInt16"),
+    "uint32": ("uint32_t", "ArrayWrapperUInt32"),
+    "uint64": ("uint64_t", "ArrayWrapperUInt64"),
+}
+
 
 def namespace_handler(ns):
     return ns
@@ -103,6 +131,107 @@ def fixed_include_dirs() -> List[AnyStr]:
     return [data, autowrap_internal]
 
 
+def _attach_targets(resolved: ResolvedDecl) -> List[str]:
+    targets = resolved.cpp_decl.annotations.get("wrap-attach", [])
+    # line annotations (free functions) give a single string
+    if isinstance(targets, str):
+        targets = [targets]
+    return list(targets)
+
+
+def split_into_shards(
+    resolved: List[ResolvedDecl], num_shards: int, module_name: str
+) -> Dict[str, Dict[str, Any]]:
+    """Distributes the resolved decls of one module over num_shards modules
+
+    Returns a dict in the format expected by the all_decl argument of
+    CodeGenerator, mapping "<module_name>_<i>" to the decls of shard i.
+
+    Declarations connected by wrap-attach are always put into the same shard,
+    as attaching only works within one module. The resulting groups are
+    assigned greedily to the shard with the fewest methods so far, which keeps
+    the size of the generated translation units balanced. Typedefs are only
+    listed for the first shard, the code generator of each shard still needs
+    them in its own list of decls.
+    """
+    assert num_shards >= 1, "need at least one shard"
+
+    # union-find over decl names, joined by wrap-attach
+    parent: Dict[str, str] = dict()
+
+    def find(name):
+        parent.setdefault(name, name)
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    def key(d):
+        return d.__class__.__name__ + ":" + d.name
+
+    by_class_name = dict((d.name, key(d)) for d in resolved if isinstance(d, ResolvedClass))
+    decls = [d for d in resolved if not isinstance(d, ResolvedTypeDef)]
+    for d in decls:
+        find(key(d))
+        for target in _attach_targets(d):
+            if target in by_class_name:
+                parent[find(key(d))] = find(by_class_name[target])
+
+    groups: Dict[str, List[ResolvedDecl]] = defaultdict(list)
+    for d in decls:
+        groups[find(key(d))].append(d)
+
+    def weight(group):
+        return sum(
+            len(d.get_flattened_methods()) + 1 if isinstance(d, ResolvedClass) else 1
+            for d in group
+        )
+
+    # heaviest groups first, name as tie breaker to get a stable result
+    ordered = sorted(groups.values(), key=lambda g: (-weight(g), min(key(d) for d in g)))
+    names = ["%s_%d" % (module_name, i) for i in range(num_shards)]
+    shards: Dict[str, Dict[str, Any]] = dict(
+        (name, {"decls": [], "addons": [], "files": []}) for name in names
+    )
+    loads = [0] * num_shards
+    for group in ordered:
+        i = loads.index(min(loads))
+        loads[i] += weight(group)
+        shards[names[i]]["decls"].extend(group)
+
+    shards[names[0]]["decls"].extend(d for d in resolved if isinstance(d, ResolvedTypeDef))
+    for shard in shards.values():
+        shard["files"] = sorted(set(d.cpp_decl.pxd_path for d in shard["decls"]))
+    return shards
+
+
+def create_shard_init_code(shards: Dict[str, Dict[str, Any]]) -> str:
+    """Creates an __init__.py which re-exports the public names of all shards"""
+    code = Code()
+    for modname in sorted(shards):
+        exported = []
+        for d in shards[modname]["decls"]:
+            if d.wrap_ignore or _attach_targets(d):
+                continue
+            if isinstance(d, (ResolvedClass, ResolvedEnum, ResolvedFunction)):
+                exported.append(d.name)
+        for name in sorted(set(exported)):
+            code.add("from .$modname import $name", locals())
+    return code.render() + "\n"
+
+
+class _DigestWriter(object):
+    """File object wrapper which feeds everything written into a hash"""
+
+    def __init__(self, fp, digest):
+        self.fp = fp
+        self.digest = digest
+
+    def write(self, text):
+        self.digest.update(text.encode("utf-8"))
+        return self.fp.write(text)
+
+
 class CodeGenerator(object):
     """
     This is the main Code Generator.
@@ -146,6 +275,17 @@ class CodeGenerator(object):
     class_pxd_codes: Dict[AnyStr, Code]
     top_level_typestub_code: List[Code]
     typestub_codes: Dict[AnyStr, Code]
+    write_only_changed: bool
+    written_files: List[AnyStr]
+    unchanged_files: List[AnyStr]
+    class_digests: Dict[AnyStr, str]
+    profile: Dict[str, float]
+    overload_dispatch: str
+    overload_cache_size: int
+    typed_signatures: bool
+    nogil_default: bool
+    scoped_enum_type: str
+    _dispatch_tables: Set[str]
     wrapped_enums_cnt: int
     wrapped_classes_cnt: int
     wrapped_methods_cnt: int
@@ -240,6 +380,32 @@ class CodeGenerator(object):
         self.class_pxd_codes: Dict[AnyStr, Code] = defaultdict(lambda: Code())
         self.top_level_typestub_code: List[Code] = []
         self.typestub_codes: Dict[AnyStr, Code] = defaultdict(lambda: Code())
+        # If true, output files whose content did not change are not touched,
+        # so that their mtime stays the same and build tools do not recompile
+        self.write_only_changed: bool = False
+        self.written_files: List[AnyStr] = []
+        self.unchanged_files: List[AnyStr] = []
+        # sha256 over the generated pyx, pxd and pyi code of each class / enum
+        self.class_digests: Dict[AnyStr, str] = dict()
+        # seconds spent in the steps of the last create_pyx_file call
+        self.profile: Dict[str, float] = dict()
+        # "table": switch on the number of arguments and look up the overload
+        # by the exact argument types, "chain": check the overloads one after
+        # the other
+        self.overload_dispatch: str = "table"
+        # argument type combinations cached per overloaded method with "table"
+        self.overload_cache_size: int = 256
+        # declare typed arguments (e.g. "Foo x not None") instead of asserting
+        # their types where Cython can check them
+        self.typed_signatures: bool = False
+        # release the GIL in the wrappers of all methods and functions which
+        # are declared nogil, not only in those annotated wrap-with-no-gil
+        self.nogil_default: bool = False
+        # "IntEnum": wrap scoped enums as enum.IntEnum classes, "cdef": as
+        # classes derived from the extension type _ScopedEnum, whose members
+        # are created once and looked up in a table by their value
+        self.scoped_enum_type: str = "IntEnum"
+        self._dispatch_tables: Set[str] = set()
         self.wrapped_enums_cnt: int = 0
         self.wrapped_classes_cnt: int = 0
         self.wrapped_methods_cnt: int = 0
@@ -274,13 +440,22 @@ class CodeGenerator(object):
         It calls create_wrapper_for_class, create_wrapper_for_enum and
         create_wrapper_for_free_function respectively to create the code for
         all classes, enums and free functions.
+
+        The time spent in the different steps is recorded in self.profile.
         """
+        profile_start = time.perf_counter()
+        template_seconds = template_stats["seconds"]
+        self.profile = dict()
+
         self.setup_cimport_paths()
         self.create_cimports()
         self.create_foreign_cimports()
         self.create_foreign_enum_imports()
         self.create_scoped_enum_helpers()
+        self.create_enum_lookups()
+        self.create_scoped_enum_base()
         self.create_includes()
+        self.create_vector_views()
 
         def create_for(
             clazz: Type[ResolvedDecl],
@@ -293,15 +468,23 @@ class CodeGenerator(object):
                 if isinstance(resolved, clazz):
                     method(resolved, codez)
 
+        self._profile_step("imports", profile_start)
+
         # first wrap classes, so that self.class_codes[..] is initialized
         # for attaching enums or static functions
+        start = time.perf_counter()
         create_for(ResolvedClass, self.create_wrapper_for_class, self.class_codes)
+        self._profile_step("classes", start)
+        start = time.perf_counter()
         create_for(
             ResolvedEnum,
             self.create_wrapper_for_enum,
             (self.enum_codes, self.typestub_codes),
         )
+        self._profile_step("enums", start)
+        start = time.perf_counter()
         create_for(ResolvedFunction, self.create_wrapper_for_free_function, self.class_codes)
+        self._profile_step("functions", start)
 
         # resolve extra
         for clz, codes in self.class_codes_extra.items():
@@ -314,66 +497,124 @@ class CodeGenerator(object):
             for c in codes:
                 self.class_codes[clz].add(c)
 
-        # Create code for the pyx file
-        if self.write_pxd:
-            pyx_code = self.create_default_cimports().render()
-            pyx_code += "\n".join(ci.render() for ci in self.top_level_pyx_code)
-        else:
-            pyx_code = "\n".join(ci.render() for ci in self.top_level_code)
-            pyx_code += "\n".join(ci.render() for ci in self.top_level_pyx_code)
-
-        pyx_code += " \n"
-        names = set()
-        # Write enum codes first, since for scoped enums, this contains python classes
-        # that need to be present before usage.
-        for n, c in self.enum_codes.items():
-            pyx_code += c.render()
-            pyx_code += " \n"
-            names.add(n)
-        for n, c in self.class_codes.items():
-            pyx_code += c.render()
-            pyx_code += " \n"
-            names.add(n)
-
-        # manual code which does not extend wrapped classes:
-        for name, c in self.manual_code.items():
-            if name not in names:
-                pyx_code += c.render()
-            pyx_code += " \n"
-
-        # Create code for the pxd file
-        pxd_code = "\n".join(ci.render() for ci in self.top_level_code)
-        pxd_code += " \n"
-        for n, c in self.class_pxd_codes.items():
-            pxd_code += c.render()
-            pxd_code += " \n"
-
-        pyi_code = "from __future__ import annotations\n"
-        pyi_code += "from typing import overload, Any, List, Dict, Tuple, Set, Sequence, Union\n\n"
-        pyi_code += "from enum import IntEnum as _PyEnum\n\n"
-        pyi_code += "\n".join(ci.render() for ci in self.top_level_typestub_code)
-        pyi_code += "\n\n"
-        for n, c in self.typestub_codes.items():
-            pyi_code += c.render()
-            pyi_code += " \n\n"
-
-        with open(self.target_pyi_path, "w") as fp:
-            fp.write(pyi_code)
+        # The code is streamed into the files, while the digests of the code
+        # for each class / enum are computed on the way
+        start = time.perf_counter()
+        part_digests = defaultdict(dict)
+
+        def write_parts(fp, codes, kind, separator):
+            for n, c in codes.items():
+                digest = hashlib.sha256()
+                c.write_to(_DigestWriter(fp, digest))
+                fp.write(separator)
+                part_digests[n][kind] = digest.hexdigest()
+
+        def write_joined(fp, codes):
+            for i, c in enumerate(codes):
+                if i:
+                    fp.write("\n")
+                c.write_to(fp)
+
+        with self._output_file(self.target_pyi_path) as fp:
+            fp.write("from __future__ import annotations\n")
+            fp.write(
+                "from typing import overload, Any, List, Dict, Mapping, Tuple, Set, Sequence, Union\n\n"
+            )
+            fp.write("from enum import IntEnum as _PyEnum\n\n")
+            write_joined(fp, self.top_level_typestub_code)
+            fp.write("\n\n")
+            write_parts(fp, self.typestub_codes, "pyi", " \n\n")
+
+        with self._output_file(self.target_path) as fp:
+            if self.write_pxd:
+                self.create_default_cimports().write_to(fp)
+            else:
+                write_joined(fp, self.top_level_code)
+            write_joined(fp, self.top_level_pyx_code)
+            fp.write(" \n")
+            # Write enum codes first, since for scoped enums, this contains python classes
+            # that need to be present before usage.
+            write_parts(fp, self.enum_codes, "pyx", " \n")
+            write_parts(fp, self.class_codes, "pyx", " \n")
+            names = set(self.enum_codes) | set(self.class_codes)
+
+            # manual code which does not extend wrapped classes:
+            for name, c in self.manual_code.items():
+                if name not in names:
+                    c.write_to(fp)
+                fp.write(" \n")
+
+        # The pxd code is only written if we use pxd headers
+        with self._output_file(self.target_pxd_path, skip=not self.write_pxd) as fp:
+            write_joined(fp, self.top_level_code)
+            fp.write(" \n")
+            write_parts(fp, self.class_pxd_codes, "pxd", " \n")
+
+        self.class_digests = dict()
+        for n, parts in part_digests.items():
+            if "pyx" not in parts:
+                continue
+            digest = hashlib.sha256()
+            for kind in ("pyx", "pxd", "pyi"):
+                digest.update(parts.get(kind, "").encode("utf-8"))
+                digest.update(b"\0")
+            self.class_digests[n] = digest.hexdigest()
+
+        self._profile_step("writing", start)
 
         if debug:
             if self.write_pxd:
                 print("PXD:")
-            else:
-                print("PXD (will not be written):")
-            print(pxd_code)
+                with open(self.target_pxd_path) as fp:
+                    print(fp.read())
             print("PYX:")
-            print(pyx_code)
-        with open(self.target_path, "w") as fp:
-            fp.write(pyx_code)
+            with open(self.target_path) as fp:
+                print(fp.read())
 
-        if self.write_pxd:
-            with open(self.target_pxd_path, "w") as fp:
-                fp.write(pxd_code)
+        self.profile["template processing"] = (
+            template_stats["seconds"] - template_seconds
+        )
+        self._profile_step("total", profile_start)
+        L.info(
+            "converter lookup cache: %d hits, %d misses"
+            % (self.cr.cache_hits, self.cr.cache_misses)
+        )
+        L.info(
+            "profile: "
+            + ", ".join("%s %.3fs" % (step, t) for step, t in self.profile.items())
+        )
+
+    def _profile_step(self, step: str, start: float) -> None:
+        self.profile[step] = time.perf_counter() - start
+
+    @contextmanager
+    def _output_file(self, path: AnyStr, skip: bool = False):
+        """Context manager yielding a file object to stream the content of
+        path into, see Utils.output_file for write_only_changed. With skip
+        set, the content is discarded.
+        """
+        if skip:
+            yield io.StringIO()
+            return
+        with Utils.output_file(
+            path, self.write_only_changed, self.written_files, self.unchanged_files
+        ) as fp:
+            yield fp
+
+    def write_class_digests(self, path: AnyStr) -> bool:
+        """Writes the per class digests of the last create_pyx_file call as JSON
+
+        Build systems can compare this file against an earlier version to find
+        out which wrapped classes actually changed. Returns False if the file
+        was already up to date (with write_only_changed set).
+        """
+        import json
+
+        written = len(self.written_files)
+        with self._output_file(path) as fp:
+            json.dump(self.class_digests, fp, indent=1, sort_keys=True)
+            fp.write("\n")
+        return len(self.written_files) > written
 
     def filterout_iterators(self, methods):
         def parse(anno):
@@ -447,6 +688,20 @@ class CodeGenerator(object):
         enum_pxd_code = Code()
 
         if not decl.scoped:
+            # name <-> value tables for getMapping, fromName and toName, built
+            # once at import
+            to_name = dict((v, k) for (k, v) in decl.items)
+            from_name = dict(decl.items)
+            code.add(
+                """
+                       |
+                       |cdef object _enum_to_name_$name = _MappingProxyType($to_name)
+                       |cdef object _enum_from_name_$name = _MappingProxyType($from_name)
+                     """,
+                name=decl.name,
+                to_name=repr(to_name),
+                from_name=repr(from_name),
+            )
             # Only generate cdef class forward declaration for unscoped enums,
             # since they are implemented as cdef classes in the .pyx file.
             # Scoped enums are implemented as regular Python classes (Enum subclasses)
@@ -478,16 +733,20 @@ class CodeGenerator(object):
                 doc=doc,
             )
         else:  # for scoped enums we use the python enum class
-            # TODO check if we somehow can use an extension class (cdef or cpdef). Should be faster.
-            #  see https://groups.google.com/g/cython-users/c/PpwhyIzqGyA
-            #  and https://github.com/cython/cython/pull/3221
+            # or a class derived from the extension type _ScopedEnum, see
+            # create_scoped_enum_base
+            if self.scoped_enum_type == "cdef":
+                bases = "_ScopedEnum, metaclass=_ScopedEnumType"
+            else:
+                bases = "_PyEnum"
             code.add(
                 """
                        |
-                       |class $name(_PyEnum):
+                       |class $name($bases):
                        |    $doc
                      """,
                 name=name,
+                bases=bases,
                 doc=doc,
             )
 
@@ -505,19 +764,37 @@ class CodeGenerator(object):
             code.add("    $name = $value", name=optname, value=value)
             stub_code.add("    $name : int", name=optname, value=value)
 
-        # Add mapping of int (enum) to the value of the enum (as string)
+        # Add mapping of int (enum) to the value of the enum (as string) and
+        # the translation of single names and values
         if not decl.scoped:
             code.add(
                 """
                     |
                     |    def getMapping(self):
-                    |        return dict([ (v, k) for k, v in self.__class__.__dict__.items()
-                    + if isinstance(v, int) ])"""
+                    |        return _enum_to_name_$name
+                    |
+                    |    @staticmethod
+                    |    def fromName(name):
+                    |        return _enum_from_name_$name[name]
+                    |
+                    |    @staticmethod
+                    |    def toName(value):
+                    |        return _enum_to_name_$name[value]
+                    """,
+                name=decl.name,
             )
             stub_code.add(
                 """
                         |
-                        |    def getMapping(self) -> Dict[int, str]:
+                        |    def getMapping(self) -> Mapping[int, str]:
+                        |       ...
+                        |
+                        |    @staticmethod
+                        |    def fromName(name: str) -> int:
+                        |       ...
+                        |
+                        |    @staticmethod
+                        |    def toName(value: int) -> str:
                         |       ...
                         """
             )
@@ -693,6 +970,17 @@ class CodeGenerator(object):
                 locals(),
             )
 
+        if len(r_class.wrap_freelist) != 0:
+            freelist = r_class.wrap_freelist[0].strip()
+            if not freelist.isdigit() or int(freelist) == 0:
+                raise ValueError(
+                    "wrap-freelist of class %s must be a positive number, got %r"
+                    % (cname, freelist)
+                )
+            # the decorator goes right before the "cdef class" line
+            assert class_code.content[1].startswith("cdef class ")
+            class_code.content.insert(1, "@cython.freelist(%s)" % freelist)
+
         if len(r_class.wrap_hash) != 0:
             hash_expr = r_class.wrap_hash[0].strip()
             # If hash expression is "std" or empty, use std::hash<T>
@@ -911,7 +1199,7 @@ class CodeGenerator(object):
                             |    while it != self.inst.get().$end_name():
                             |        out = $base_type.__new__($base_type)
                             |        out.inst =
-                            + shared_ptr[$cy_type](new $cy_type(deref(it)))
+                            + make_shared[$cy_type](deref(it))
                             |        yield out
                             |        inc(it)
                             """,
@@ -930,7 +1218,14 @@ class CodeGenerator(object):
         return codes, stub_codes
 
     def _create_overloaded_method_decl(
-        self, py_name, dispatched_m_names, methods, use_return, use_kwargs=False, inherited_from=None
+        self,
+        py_name,
+        dispatched_m_names,
+        methods,
+        use_return,
+        use_kwargs=False,
+        inherited_from=None,
+        class_name=None,
     ):
         L.info("   create wrapper decl for overloaded method %s" % py_name)
 
@@ -986,8 +1281,7 @@ class CodeGenerator(object):
             locals(),
         )
 
-        first_iteration = True
-
+        overloads = []
         for dispatched_m_name, method, sig in zip(dispatched_m_names, methods, signatures):
             args = augment_arg_names(method)
             return_type = self.cr.get(method.result_type).matching_python_type_full(
@@ -1020,6 +1314,8 @@ class CodeGenerator(object):
                 locals(),
             )
 
+            type_only_checks = None
+            inspects_values = False
             if not args:
                 check_expr = "not args"
 
@@ -1033,10 +1329,25 @@ class CodeGenerator(object):
 
             else:
                 tns = [(t, "args[%d]" % i) for i, (t, n) in enumerate(args)]
-                checks = ["len(args)==%d" % len(tns)]
-                checks += [self.cr.get(t).type_check_expression(t, n) for (t, n) in tns]
+                checks = [self.cr.get(t).type_check_expression(t, n) for (t, n) in tns]
                 check_expr = " and ".join("(%s)" % c for c in checks)
-            return_ = "return" if use_return else ""
+                type_only_checks = [
+                    self.cr.get(t).type_only_check_expression(t, n) for (t, n) in tns
+                ]
+                inspects_values = type_only_checks != checks
+            overloads.append(
+                (dispatched_m_name, len(args), check_expr, type_only_checks, inspects_values)
+            )
+
+        return_ = "return" if use_return else ""
+        if self.overload_dispatch == "table" and class_name is not None:
+            self._create_table_dispatch(method_code, class_name, py_name, overloads, return_)
+            return method_code, typestub_code
+
+        first_iteration = True
+        for dispatched_m_name, arity, check_expr, __, __ in overloads:
+            if arity:
+                check_expr = "(len(args)==%d) and %s" % (arity, check_expr)
             if_elif = "if" if first_iteration else "elif"
             method_code.add(
                 """
@@ -1054,6 +1365,118 @@ class CodeGenerator(object):
         )
         return method_code, typestub_code
 
+    def _create_table_dispatch(self, method_code, class_name, py_name, overloads, return_):
+        """Adds the dispatch of an overloaded method which first switches on
+        the number of arguments. Overloads with the same number of arguments
+        are told apart by the exact types of the arguments: the overloads
+        passing the type_only_check_expression checks for these types are
+        looked up in a module level dict, which is filled on the first call
+        with a new combination of types and holds at most
+        self.overload_cache_size entries. The full checks (inspecting e.g. all
+        elements of a list) are then only run for the remaining overloads. If
+        no overload needs more than isinstance checks, these are done
+        directly. The checks are also done for an overload which is the only
+        candidate, as the overloads themselves only check their arguments with
+        assert statements.
+        """
+        table = "_%s_%s_overloads" % (class_name, py_name)
+        while table in self._dispatch_tables:
+            table += "_"
+        self._dispatch_tables.add(table)
+
+        by_arity = defaultdict(list)
+        for overload in overloads:
+            by_arity[overload[1]].append(overload)
+
+        uses_table = False
+        first_iteration = True
+        for arity, candidates in by_arity.items():
+            if_elif = "if" if first_iteration else "elif"
+            first_iteration = False
+            method_code.add("    $if_elif len(args) == $arity:", locals())
+            group_code = Code()
+            method_code.add(group_code)
+            (name, __, check_expr, __, __) = candidates[0]
+            if len(candidates) == 1 and check_expr == "not args":
+                group_code.add("    $return_ self.$name(*args)", locals())
+                continue
+
+            # the table only pays off if the checks would inspect the values
+            # of the arguments, e.g. all elements of a list
+            if any(c[4] for c in candidates) and any(c[3] != [None] * arity for c in candidates):
+                if arity == 1:
+                    key = "type(args[0])"
+                else:
+                    key = "(%s)" % ", ".join("type(args[%d])" % i for i in range(arity))
+                cache_size = self.overload_cache_size
+                group_code.add(
+                    """
+                    |    _table = <dict>$table
+                    |    _key = $key
+                    |    _i = _table.get(_key)
+                    |    if _i is None:
+                    |        _candidates = []
+                    """,
+                    locals(),
+                )
+                for i, (__, __, __, type_only_checks, __) in enumerate(candidates):
+                    checks = [c for c in type_only_checks if c is not None]
+                    if checks:
+                        check_expr = " and ".join("(%s)" % c for c in checks)
+                        group_code.add(
+                            """
+                            |        if $check_expr:
+                            |            _candidates.append($i)
+                            """,
+                            locals(),
+                        )
+                    else:
+                        group_code.add("        _candidates.append($i)", locals())
+                group_code.add(
+                    """
+                    |        if len(_table) >= $cache_size:
+                    |            # evict the oldest entry
+                    |            del _table[next(iter(_table))]
+                    |        # -1: the types are ambiguous, the full checks are needed
+                    |        _i = _candidates[0] if len(_candidates) == 1 else -1
+                    |        _table[_key] = _i
+                    """,
+                    locals(),
+                )
+                for i, (name, __, check_expr, __, __) in enumerate(candidates):
+                    if_elif = "if" if i == 0 else "elif"
+                    group_code.add(
+                        """
+                        |    $if_elif (_i == $i or _i == -1) and $check_expr:
+                        |        $return_ self.$name(*args)
+                        """,
+                        locals(),
+                    )
+                uses_table = True
+            else:
+                for i, (name, __, check_expr, __, __) in enumerate(candidates):
+                    if_elif = "if" if i == 0 else "elif"
+                    group_code.add(
+                        """
+                        |    $if_elif $check_expr:
+                        |        $return_ self.$name(*args)
+                        """,
+                        locals(),
+                    )
+            group_code.add(
+                """    else:
+                            |        raise
+                            + TypeError('can not handle type of %s' % (args,))"""
+            )
+
+        method_code.add(
+            """    else:
+                        |           raise
+                        + TypeError('can not handle type of %s' % (args,))"""
+        )
+        if uses_table:
+            self.top_level_pyx_code.append(Code().add("$table = dict()", locals()))
+
     def create_wrapper_for_method(self, cdcl, py_name, methods, inherited_from=None):
         if py_name.startswith("operator"):
             __, __, op = py_name.partition("operator")
@@ -1166,14 +1589,23 @@ class CodeGenerator(object):
             for i, method in enumerate(methods):
                 dispatched_m_name = "_%s_%d" % (py_name, i)
                 dispatched_m_names.append(dispatched_m_name)
+                if method.cpp_decl.annotations.get("wrap-batch"):
+                    L.warning(
+                        "wrap-batch is ignored for overloaded method %s.%s" % (cdcl.name, py_name)
+                    )
                 # We should not need typestubs for the dispatched parent method
                 code, _ = self.create_wrapper_for_nonoverloaded_method(
-                    cdcl, dispatched_m_name, method
+                    cdcl, dispatched_m_name, method, create_batch=False
                 )
                 codes.append(code)
 
             code, typestubs = self._create_overloaded_method_decl(
-                py_name, dispatched_m_names, methods, True, inherited_from=inherited_from
+                py_name,
+                dispatched_m_names,
+                methods,
+                True,
+                inherited_from=inherited_from,
+                class_name=cdcl.name,
             )
             codes.append(code)
             return codes, typestubs
@@ -1203,13 +1635,20 @@ class CodeGenerator(object):
             py_type = converter.matching_python_type(t)
             py_typing_type = converter.matching_python_type_full(t)
             conv_code, call_as, cleanup = converter.input_conversion(t, n, arg_num)
-            py_signature_parts.append("%s %s " % (py_type, n))
+            typed_part = None
+            if self.typed_signatures:
+                typed_part = converter.typed_signature_part(t, n)
+            if typed_part is not None:
+                # Cython checks the type of the argument
+                py_signature_parts.append("%s " % typed_part)
+            else:
+                py_signature_parts.append("%s %s " % (py_type, n))
+                checks.append((n, converter.type_check_expression(t, n)))
             py_typing_signature_parts.append("%s: %s " % (n, py_typing_type))
             input_conversion_codes.append(conv_code)
             cleanups.append(cleanup)
             call_args.append(call_as)
             in_types.append(t)
-            checks.append((n, converter.type_check_expression(t, n)))
 
         # Step 1: create method decl statement
         if not is_free_fun and not method.is_static:
@@ -1292,7 +1731,17 @@ class CodeGenerator(object):
         # Step 2a: create code which converts python input args to c++ args of
         # wrapped method
         for n, check in checks:
-            code.add("    assert %s, 'arg %s wrong type'" % (check, n))
+            if self.typed_signatures:
+                # unlike an assert, this is not removed by python -O
+                code.add(
+                    """
+                    |    if not ($check):
+                    |        raise TypeError('arg $n wrong type')
+                    """,
+                    locals(),
+                )
+            else:
+                code.add("    assert %s, 'arg %s wrong type'" % (check, n))
         # Step 2b: add any more sophisticated conversion code that was created
         # above:
         for conv_code in input_conversion_codes:
@@ -1410,7 +1859,9 @@ class CodeGenerator(object):
         code.add("        return py_result")
         return code, stubs
 
-    def create_wrapper_for_nonoverloaded_method(self, cdcl, py_name, method, inherited_from=None):
+    def create_wrapper_for_nonoverloaded_method(
+        self, cdcl, py_name, method, inherited_from=None, create_batch=True
+    ):
         L.info("   create wrapper for %s ('%s')" % (py_name, method))
         meth_code = Code()
 
@@ -1437,15 +1888,76 @@ class CodeGenerator(object):
         out_converter = self.cr.get(res_t)
         full_call_stmt = out_converter.call_method(res_t, cy_call_str)
 
+        nogil = self._call_without_gil(cdcl, method, in_types, full_call_stmt)
+        self._add_call(meth_code, full_call_stmt, nogil)
+
+        for cleanup in reversed(cleanups):
+            if not cleanup:
+                continue
+            if isinstance(cleanup, (str, bytes)):
+                cleanup = "    %s" % cleanup
+            meth_code.add(cleanup)
+
+        to_py_code = out_converter.output_conversion(res_t, "_r", "py_result")
+
+        if to_py_code is not None:  # for non void return value
+            if isinstance(to_py_code, (str, bytes)):
+                to_py_code = "    %s" % to_py_code
+            meth_code.add(to_py_code)
+            meth_code.add("    return py_result")
+
+        if create_batch and method.cpp_decl.annotations.get("wrap-batch"):
+            batch_code, batch_stubs = self.create_batch_method(cdcl, py_name, method)
+            meth_code.extend(batch_code)
+            stubs.extend(batch_stubs)
+
+        return meth_code, stubs
+
+    def _releases_gil(self, cdcl, method) -> bool:
+        """Checks if the wrapper of a method or free function (cdcl is None)
+        releases the GIL while the C++ code runs
+
+        Methods annotated with wrap-with-no-gil always do. Otherwise methods
+        declared nogil (directly, in a nogil cppclass or in a nogil extern
+        block) do if their class is annotated with wrap-with-no-gil or if
+        nogil_default is set, unless they are annotated with wrap-with-gil.
+        """
         if method.with_nogil:
-            meth_code.add(
-                """
-              |    with nogil:
-              """
-            )
+            return True
+        annotations = method.cpp_decl.annotations
+        if annotations.get("wrap-with-gil", False) or not method.cpp_decl.is_nogil:
+            return False
+        if cdcl is not None and cdcl.cpp_decl.annotations.get("wrap-with-no-gil", False):
+            return True
+        return self.nogil_default
+
+    def _call_without_gil(self, cdcl, method, in_types, full_call_stmt) -> bool:
+        """Checks if the call statement of the wrapper goes into a "with
+        nogil" block. If the GIL is only released by default, the arguments
+        must be passed as C/C++ values and the result must be assigned by a
+        single statement, else the method is called with the GIL held."""
+        if not self._releases_gil(cdcl, method):
+            return False
+        if method.with_nogil:
+            return True
+        return isinstance(full_call_stmt, str) and all(
+            self.cr.get(t).call_as_without_gil(t) for t in in_types
+        )
+
+    def _add_call(self, code: Code, full_call_stmt, nogil: bool) -> None:
+        """Adds the call of the wrapped method, inside a "with nogil" block
+        if nogil is set. Cleanups and the conversion of the result need the
+        GIL, so they are added after the block."""
+        if nogil:
+            if isinstance(full_call_stmt, str) and full_call_stmt.startswith("cdef "):
+                # cdef statements are not allowed inside "with nogil"
+                declaration, __, value = full_call_stmt.partition(" = ")
+                code.add("    %s" % declaration)
+                full_call_stmt = "_r = %s" % value
+            code.add("    with nogil:")
             indented = Code()
         else:
-            indented = meth_code
+            indented = code
 
         if isinstance(full_call_stmt, (str, bytes)):
             indented.add(
@@ -1457,25 +1969,315 @@ class CodeGenerator(object):
         else:
             indented.add(full_call_stmt)
 
-        for cleanup in reversed(cleanups):
-            if not cleanup:
-                continue
-            if isinstance(cleanup, (str, bytes)):
-                cleanup = "    %s" % cleanup
-            indented.add(cleanup)
+        if nogil:
+            code.add(indented)
 
-        to_py_code = out_converter.output_conversion(res_t, "_r", "py_result")
+    def _batch_type(
+        self, cpp_type: CppType, what: str, annotation: str = "wrap-batch"
+    ) -> Tuple[str, str, str]:
+        """Returns (numpy dtype, C type, ArrayWrapper class) for an argument
+        or the result of a method annotated with wrap-batch (or of a function
+        annotated with wrap-parallel)"""
+        name = cpp_type.base_type
+        if cpp_type.is_unsigned:
+            name = "unsigned " + name
+        dtype = StdVectorAsNumpyConverter.NUMPY_DTYPE_MAP.get(name)
+        if (
+            dtype not in BATCH_TYPES
+            or cpp_type.template_args
+            or cpp_type.is_ptr
+            or (cpp_type.is_ref and not cpp_type.is_const)
+        ):
+            raise Exception(
+                "%s: %s of type %s is not a numeric scalar" % (annotation, what, cpp_type)
+            )
+        ctype, wrapper = BATCH_TYPES[dtype]
+        return dtype, ctype, wrapper
+
+    def _add_batch_arguments(self, code: Code, name: str, args, arg_types) -> None:
+        """Adds the conversion of the arguments of a "_batch" or "_parallel"
+        function to memoryviews "_batch_<arg>", the number of calls "_n" and
+        the steps "_step_<arg>" through the memoryviews"""
+        for (t, n), (dtype, ctype, __) in zip(args, arg_types):
+            code.add(
+                "    cdef const $ctype[::1] _batch_$n = _numpy_input($n, numpy.$dtype)",
+                locals(),
+            )
+        first = args[0][1]
+        code.add("    cdef Py_ssize_t _n = _batch_$first.shape[0]", locals())
+        for t, n in args[1:]:
+            code.add(
+                """
+                   |    if _n == 1:
+                   |        _n = _batch_$n.shape[0]
+                   |    elif _batch_$n.shape[0] != 1 and _batch_$n.shape[0] != _n:
+                   |        raise ValueError("$name: arguments have different lengths")
+                   """,
+                locals(),
+            )
+        for t, n in args:
+            # step 0 repeats an argument of length 1
+            code.add(
+                "    cdef Py_ssize_t _step_$n = 0 if _batch_$n.shape[0] == 1 else 1", locals()
+            )
 
-        if to_py_code is not None:  # for non void return value
-            if isinstance(to_py_code, (str, bytes)):
-                to_py_code = "    %s" % to_py_code
-            indented.add(to_py_code)
-            indented.add("    return py_result")
+    def create_batch_method(self, cdcl, py_name, method) -> Tuple[Code, Code]:
+        """Creates "<py_name>_batch" for a method annotated with wrap-batch
+
+        The numeric scalar arguments of the method are passed as numpy arrays
+        (or anything numpy.asarray accepts) of the same length, an argument of
+        length one is used for all elements. They are converted by
+        _numpy_input (see ArrayWrappers.pyx), which raises if values would be
+        lost. The method is called
+        in a C loop for each element, without the GIL if the wrapper of the
+        method releases it (see _releases_gil), and the results
+        are returned as a numpy array which owns them via an ArrayWrapper.
+        """
+        if not self.include_numpy:
+            raise Exception("wrap-batch on %s.%s needs include_numpy" % (cdcl.name, py_name))
+        if method.is_static:
+            raise Exception("wrap-batch on static method %s.%s" % (cdcl.name, py_name))
 
-        if method.with_nogil:
-            meth_code.add(indented)
+        batch_name = "%s_batch" % py_name
+        L.info("   create wrapper for %s ('%s')" % (batch_name, method))
+        args = augment_arg_names(method)
+        if not args:
+            raise Exception("wrap-batch on %s.%s which has no arguments" % (cdcl.name, py_name))
+        arg_types = [self._batch_type(t, "argument %s" % n) for (t, n) in args]
 
-        return meth_code, stubs
+        res_t = method.result_type
+        if res_t.base_type == "void":
+            result = None
+            return_type = "None"
+        else:
+            result = self._batch_type(res_t, "result")
+            return_type = "numpy.ndarray"
+
+        py_signature = ", ".join(["self"] + [n for (t, n) in args])
+        py_typing_signature = ", ".join(["self"] + ["%s: numpy.ndarray" % n for (t, n) in args])
+        cpp_name = method.cpp_decl.name
+        cy_type = self.cr.cython_type(cdcl.name)
+
+        code = Code()
+        code.add(
+            """
+               |
+               |@cython.boundscheck(False)
+               |@cython.wraparound(False)
+               |def $batch_name($py_signature):
+               |    \"\"\"
+               |    $batch_name($py_typing_signature) -> $return_type
+               |
+               |    Calls $py_name for each element of the arguments, arguments of
+               |    length 1 are used for all elements.
+               |    \"\"\"
+               """,
+            locals(),
+        )
+        self._add_batch_arguments(code, batch_name, args, arg_types)
+        code.add(
+            """
+               |    cdef $cy_type * _inst = self.inst.get()
+               |    cdef Py_ssize_t _k
+               """,
+            locals(),
+        )
+        call_args_str = ", ".join("_batch_%s[_k * _step_%s]" % (n, n) for (t, n) in args)
+        call = "_inst.%s(%s)" % (cpp_name, call_args_str)
+        if result is not None:
+            __, res_ctype, wrapper = result
+            code.add(
+                """
+                   |    cdef libcpp_vector[$res_ctype] _results
+                   |    _results.resize(_n)
+                   """,
+                locals(),
+            )
+            call = "_results[_k] = %s" % call
+        nogil = self._releases_gil(cdcl, method)
+        if nogil:
+            code.add("    with nogil:")
+            loop = Code()
+        else:
+            loop = code
+        loop.add(
+            """
+               |    for _k in range(_n):
+               |        $call
+               """,
+            locals(),
+        )
+        if nogil:
+            code.add(loop)
+        if result is not None:
+            code.add(
+                """
+                   |    cdef $wrapper _wrapper = $wrapper()
+                   |    _wrapper.vec.swap(_results)
+                   |    return numpy.asarray(_wrapper)
+                   """,
+                locals(),
+            )
+
+        stubs = Code()
+        stubs.add(
+            """
+               |
+               |def $batch_name($py_typing_signature) -> $return_type:
+               |    \"\"\"
+               |    Calls $py_name for each element of the arguments, arguments of
+               |    length 1 are used for all elements.
+               |    \"\"\"
+               |    ...
+               """,
+            locals(),
+        )
+        return code, stubs
+
+    def create_parallel_function(self, decl: ResolvedFunction) -> Tuple[Code, Code]:
+        """Creates "<name>_parallel" for a free function annotated with
+        wrap-parallel
+
+        The arguments are passed like for wrap-batch. The function is called
+        for each element by autowrap::parallel_for from autowrap_tools.hpp on
+        n_threads threads (one per core for n_threads=0), without the GIL. The
+        function is called through a plain function pointer, so a C++
+        exception is rethrown by parallel_for in the calling thread and
+        converted there.
+        """
+        name = decl.name
+        if not self.include_numpy:
+            raise Exception("wrap-parallel on %s needs include_numpy" % name)
+        if not decl.cpp_decl.is_nogil:
+            raise Exception("wrap-parallel on %s which is not declared nogil" % name)
+
+        parallel_name = "%s_parallel" % name
+        L.info("   create wrapper for %s ('%s')" % (parallel_name, decl))
+        args = augment_arg_names(decl)
+        if not args:
+            raise Exception("wrap-parallel on %s which has no arguments" % name)
+        arg_types = [
+            self._batch_type(t, "argument %s" % n, "wrap-parallel") for (t, n) in args
+        ]
+
+        res_t = decl.result_type
+        if res_t.base_type == "void":
+            result = None
+            return_type = "None"
+        else:
+            result = self._batch_type(res_t, "result", "wrap-parallel")
+            return_type = "numpy.ndarray"
+
+        mangled_name = "_%s_%s" % (decl.cpp_decl.name, decl.pxd_import_path)
+        context = "%s_parallel_context" % mangled_name
+        fun_ptr = "%s_parallel_fun" % mangled_name
+        body = "%s_parallel_body" % mangled_name
+        fun_ptr_args = ", ".join(str(self.cr.cython_type(t)) for (t, n) in args)
+        fun_ptr_result = self.cr.cython_type(res_t)
+        py_signature = ", ".join([n for (t, n) in args] + ["int n_threads=0"])
+        py_typing_signature = ", ".join(
+            ["%s: numpy.ndarray" % n for (t, n) in args] + ["n_threads: int = 0"]
+        )
+
+        code = Code()
+        code.add(
+            """
+               |
+               |cdef struct $context:
+               """,
+            locals(),
+        )
+        for (t, n), (__, ctype, __) in zip(args, arg_types):
+            code.add(
+                """
+                   |    const $ctype * arg_$n
+                   |    Py_ssize_t step_$n
+                   """,
+                locals(),
+            )
+        if result is not None:
+            __, res_ctype, wrapper = result
+            code.add("    $res_ctype * results", locals())
+        call_args_str = ", ".join(
+            "_context.arg_%s[_k * _context.step_%s]" % (n, n) for (t, n) in args
+        )
+        call = "(<%s>%s)(%s)" % (fun_ptr, mangled_name, call_args_str)
+        if result is not None:
+            call = "_context.results[_k] = %s" % call
+        code.add(
+            """
+               |
+               |# without "except +", so C++ exceptions reach parallel_for
+               |ctypedef $fun_ptr_result (*$fun_ptr)($fun_ptr_args) noexcept nogil
+               |
+               |cdef void $body(size_t _k, void * _c) noexcept nogil:
+               |    cdef $context * _context = <$context *> _c
+               |    $call
+               |
+               |@cython.boundscheck(False)
+               |@cython.wraparound(False)
+               |def $parallel_name($py_signature):
+               |    \"\"\"
+               |    $parallel_name($py_typing_signature) -> $return_type
+               |
+               |    Calls $name for each element of the arguments on n_threads
+               |    threads (one per core for 0), arguments of length 1 are used for
+               |    all elements.
+               |    \"\"\"
+               """,
+            locals(),
+        )
+        self._add_batch_arguments(code, parallel_name, args, arg_types)
+        code.add("    cdef $context _context", locals())
+        for t, n in args:
+            code.add(
+                """
+                   |    _context.arg_$n = &_batch_$n[0]
+                   |    _context.step_$n = _step_$n
+                   """,
+                locals(),
+            )
+        if result is not None:
+            code.add(
+                """
+                   |    cdef libcpp_vector[$res_ctype] _results
+                   |    _results.resize(_n)
+                   |    _context.results = _results.data()
+                   """,
+                locals(),
+            )
+        code.add(
+            """
+               |    with nogil:
+               |        _parallel_for(_n, n_threads, $body, &_context)
+               """,
+            locals(),
+        )
+        if result is not None:
+            code.add(
+                """
+                   |    cdef $wrapper _wrapper = $wrapper()
+                   |    _wrapper.vec.swap(_results)
+                   |    return numpy.asarray(_wrapper)
+                   """,
+                locals(),
+            )
+
+        stubs = Code()
+        stubs.add(
+            """
+               |
+               |def $parallel_name($py_typing_signature) -> $return_type:
+               |    \"\"\"
+               |    Calls $name for each element of the arguments on n_threads
+               |    threads (one per core for 0), arguments of length 1 are used for
+               |    all elements.
+               |    \"\"\"
+               |    ...
+               """,
+            locals(),
+        )
+        return code, stubs
 
     def create_wrapper_for_free_function(self, decl: ResolvedFunction, out_codes: CodeDict) -> None:
         """
@@ -1489,7 +2291,13 @@ class CodeGenerator(object):
         static_clz = decl.cpp_decl.annotations.get("wrap-attach")
         if static_clz is None:
             code, typestub = self._create_wrapper_for_free_function(decl)
+            if decl.cpp_decl.annotations.get("wrap-parallel"):
+                parallel_code, parallel_stubs = self.create_parallel_function(decl)
+                code.extend(parallel_code)
+                typestub.extend(parallel_stubs)
         else:
+            if decl.cpp_decl.annotations.get("wrap-parallel"):
+                raise Exception("wrap-parallel on %s which is attached to a class" % decl.name)
             code = Code()
             stub = Code()
             static_name = "__static_%s_%s" % (
@@ -1542,15 +2350,8 @@ class CodeGenerator(object):
         out_converter = self.cr.get(res_t)
         full_call_stmt = out_converter.call_method(res_t, cy_call_str)
 
-        if isinstance(full_call_stmt, (str, bytes)):
-            fun_code.add(
-                """
-                |    $full_call_stmt
-                """,
-                locals(),
-            )
-        else:
-            fun_code.add(full_call_stmt)
+        nogil = self._call_without_gil(None, decl, in_types, full_call_stmt)
+        self._add_call(fun_code, full_call_stmt, nogil)
 
         for cleanup in reversed(cleanups):
             if not cleanup:
@@ -1618,7 +2419,12 @@ class CodeGenerator(object):
                 )
                 codes.append(code)
             code, typestub = self._create_overloaded_method_decl(
-                "__init__", dispatched_cons_names, constructors, False, True
+                "__init__",
+                dispatched_cons_names,
+                constructors,
+                False,
+                True,
+                class_name=class_decl.name,
             )
             codes.append(code)
             typestub_code.extend(typestub)
@@ -1652,10 +2458,7 @@ class CodeGenerator(object):
         call_args_str = ", ".join(call_args)
         name = class_decl.name
         cy_type = self.cr.cython_type(name)
-        cons_code.add(
-            """    self.inst = shared_ptr[$cy_type](new $cy_type($call_args_str))""",
-            locals(),
-        )
+        cons_code.add("""    self.inst = make_shared[$cy_type]($call_args_str)""", locals())
 
         for cleanup in reversed(cleanups):
             if not cleanup:
@@ -1675,16 +2478,14 @@ class CodeGenerator(object):
         assert mdcl.result_type.base_type == name, f"can only return same type for operator{symbol}"
         cy_t = self.cr.cython_type(t)
         code = Code()
-        # TODO use make_shared instead of new if C++11 available
         code.add(
             f"""
         |
         |def __{pyname}__({name} self, {name} other not None):
         |    cdef {cy_t} * this = self.inst.get()
         |    cdef {cy_t} * that = other.inst.get()
-        |    cdef {cy_t} applied = deref(this) {symbol} deref(that)
         |    cdef {name} result = {name}.__new__({name})
-        |    result.inst = shared_ptr[{cy_t}](new {cy_t}(applied))
+        |    result.inst = make_shared[{cy_t}](deref(this) {symbol} deref(that))
         |    return result
         """
         )
@@ -2008,7 +2809,7 @@ class CodeGenerator(object):
                         |
                         |def __copy__(self):
                         |   cdef $name rv = $name.__new__($name)
-                        |   rv.inst = shared_ptr[$cy_type](new $cy_type(deref(self.inst.get())))
+                        |   rv.inst = make_shared[$cy_type](deref(self.inst.get()))
                         |   return rv
                         """,
             locals(),
@@ -2018,7 +2819,7 @@ class CodeGenerator(object):
                         |
                         |def __deepcopy__(self, memo):
                         |   cdef $name rv = $name.__new__($name)
-                        |   rv.inst = shared_ptr[$cy_type](new $cy_type(deref(self.inst.get())))
+                        |   rv.inst = make_shared[$cy_type](deref(self.inst.get()))
                         |   return rv
                         """,
             locals(),
@@ -2173,12 +2974,288 @@ class CodeGenerator(object):
                    |                    # Cache for future lookups
                    |                    _scoped_enum_registry[name] = enum_cls
                    |                    return enum_cls
+                   |        if '.' not in __name__:
+                   |            # Sibling modules outside a package: search the registries
+                   |            # of the other modules wrapped by autowrap
+                   |            for mod in list(_sys.modules.values()):
+                   |                registry = getattr(mod, '_scoped_enum_registry', None)
+                   |                if type(registry) is dict and name in registry:
+                   |                    _scoped_enum_registry[name] = registry[name]
+                   |                    return registry[name]
                    |    # Fallback
                    |    return fallback
                    """
         )
         self.top_level_pyx_code.append(code)
 
+    def create_enum_lookups(self):
+        """Generate the module level objects used by EnumConverter to check
+        and convert enums of the complete project
+
+        Unscoped enums with many values, which are not checked with a range
+        check, get a frozenset of their values. _enum_in_range and
+        _enum_in_set check these enums, accepting ints and other integers
+        (e.g. numpy.int64) like the comparisons of small enums.
+        Scoped enums get a _ScopedEnumLookup, which resolves the Python enum
+        class with _get_scoped_enum_class() once and then returns the cached
+        class and members, instead of looking the class up for every check
+        and conversion. Until the class is found, arguments are checked with
+        _scoped_enum_fallback: int, which accepts IntEnum members, or with
+        scoped_enum_type "cdef" a check for a value and __index__, as the
+        members are no ints and each module has its own _ScopedEnum class.
+        """
+        code = Code()
+        if any(e.scoped for e in self.all_enums):
+            if self.scoped_enum_type == "cdef":
+                code.add(
+                    """
+                   |
+                   |class _AnyScopedEnumType(type):
+                   |    def __instancecheck__(cls, value):
+                   |        return hasattr(value, 'value') and hasattr(type(value), '__index__')
+                   |
+                   |class _AnyScopedEnum(metaclass=_AnyScopedEnumType):
+                   |    '''Stands in for scoped enum classes which are not found'''
+                   |
+                   |_scoped_enum_fallback = _AnyScopedEnum
+                   """
+                )
+            else:
+                code.add(
+                    """
+                   |
+                   |_scoped_enum_fallback = int
+                   """
+                )
+            code.add(
+                """
+                   |
+                   |cdef class _ScopedEnumLookup:
+                   |    '''Resolves a scoped enum class by name on first use and caches it'''
+                   |
+                   |    cdef str name
+                   |    cdef object cls
+                   |    cdef dict members
+                   |    cdef tuple table
+                   |    cdef Py_ssize_t offset
+                   |
+                   |    def __cinit__(self, str name):
+                   |        self.name = name
+                   |
+                   |    cdef object get(self):
+                   |        if self.cls is None:
+                   |            cls = _get_scoped_enum_class(self.name, _scoped_enum_fallback)
+                   |            if cls is _scoped_enum_fallback:
+                   |                # the defining module is not loaded yet, ask again later
+                   |                return cls
+                   |            # classes derived from _ScopedEnum bring a table of their
+                   |            # members indexed by value
+                   |            self.table = getattr(cls, '_value_table_', None)
+                   |            if self.table is not None:
+                   |                self.offset = cls._value_offset_
+                   |            else:
+                   |                self.members = dict((m.value, m) for m in cls)
+                   |            self.cls = cls
+                   |        return self.cls
+                   |
+                   |    cdef object member(self, int value):
+                   |        cdef Py_ssize_t i
+                   |        cls = self.get()
+                   |        if cls is _scoped_enum_fallback:
+                   |            return value
+                   |        if self.table is not None:
+                   |            i = value - self.offset
+                   |            if 0 <= i < len(self.table) and self.table[i] is not None:
+                   |                return self.table[i]
+                   |        else:
+                   |            member = self.members.get(value)
+                   |            if member is not None:
+                   |                return member
+                   |        # raises the ValueError of the enum class
+                   |        return cls(value)
+                   |
+                   """
+            )
+        if any(
+            not e.scoped and len(e.items) > EnumConverter.MAX_COMPARED_VALUES
+            for e in self.all_enums
+        ):
+            code.add(
+                """
+                   |
+                   |from cpython.number cimport PyIndex_Check as _PyIndex_Check
+                   |from cpython.number cimport PyNumber_Index as _PyNumber_Index
+                   |
+                   |cdef bint _enum_in_range(object value, long long first, long long last) except -1:
+                   |    if not isinstance(value, int):
+                   |        if not _PyIndex_Check(value):
+                   |            return False
+                   |        value = _PyNumber_Index(value)
+                   |    return first <= value <= last
+                   |
+                   |cdef bint _enum_in_set(object value, frozenset values) except -1:
+                   |    if not isinstance(value, int):
+                   |        if not _PyIndex_Check(value):
+                   |            return False
+                   |        value = _PyNumber_Index(value)
+                   |    return value in values
+                   |
+                   """
+            )
+        for enum in self.all_enums:
+            lookup = EnumConverter.lookup_name(enum)
+            if enum.scoped:
+                name = EnumConverter.python_name(enum)
+                code.add("cdef _ScopedEnumLookup $lookup = _ScopedEnumLookup('$name')", locals())
+            elif (
+                len(enum.items) > EnumConverter.MAX_COMPARED_VALUES
+                and EnumConverter.value_range(enum) is None
+            ):
+                values = ", ".join(str(v) for (__, v) in enum.items)
+                code.add("cdef frozenset $lookup = frozenset([$values])", locals())
+        self.top_level_pyx_code.append(code)
+
+    def create_scoped_enum_base(self):
+        """Generate the base class and metaclass of the scoped enums wrapped
+        with scoped_enum_type "cdef"
+
+        The members are instances of the extension type _ScopedEnum, which
+        holds their value and name. The metaclass _ScopedEnumType replaces the
+        int values in the class body by the members and provides the class
+        level API of enum.Enum (iteration, lookup by value and by name). It
+        also stores the members in a tuple indexed by value, which is used by
+        _ScopedEnumLookup.member() to convert returned values.
+
+        The members compare, hash and convert (int(), operator.index()) like
+        their values, but unlike IntEnum members they are no int instances.
+        """
+        if self.scoped_enum_type != "cdef":
+            return
+        if not any(isinstance(d, ResolvedEnum) and d.scoped for d in self.resolved):
+            return
+        code = Code()
+        code.add(
+            """
+               |
+               |from cpython.number cimport PyNumber_Index as _PyNumber_Index
+               |
+               |cdef class _ScopedEnum:
+               |    '''Base class of the members of scoped enums'''
+               |
+               |    cdef readonly int value
+               |    cdef readonly str name
+               |
+               |    def __int__(self):
+               |        return self.value
+               |
+               |    def __index__(self):
+               |        return self.value
+               |
+               |    def __hash__(self):
+               |        return hash(self.value)
+               |
+               |    def __eq__(self, other):
+               |        try:
+               |            return self.value == _PyNumber_Index(other)
+               |        except TypeError:
+               |            return NotImplemented
+               |
+               |    def __ne__(self, other):
+               |        try:
+               |            return self.value != _PyNumber_Index(other)
+               |        except TypeError:
+               |            return NotImplemented
+               |
+               |    def __lt__(self, other):
+               |        return self.value < _PyNumber_Index(other)
+               |
+               |    def __le__(self, other):
+               |        return self.value <= _PyNumber_Index(other)
+               |
+               |    def __gt__(self, other):
+               |        return self.value > _PyNumber_Index(other)
+               |
+               |    def __ge__(self, other):
+               |        return self.value >= _PyNumber_Index(other)
+               |
+               |    def __repr__(self):
+               |        return '<%s.%s: %d>' % (type(self).__name__, self.name, self.value)
+               |
+               |    def __str__(self):
+               |        return str(self.value)
+               |
+               |    def __format__(self, spec):
+               |        return format(self.value, spec)
+               |
+               |    def __reduce__(self):
+               |        return type(self), (self.value,)
+               |
+               |cdef _ScopedEnum _new_scoped_enum_member(cls, int value, str name):
+               |    cdef _ScopedEnum member = _ScopedEnum.__new__(cls)
+               |    member.value = value
+               |    member.name = name
+               |    return member
+               |
+               |class _ScopedEnumType(type):
+               |    '''Metaclass of the scoped enums, creates the members of a class'''
+               |
+               |    def __new__(mcs, name, bases, namespace):
+               |        items = [(k, v) for k, v in namespace.items() if not k.startswith('_')]
+               |        items = [(k, v) for k, v in items if isinstance(v, int)]
+               |        namespace = dict(namespace)
+               |        namespace['__slots__'] = ()
+               |        cls = type.__new__(mcs, name, bases, namespace)
+               |        by_name = dict()
+               |        by_value = dict()
+               |        for k, v in items:
+               |            # later names for the same value are aliases
+               |            if v not in by_value:
+               |                by_value[v] = _new_scoped_enum_member(cls, v, k)
+               |            by_name[k] = by_value[v]
+               |            type.__setattr__(cls, k, by_value[v])
+               |        cls._member_map_ = by_name
+               |        cls._value_map_ = by_value
+               |        cls._value_table_ = None
+               |        cls._value_offset_ = 0
+               |        if by_value:
+               |            lo, hi = min(by_value), max(by_value)
+               |            # a table, unless the values are too sparse
+               |            if hi - lo < 2 * len(by_value) + 16:
+               |                table = [None] * (hi - lo + 1)
+               |                for v, member in by_value.items():
+               |                    table[v - lo] = member
+               |                cls._value_table_ = tuple(table)
+               |                cls._value_offset_ = lo
+               |        return cls
+               |
+               |    def __call__(cls, value):
+               |        member = cls._value_map_.get(value)
+               |        if member is None:
+               |            raise ValueError('%r is not a valid %s' % (value, cls.__name__))
+               |        return member
+               |
+               |    def __iter__(cls):
+               |        return iter(cls._value_map_.values())
+               |
+               |    def __len__(cls):
+               |        return len(cls._value_map_)
+               |
+               |    def __contains__(cls, member):
+               |        return isinstance(member, cls)
+               |
+               |    def __getitem__(cls, name):
+               |        return cls._member_map_[name]
+               |
+               |    @property
+               |    def __members__(cls):
+               |        return dict(cls._member_map_)
+               |
+               |    def __repr__(cls):
+               |        return '<enum %r>' % cls.__name__
+               """
+        )
+        self.top_level_pyx_code.append(code)
+
     def create_cimports(self):
         self.create_std_cimports()
         code = Code()
@@ -2212,6 +3289,7 @@ class CodeGenerator(object):
                    |#cython: embedsignature=False
                    |from  enum            import IntEnum as _PyEnum
                    |import sys as _sys
+                   |from  types           import MappingProxyType as _MappingProxyType
                    |from  cpython         cimport Py_buffer
                    |from  cpython         cimport bool as pybool_t
                    |from  libcpp.string   cimport string as libcpp_string
@@ -2220,6 +3298,7 @@ class CodeGenerator(object):
                    |from  libcpp.set      cimport set as libcpp_set
                    |from  libcpp.vector   cimport vector as libcpp_vector
                    |from  libcpp.vector   cimport vector as libcpp_vector_as_np
+                   |from  libcpp.vector   cimport vector as libcpp_vector_as_view
                    |from  libcpp.pair     cimport pair as libcpp_pair
                    |from  libcpp.map      cimport map  as libcpp_map
                    |from  libcpp.unordered_map cimport unordered_map as libcpp_unordered_map
@@ -2230,6 +3309,7 @@ class CodeGenerator(object):
                    |from  libcpp.string_view cimport string_view as libcpp_string_view
                    |from  libcpp          cimport bool
                    |from  libc.string     cimport const_char, memcpy
+                   |cimport cython
                    |from  cython.operator cimport dereference as deref,
                    + preincrement as inc, address as address
                    """
@@ -2241,11 +3321,12 @@ class CodeGenerator(object):
                    |from  AutowrapRefHolder      cimport AutowrapRefHolder
                    |from  AutowrapPtrHolder      cimport AutowrapPtrHolder
                    |from  AutowrapConstPtrHolder cimport AutowrapConstPtrHolder
+                   |from  AutowrapArrayView      cimport AutowrapArrayView, make_array_view
                    """
             )
         code.add(
             """
-                   |from  libcpp.memory   cimport shared_ptr
+                   |from  libcpp.memory   cimport shared_ptr, make_shared
                    """
         )
         # Add std::hash declaration for wrap-hash support (named cpp_hash to avoid conflict with Python hash)
@@ -2265,6 +3346,7 @@ class CodeGenerator(object):
                    |cimport numpy as numpy
                    |import numpy as numpy
                    |from cpython.ref cimport Py_INCREF
+                   |from cpython.buffer cimport PyObject_CheckBuffer
                    """
             )
 
@@ -2324,12 +3406,101 @@ class CodeGenerator(object):
         # This avoids conflicts when the project already has ArrayWrapper definitions
         self.top_level_pyx_code.append(code)
 
+    def _vector_view_element_types(self) -> List[CppType]:
+        """Element types of all libcpp_vector_as_view types used in the
+        signatures of the wrapped methods, functions and attributes"""
+        types = []
+        for resolved in self.resolved:
+            if resolved.wrap_ignore:
+                continue
+            if isinstance(resolved, ResolvedClass):
+                methods = [m for ms in resolved.methods.values() for m in ms]
+                types.extend(a.type_ for a in resolved.attributes)
+            elif isinstance(resolved, ResolvedFunction):
+                methods = [resolved]
+            else:
+                continue
+            for method in methods:
+                types.append(method.result_type)
+                types.extend(t for (__, t) in method.arguments)
+
+        element_types = dict()
+        while types:
+            t = types.pop()
+            if t.base_type == "libcpp_vector_as_view" and t.template_args:
+                (tt,) = t.template_args
+                element_types[tt.base_type] = tt
+            types.extend(t.template_args or [])
+        return [element_types[name] for name in sorted(element_types)]
+
+    def create_vector_views(self):
+        """Creates the sequence classes returned for libcpp_vector_as_view,
+        see StdVectorAsViewConverter"""
+        for tt in self._vector_view_element_types():
+            if CppType("libcpp_vector_as_view", [tt]) not in self.cr:
+                continue
+            name = tt.base_type
+            view = StdVectorAsViewConverter.view_class_name(tt)
+            cy_type = self.cr.cython_type(tt)
+            L.info("create sequence class %s" % view)
+            code = Code()
+            code.add(
+                """
+                   |
+                   |cdef class $view:
+                   |    \"\"\"
+                   |    Sequence of $name objects which owns a C++ vector, the elements
+                   |    are created on access and refer to the elements of the vector.
+                   |    \"\"\"
+                   |
+                   |    cdef shared_ptr[libcpp_vector[$cy_type]] vec
+                   |
+                   |    @staticmethod
+                   |    cdef $view _create(shared_ptr[libcpp_vector[$cy_type]] vec):
+                   |        cdef $view view = $view.__new__($view)
+                   |        view.vec = vec
+                   |        return view
+                   |
+                   |    def __len__(self):
+                   |        return self.vec.get().size()
+                   |
+                   |    def __getitem__(self, index):
+                   |        if isinstance(index, slice):
+                   |            return [self[i] for i in range(*index.indices(self.vec.get().size()))]
+                   |        cdef Py_ssize_t i = index
+                   |        cdef Py_ssize_t n = self.vec.get().size()
+                   |        if i < 0:
+                   |            i += n
+                   |        if i < 0 or i >= n:
+                   |            raise IndexError("index out of range")
+                   |        cdef $name item = $name.__new__($name)
+                   |        item.inst = _aliasing_shared_ptr[$cy_type, libcpp_vector[$cy_type]](
+                   |            self.vec, address(deref(self.vec.get())[i]))
+                   |        return item
+                   |
+                   |    def __iter__(self):
+                   |        cdef size_t i
+                   |        cdef $name item
+                   |        for i in range(self.vec.get().size()):
+                   |            item = $name.__new__($name)
+                   |            item.inst = _aliasing_shared_ptr[$cy_type, libcpp_vector[$cy_type]](
+                   |                self.vec, address(deref(self.vec.get())[i]))
+                   |            yield item
+                   """,
+                locals(),
+            )
+            self.top_level_pyx_code.append(code)
+
     def create_includes(self):
         code = Code()
         code.add(
             """
                 |cdef extern from "autowrap_tools.hpp":
                 |    char * _cast_const_away(char *)
+                |    shared_ptr[T] _aliasing_shared_ptr[T, U](shared_ptr[U] owner, T * ptr)
+                |    void _parallel_for "autowrap::parallel_for"(
+                |        size_t n, int n_threads, void (*body)(size_t, void *) noexcept nogil, void * context
+                |    ) except + nogil
                 """
         )
 
@@ -116,6 +116,24 @@ class TypeConverterBase(object):
         """
         raise NotImplementedError()
 
+    def typed_signature_part(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        """
+        Creates the declaration of the argument in the signature of the
+        wrapper (e.g. "Foo x not None") if Cython checks everything
+        type_check_expression checks when the argument is passed or converted
+        by input_conversion. Returns None if an explicit check is needed.
+        """
+        return None
+
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        """
+        Creates code for a necessary condition of type_check_expression which
+        only depends on the exact type of the argument (e.g. an isinstance
+        check without inspecting container elements), so its result can be
+        cached per type. Returns None if there is no such check.
+        """
+        return None
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[Union[Code, str], Union[Code, str], Union[Code, str]]:
@@ -129,6 +147,15 @@ class TypeConverterBase(object):
         """
         raise NotImplementedError()
 
+    def call_as_without_gil(self, cpp_type: CppType) -> bool:
+        """
+        Return True if the call_as expression of input_conversion only
+        involves C/C++ values, so the wrapped method can be called inside a
+        "with nogil" block. The conversion code itself still runs with the
+        GIL held, before the block.
+        """
+        return False
+
     def output_conversion(
         self, cpp_type: CppType, input_cpp_var: str, output_py_var: str
     ) -> Optional[Union[Code, str]]:
@@ -170,10 +197,10 @@ class TypeConverterBase(object):
         if cpp_type.is_ptr:
             cpp_type_base = cpp_type.base_type
             return string.Template(
-                "shared_ptr[$cpp_type_base](new $cpp_type_base(deref(deref($it))))"
+                "make_shared[$cpp_type_base](deref(deref($it)))"
             ).substitute(locals())
         else:
-            return string.Template("shared_ptr[$cpp_type](new $cpp_type(deref($it)))").substitute(
+            return string.Template("make_shared[$cpp_type](deref($it))").substitute(
                 locals()
             )
 
@@ -237,12 +264,23 @@ class IntegerConverter(TypeConverterBase):
     def type_check_expression(self, cpp_type: CppType, argument_var: str) -> str:
         return "isinstance(%s, int)" % (argument_var,)
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return self.type_check_expression(cpp_type, argument_var)
+
+    def typed_signature_part(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        # the conversion to the C type raises a TypeError for other types
+        return "%s %s" % (self.matching_python_type(cpp_type), argument_var)
+
     def input_conversion(self, cpp_type, argument_var, arg_num) -> Tuple[str, str, str]:
         code = ""
         call_as = "(<%s>%s)" % (cpp_type, argument_var)
         cleanup = ""
         return code, call_as, cleanup
 
+    def call_as_without_gil(self, cpp_type: CppType) -> bool:
+        # the argument is declared with the C type in the signature
+        return True
+
     def output_conversion(
         self, cpp_type: CppType, input_cpp_var: str, output_py_var: str
     ) -> Optional[str]:
@@ -272,6 +310,9 @@ class BooleanConverter(TypeConverterBase):
     def type_check_expression(self, cpp_type: CppType, argument_var: str) -> str:
         return "isinstance(%s, pybool_t)" % (argument_var,)
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return self.type_check_expression(cpp_type, argument_var)
+
     def input_conversion(self, cpp_type, argument_var, arg_num) -> Tuple[str, str, str]:
         code = ""
         call_as = "(<%s>%s)" % (cpp_type, argument_var)
@@ -315,6 +356,9 @@ class UnsignedIntegerConverter(TypeConverterBase):
             argument_var,
         )
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "isinstance(%s, int)" % argument_var
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[str, str, str]:
@@ -348,6 +392,13 @@ class DoubleConverter(TypeConverterBase):
     def type_check_expression(self, cpp_type: CppType, argument_var: str) -> str:
         return "isinstance(%s, float)" % (argument_var,)
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return self.type_check_expression(cpp_type, argument_var)
+
+    def typed_signature_part(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        # the conversion to the C type raises a TypeError for other types
+        return "%s %s" % (self.matching_python_type(cpp_type), argument_var)
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[str, str, str]:
@@ -356,6 +407,10 @@ class DoubleConverter(TypeConverterBase):
         cleanup = ""
         return code, call_as, cleanup
 
+    def call_as_without_gil(self, cpp_type: CppType) -> bool:
+        # the argument is declared with the C type in the signature
+        return True
+
     def output_conversion(
         self, cpp_type: CppType, input_cpp_var: str, output_py_var: str
     ) -> Optional[str]:
@@ -378,6 +433,13 @@ class FloatConverter(TypeConverterBase):
     def type_check_expression(self, cpp_type: CppType, argument_var: str) -> str:
         return "isinstance(%s, float)" % (argument_var,)
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return self.type_check_expression(cpp_type, argument_var)
+
+    def typed_signature_part(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        # the conversion to the C type raises a TypeError for other types
+        return "%s %s" % (self.matching_python_type(cpp_type), argument_var)
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[str, str, str]:
@@ -386,6 +448,10 @@ class FloatConverter(TypeConverterBase):
         cleanup = ""
         return code, call_as, cleanup
 
+    def call_as_without_gil(self, cpp_type: CppType) -> bool:
+        # the argument is declared with the C type in the signature
+        return True
+
     def output_conversion(
         self, cpp_type: CppType, input_cpp_var: str, output_py_var: str
     ) -> Optional[str]:
@@ -393,9 +459,37 @@ class FloatConverter(TypeConverterBase):
 
 
 class EnumConverter(TypeConverterBase):
+    # unscoped enums with more values are checked with a range check or,
+    # if their values have gaps, with a frozenset
+    MAX_COMPARED_VALUES = 8
+
     def __init__(self, enum):
         self.enum = enum
 
+    @staticmethod
+    def python_name(enum) -> str:
+        """Name of the Python class of a scoped enum"""
+        if enum.cpp_decl.annotations.get("wrap-attach"):
+            return "_Py" + enum.name
+        return enum.name
+
+    @staticmethod
+    def value_range(enum) -> Optional[Tuple[int, int]]:
+        """(first, last) value of an enum without gaps in its values, else None"""
+        values = set(v for (__, v) in enum.items)
+        if values and len(values) == max(values) - min(values) + 1:
+            return min(values), max(values)
+        return None
+
+    @staticmethod
+    def lookup_name(enum) -> str:
+        """Name of the module level frozenset of the values of an unscoped
+        enum or of the _ScopedEnumLookup of a scoped enum, see
+        CodeGenerator.create_enum_lookups"""
+        if not enum.scoped:
+            return "_enum_values_" + enum.name
+        return "_scoped_enum_" + EnumConverter.python_name(enum)
+
     def get_base_types(self) -> List[str]:
         return [self.enum.name]
 
@@ -419,32 +513,36 @@ class EnumConverter(TypeConverterBase):
             return self.enum.name
 
     def type_check_expression(self, cpp_type: CppType, argument_var: str) -> str:
+        lookup = self.lookup_name(self.enum)
         if not self.enum.scoped:
-            values = ", ".join(str(v) for (__, v) in self.enum.items)
-            return "%s in [%s]" % (argument_var, values)
-        else:
-            if self.enum.cpp_decl.annotations.get("wrap-attach"):
-                if not self.enum.scoped:
-                    name = "__" + self.enum.name
-                else:
-                    name = "_Py" + self.enum.name
-            else:
-                name = self.enum.name
-            # FIX for cross-module scoped enum type checking in multi-module builds
-            # (e.g., pyOpenMS with _pyopenms_1.pyx through _pyopenms_8.pyx)
-            #
-            # Problem: Scoped enums (enum class) are wrapped as Python IntEnum classes
-            # (e.g., _PySpectrumType). When module A uses an enum defined in module B,
-            # the isinstance check needs access to that Python class.
-            #
-            # Solution: Use _get_scoped_enum_class() for cross-module lookup. This:
-            # - First checks the local module's registry (fast path for same-module enums)
-            # - Then searches all loaded pyopenms modules via sys.modules
-            # - Falls back to 'int' which works for IntEnum values (IntEnum inherits from int)
-            #
-            # See also: CodeGenerator.create_default_cimports() where the lookup function
-            # and registry are defined.
-            return "isinstance(%s, _get_scoped_enum_class('%s'))" % (argument_var, name)
+            if len(self.enum.items) <= self.MAX_COMPARED_VALUES:
+                # Cython compares with each value (a switch for C ints)
+                values = ", ".join(str(v) for (__, v) in self.enum.items)
+                return "%s in [%s]" % (argument_var, values)
+            # the helpers only compare integers (also e.g. numpy.int64), so
+            # other arguments do not raise in the comparisons or the lookup,
+            # see CodeGenerator.create_enum_lookups
+            values = self.value_range(self.enum)
+            if values is not None:
+                return "_enum_in_range(%s, %d, %d)" % (argument_var, values[0], values[1])
+            return "_enum_in_set(%s, %s)" % (argument_var, lookup)
+        # In multi-module builds (e.g., pyOpenMS with _pyopenms_1.pyx through
+        # _pyopenms_8.pyx) a scoped enum can be defined in another module,
+        # whose Python class can not be imported at module level without
+        # circular imports. The _ScopedEnumLookup resolves the class with
+        # _get_scoped_enum_class() on first use and caches it, until then
+        # it checks with _scoped_enum_fallback (int for IntEnum values, the
+        # value and __index__ of members of scoped_enum_type "cdef").
+        #
+        # See also: CodeGenerator.create_scoped_enum_helpers() where the lookup
+        # function and the registry are defined.
+        return "isinstance(%s, %s.get())" % (argument_var, lookup)
+
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        if not self.enum.scoped:
+            # plain enums accept any value comparing equal to an enum value
+            return None
+        return self.type_check_expression(cpp_type, argument_var)
 
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
@@ -464,14 +562,13 @@ class EnumConverter(TypeConverterBase):
         if not self.enum.scoped:
             return "%s = <int>%s" % (output_py_var, input_cpp_var)
         else:
-            # For scoped enums, wrap the int value in the Python enum class
-            # Use _get_scoped_enum_class() for cross-module lookup
-            # in multi-module builds (see type_check_expression for details)
-            if self.enum.cpp_decl.annotations.get("wrap-attach"):
-                name = "_Py" + self.enum.name
-            else:
-                name = self.enum.name
-            return "%s = _get_scoped_enum_class('%s', lambda x: x)(<int>%s)" % (output_py_var, name, input_cpp_var)
+            # For scoped enums, look up the member of the Python enum class
+            # (see type_check_expression for the lookup in multi-module builds)
+            return "%s = %s.member(<int>%s)" % (
+                output_py_var,
+                self.lookup_name(self.enum),
+                input_cpp_var,
+            )
 
 
 class CharConverter(TypeConverterBase):
@@ -493,6 +590,9 @@ class CharConverter(TypeConverterBase):
             argument_var,
         )
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "isinstance(%s, bytes)" % argument_var
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[str, str, str]:
@@ -526,6 +626,12 @@ class ConstCharPtrConverter(TypeConverterBase):
     def type_check_expression(self, cpp_type: CppType, argument_var: str) -> str:
         return "isinstance(%s, bytes)" % (argument_var,)
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return self.type_check_expression(cpp_type, argument_var)
+
+    def typed_signature_part(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "%s %s not None" % (self.matching_python_type(cpp_type), argument_var)
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[Code, str, str]:
@@ -561,6 +667,12 @@ class CharPtrConverter(TypeConverterBase):
     def type_check_expression(self, cpp_type: CppType, argument_var: str) -> str:
         return "isinstance(%s, bytes)" % (argument_var,)
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return self.type_check_expression(cpp_type, argument_var)
+
+    def typed_signature_part(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "%s %s not None" % (self.matching_python_type(cpp_type), argument_var)
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[str, str, str]:
@@ -598,6 +710,12 @@ class TypeToWrapConverter(TypeConverterBase):
     def type_check_expression(self, cpp_type: CppType, argument_var: str) -> str:
         return "isinstance(%s, %s)" % (argument_var, cpp_type.base_type)
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return self.type_check_expression(cpp_type, argument_var)
+
+    def typed_signature_part(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "%s %s not None" % (self.matching_python_type(cpp_type), argument_var)
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[str, str, str]:
@@ -631,28 +749,31 @@ class TypeToWrapConverter(TypeConverterBase):
                 |cdef $const $t * __r = ($cy_call_str)
                 |if __r == NULL:
                 |    return None
-                |cdef $t * _r = new $t(deref(__r))
+                |cdef shared_ptr[$t] _r = make_shared[$t](deref(__r))
                 """,
-                locals(),
+                const=const,
+                t=t,
+                cy_call_str=cy_call_str,
             )
             return code
 
-        return "cdef %s * _r = new %s(%s)" % (t, t, cy_call_str)
+        # a returned temporary is moved into the allocation of make_shared,
+        # which also holds the control block of the shared_ptr
+        return "cdef shared_ptr[%s] _r = make_shared[%s](%s)" % (t, t, cy_call_str)
+
+    def call_as_without_gil(self, cpp_type: CppType) -> bool:
+        # only accesses the C++ object held by the typed argument
+        return True
 
     def output_conversion(
         self, cpp_type: CppType, input_cpp_var: str, output_py_var: str
     ) -> Optional[Union[Code, str]]:
-        cy_clz = self.converters.cython_type(cpp_type)
-
-        # Need to ensure that type inside the raw ptr is an object and not a ref/ptr
-        if cpp_type.is_ptr or cpp_type.is_ref:
-            cy_clz = cy_clz.base_type
-
+        # call_method gives the shared_ptr _r for pointers, references and values
         t = cpp_type.base_type
         return Code().add(
             """
                       |cdef $t $output_py_var = $t.__new__($t)
-                      |$output_py_var.inst = shared_ptr[$cy_clz]($input_cpp_var)
+                      |$output_py_var.inst = $input_cpp_var
         """,
             locals(),
         )
@@ -706,6 +827,9 @@ class StdPairConverter(TypeConverterBase):
             .render()
         )
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "isinstance(%s, list)" % argument_var
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[Code, str, Code]:
@@ -749,7 +873,7 @@ class StdPairConverter(TypeConverterBase):
                 cleanup_code.add(
                     """
                     |cdef $t1 $temp1 = $t1.__new__($t1)
-                    |$temp1.inst = shared_ptr[$i1](new $i1($temp_var.first))
+                    |$temp1.inst = make_shared[$i1]($temp_var.first)
                                    """,
                     locals(),
                 )
@@ -760,7 +884,7 @@ class StdPairConverter(TypeConverterBase):
                 cleanup_code.add(
                     """
                     |cdef $t2 $temp2 = $t2.__new__($t2)
-                    |$temp2.inst = shared_ptr[$i2](new $i2($temp_var.second))
+                    |$temp2.inst = make_shared[$i2]($temp_var.second)
                                    """,
                     locals(),
                 )
@@ -802,7 +926,7 @@ class StdPairConverter(TypeConverterBase):
             out1 = "out1"
             code.add(
                 """cdef $t1 out1 = $t1.__new__($t1)
-                       |out1.inst = shared_ptr[$i1](new $i1($input_cpp_var.first))
+                       |out1.inst = make_shared[$i1]($input_cpp_var.first)
                        """,
                 locals(),
             )
@@ -820,7 +944,7 @@ class StdPairConverter(TypeConverterBase):
             out2 = "out2"
             code.add(
                 """cdef $t2 out2 = $t2.__new__($t2)
-                       |out2.inst = shared_ptr[$i2](new $i2($input_cpp_var.second))
+                       |out2.inst = make_shared[$i2]($input_cpp_var.second)
                        """,
                 locals(),
             )
@@ -878,6 +1002,9 @@ class StdMapConverter(TypeConverterBase):
             .render()
         )
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "isinstance(%s, dict)" % argument_var
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[Code, str, Union[Code, str]]:
@@ -1045,7 +1172,7 @@ class StdMapConverter(TypeConverterBase):
                     |cdef $py_tt_key $item_key
                     |while $it != $temp_var.end():
                     |   $item_key = $py_tt_key.__new__($py_tt_key)
-                    |   $item_key.inst = shared_ptr[$cy_tt_key](new $cy_tt_key((deref($it)).first))
+                    |   $item_key.inst = make_shared[$cy_tt_key]((deref($it)).first)
                     |   replace[$item_key] = $value_conv
                     |   inc($it)
                     |$argument_var.clear()
@@ -1069,7 +1196,7 @@ class StdMapConverter(TypeConverterBase):
                     |cdef $cy_tt $item
                     |while $it != $temp_var.end():
                     |   $item = $cy_tt.__new__($cy_tt)
-                    |   $item.inst = shared_ptr[$cy_tt_value](new $cy_tt_value((deref($it)).second))
+                    |   $item.inst = make_shared[$cy_tt_value]((deref($it)).second)
                     |   replace[$key_conv] = $item
                     |   inc($it)
                     |$argument_var.clear()
@@ -1096,9 +1223,9 @@ class StdMapConverter(TypeConverterBase):
                     |cdef $cy_tt $item_val
                     |while $it != $temp_var.end():
                     |   $item_key = $py_tt_key.__new__($py_tt_key)
-                    |   $item_key.inst = shared_ptr[$cy_tt_key](new $cy_tt_key((deref($it)).first))
+                    |   $item_key.inst = make_shared[$cy_tt_key]((deref($it)).first)
                     |   $item_val = $cy_tt.__new__($cy_tt)
-                    |   $item_val.inst = shared_ptr[$cy_tt_value](new $cy_tt_value((deref($it)).second))
+                    |   $item_val.inst = make_shared[$cy_tt_value]((deref($it)).second)
                     |   replace[$item_key] = $item_val
                     |   inc($it)
                     |$argument_var.clear()
@@ -1159,9 +1286,9 @@ class StdMapConverter(TypeConverterBase):
                 |cdef $cy_tt_val $item_val
                 |while $it != $input_cpp_var.end():
                 |   $item_key = $cy_tt_k.__new__($cy_tt_k)
-                |   $item_key.inst = shared_ptr[$cy_tt_key](new $cy_tt_key((deref($it)).first))
+                |   $item_key.inst = make_shared[$cy_tt_key]((deref($it)).first)
                 |   $item_val = $cy_tt_val.__new__($cy_tt_val)
-                |   $item_val.inst = shared_ptr[$cy_tt_value](new $cy_tt_value((deref($it)).second))
+                |   $item_val.inst = make_shared[$cy_tt_value]((deref($it)).second)
                 |   $output_py_var[$item_key] = $item_val
                 |   inc($it)
                 """,
@@ -1187,7 +1314,7 @@ class StdMapConverter(TypeConverterBase):
                 |cdef $cy_tt $item
                 |while $it != $input_cpp_var.end():
                 |   $item = $cy_tt.__new__($cy_tt)
-                |   $item.inst = shared_ptr[$cy_tt_value](new $cy_tt_value((deref($it)).second))
+                |   $item.inst = make_shared[$cy_tt_value]((deref($it)).second)
                 |   $output_py_var[$key_conv] = $item
                 |   inc($it)
                 """,
@@ -1205,7 +1332,7 @@ class StdMapConverter(TypeConverterBase):
                 |while $it != $input_cpp_var.end():
                 |   #$output_py_var[$key_conv] = $value_conv
                 |   $item_key = $py_tt_key.__new__($py_tt_key)
-                |   $item_key.inst = shared_ptr[$cy_tt_key](new $cy_tt_key((deref($it)).first))
+                |   $item_key.inst = make_shared[$cy_tt_key]((deref($it)).first)
                 |   # $output_py_var[$key_conv] = $value_conv
                 |   $output_py_var[$item_key] = $value_conv
                 |   inc($it)
@@ -1326,6 +1453,9 @@ class StdSetConverter(TypeConverterBase):
             .render()
         )
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "isinstance(%s, set)" % argument_var
+
     def _has_delegating_converter(self, element_type: CppType) -> bool:
         """Check if element type has a converter that supports delegation."""
         if not hasattr(self, "cr"):
@@ -1626,6 +1756,27 @@ class StdVectorConverter(TypeConverterBase):
             .render()
         )
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "isinstance(%s, list)" % argument_var
+
+    def typed_signature_part(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        (tt,) = cpp_type.template_args
+        if self.converters.cython_type(tt).is_enum:
+            # the values of enums are not checked when converting
+            return None
+        if tt.base_type in self.converters.names_of_wrapper_classes:
+            # the conversion loop checks the type of each element
+            return "list %s not None" % argument_var
+        if tt.base_type == "shared_ptr" or self._has_delegating_converter(tt):
+            return None
+        if set(self.converters.names_of_wrapper_classes) & set(tt.all_occuring_base_types()):
+            return None
+        inner_conv = self.converters.get(tt)
+        if inner_conv.typed_signature_part(tt, "x") is None:
+            return None
+        # the elements are checked by Cython when converting the list
+        return "list %s not None" % argument_var
+
     def _prepare_nonrecursive_cleanup(
         self, cpp_type, bottommost_code, it_prev, temp_var, recursion_cnt, *a, **kw
     ):
@@ -1970,9 +2121,26 @@ class StdVectorConverter(TypeConverterBase):
                 do_deref = ""
 
             instantiation = self._code_for_instantiate_object_from_iter(inner, it)
-            code = self._prepare_nonrecursive_precall(
-                topmost_code, cpp_type, code_top, do_deref, locals()
-            )
+            if topmost_code is None:
+                # check each element while converting, so the list is only
+                # traversed once
+                elem = "elem%s" % arg_num
+                code = Code().add(
+                    code_top
+                    + """
+                    |for $elem in $argument_var:
+                    |    if not isinstance($elem, $base_type):
+                    |        del $temp_var
+                    |        raise TypeError('arg $argument_var wrong type')
+                    |    $item = <$base_type>$elem
+                    |    $temp_var.push_back($do_deref($item.inst.get()))
+                    """,
+                    locals(),
+                )
+            else:
+                code = self._prepare_nonrecursive_precall(
+                    topmost_code, cpp_type, code_top, do_deref, locals()
+                )
             cleanup_code = self._prepare_nonrecursive_cleanup(
                 cpp_type, bottommost_code, it_prev, temp_var, recursion_cnt, locals()
             )
@@ -2188,6 +2356,10 @@ class StdVectorConverter(TypeConverterBase):
 
         return "_r = %s" % (cy_call_str)
 
+    def call_as_without_gil(self, cpp_type: CppType) -> bool:
+        # the C++ vector is built before the call
+        return True
+
     def output_conversion(self, cpp_type: CppType, input_cpp_var: str, output_py_var: str) -> Code:
         (tt,) = cpp_type.template_args
         inner = self.converters.cython_type(tt)
@@ -2308,8 +2480,11 @@ class StdVectorAsNumpyConverter(TypeConverterBase):
       - For non-const refs: Returns writable view
       - Memory view automatically keeps owner alive
     - For value returns: Uses ArrayWrapper with buffer protocol (single copy via swap)
-    - For inputs: Accepts numpy arrays, creates temporary C++ vector
-    - Supports nested vectors for 2D arrays
+    - For inputs: Accepts numpy arrays and other buffers, creates temporary
+      C++ vector (memcpy for C-contiguous arrays of the right dtype, others
+      are converted by numpy first, but only if no values are lost)
+    - Supports nested vectors for 2D arrays, copied row by row with memcpy
+      without the GIL; rows of different lengths are returned as list of 1D arrays
     - Uses fast memcpy for efficient data transfer
     
     Usage in PXD:
@@ -2389,21 +2564,12 @@ class StdVectorAsNumpyConverter(TypeConverterBase):
     
     def matching_python_type(self, cpp_type: CppType) -> str:
         """Return Cython type for function signature.
-        
-        Use proper numpy.ndarray type annotations that Cython understands.
-        This ensures only numpy arrays are accepted, not lists.
+
+        The argument is untyped, so that besides numpy arrays any object
+        supporting the buffer protocol is accepted (see type_check_expression),
+        these are converted by input_conversion.
         """
-        (tt,) = cpp_type.template_args
-        
-        if self._is_nested_vector(cpp_type):
-            # For 2D arrays
-            (inner_tt,) = tt.template_args
-            dtype = self._get_numpy_dtype(inner_tt)
-            return f"numpy.ndarray[numpy.{dtype}_t, ndim=2]"
-        else:
-            # For 1D arrays
-            dtype = self._get_numpy_dtype(tt)
-            return f"numpy.ndarray[numpy.{dtype}_t, ndim=1]"
+        return ""
     
     def matching_python_type_full(self, cpp_type: CppType) -> str:
         """Return type hint for type checkers (for docstrings).
@@ -2423,17 +2589,24 @@ class StdVectorAsNumpyConverter(TypeConverterBase):
             return f"numpy.ndarray[numpy.{dtype}_t, ndim=1]"
     
     def type_check_expression(self, cpp_type: CppType, argument_var: str) -> str:
-        """Check if argument is a numpy array (strict - no lists)."""
-        # Only accept numpy arrays, not lists or other array-like objects
-        return f"isinstance({argument_var}, numpy.ndarray)"
+        """Check if argument is a numpy array or another buffer (no lists)."""
+        # Only accept numpy arrays and buffers (e.g. memoryview, array.array),
+        # not lists or other array-like objects
+        return (
+            f"isinstance({argument_var}, numpy.ndarray) or PyObject_CheckBuffer({argument_var})"
+        )
     
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return self.type_check_expression(cpp_type, argument_var)
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[Code, str, Union[Code, str]]:
         """Convert numpy array to C++ vector for input parameters.
-        
-        The argument is already guaranteed to be a numpy array with the correct type
-        thanks to Cython's type annotation, so we don't need to call asarray().
+
+        The argument (a numpy array or another buffer) is converted to a numpy
+        array of the dtype of the vector by _numpy_input (see
+        ArrayWrappers.pyx), which raises if values would be lost.
         """
         (tt,) = cpp_type.template_args
         temp_var = "v%d" % arg_num
@@ -2444,17 +2617,45 @@ class StdVectorAsNumpyConverter(TypeConverterBase):
             inner_type = self.converters.cython_type(inner_tt)
             outer_inner_type = self.converters.cython_type(tt)
             dtype = self._get_numpy_dtype(inner_tt)
-            
+            ctype = self.CTYPE_MAP.get(dtype, "double")
+
+            if dtype != "bool_":
+                # rows are copied with memcpy if they are contiguous, vector<bool>
+                # has no data() and is handled below
+                code = Code().add(
+                    """
+                    |# Convert 2D numpy array to nested C++ vector (memcpy for contiguous rows)
+                    |cdef const $ctype[:, :] mv_$arg_num = _numpy_input($argument_var, numpy.$dtype, False)
+                    |cdef libcpp_vector[$outer_inner_type] * $temp_var = new libcpp_vector[$outer_inner_type](<size_t>mv_$arg_num.shape[0])
+                    |cdef size_t n_cols_$arg_num = mv_$arg_num.shape[1]
+                    |cdef size_t i_$arg_num, j_$arg_num
+                    |with nogil:
+                    |    for i_$arg_num in range(<size_t>mv_$arg_num.shape[0]):
+                    |        deref($temp_var)[i_$arg_num].resize(n_cols_$arg_num)
+                    |        if n_cols_$arg_num == 0:
+                    |            continue
+                    |        if mv_$arg_num.strides[1] == sizeof($ctype):
+                    |            memcpy(deref($temp_var)[i_$arg_num].data(), &mv_$arg_num[i_$arg_num, 0], n_cols_$arg_num * sizeof($ctype))
+                    |        else:
+                    |            for j_$arg_num in range(n_cols_$arg_num):
+                    |                deref($temp_var)[i_$arg_num][j_$arg_num] = mv_$arg_num[i_$arg_num, j_$arg_num]
+                    """,
+                    locals(),
+                )
+                cleanup = "del %s" % temp_var
+                return code, "deref(%s)" % temp_var, cleanup
+
             code = Code().add(
                 """
                 |# Convert 2D numpy array to nested C++ vector
+                |arr_$arg_num = _numpy_input($argument_var, numpy.$dtype, False)
                 |cdef libcpp_vector[$outer_inner_type] * $temp_var = new libcpp_vector[$outer_inner_type]()
                 |cdef size_t i_$arg_num, j_$arg_num
                 |cdef libcpp_vector[$inner_type] row_$arg_num
-                |for i_$arg_num in range($argument_var.shape[0]):
+                |for i_$arg_num in range(arr_$arg_num.shape[0]):
                 |    row_$arg_num = libcpp_vector[$inner_type]()
-                |    for j_$arg_num in range($argument_var.shape[1]):
-                |        row_$arg_num.push_back(<$inner_type>$argument_var[i_$arg_num, j_$arg_num])
+                |    for j_$arg_num in range(arr_$arg_num.shape[1]):
+                |        row_$arg_num.push_back(<$inner_type>arr_$arg_num[i_$arg_num, j_$arg_num])
                 |    $temp_var.push_back(row_$arg_num)
                 """,
                 dict(
@@ -2470,19 +2671,39 @@ class StdVectorAsNumpyConverter(TypeConverterBase):
             return code, "deref(%s)" % temp_var, cleanup
         else:
             # Handle simple vectors (1D arrays)
-            # No need for asarray() - Cython already ensures correct type
+            # _numpy_input returns the array itself if it is contiguous and of
+            # the right dtype, other arrays are converted in one step
             inner_type = self.converters.cython_type(tt)
             dtype = self._get_numpy_dtype(tt)
             ctype = self.CTYPE_MAP.get(dtype, "double")
-            
+
+            if dtype == "bool_":
+                # vector<bool> has no data(), copy element by element
+                code = Code().add(
+                    """
+                    |# Convert 1D numpy array to C++ vector
+                    |cdef const uint8_t[::1] mv_$arg_num = _numpy_input($argument_var, numpy.bool_).view(numpy.uint8)
+                    |cdef libcpp_vector[$inner_type] * $temp_var = new libcpp_vector[$inner_type](<size_t>mv_$arg_num.shape[0])
+                    |cdef size_t i_$arg_num
+                    |for i_$arg_num in range(<size_t>mv_$arg_num.shape[0]):
+                    |    deref($temp_var)[i_$arg_num] = mv_$arg_num[i_$arg_num] != 0
+                    """,
+                    locals(),
+                )
+                cleanup = "del %s" % temp_var
+                return code, "deref(%s)" % temp_var, cleanup
+
             code = Code().add(
                 """
-                |# Convert 1D numpy array to C++ vector (fast memcpy)
+                |# Convert 1D numpy array to C++ vector (fast memcpy), strided arrays
+                |# and other dtypes are converted by numpy first
+                |cdef const $ctype[::1] mv_$arg_num = _numpy_input($argument_var, numpy.$dtype)
                 |cdef libcpp_vector[$inner_type] * $temp_var = new libcpp_vector[$inner_type]()
-                |cdef size_t n_$arg_num = $argument_var.shape[0]
+                |cdef size_t n_$arg_num = mv_$arg_num.shape[0]
                 |$temp_var.resize(n_$arg_num)
                 |if n_$arg_num > 0:
-                |    memcpy($temp_var.data(), <void*>numpy.PyArray_DATA($argument_var), n_$arg_num * sizeof($ctype))
+                |    with nogil:
+                |        memcpy($temp_var.data(), &mv_$arg_num[0], n_$arg_num * sizeof($ctype))
                 """,
                 dict(
                     argument_var=argument_var,
@@ -2549,6 +2770,10 @@ class StdVectorAsNumpyConverter(TypeConverterBase):
         }
         return type_map.get(cpp_type.base_type, "NPY_FLOAT64")
     
+    def call_as_without_gil(self, cpp_type: CppType) -> bool:
+        # the C++ vector is built before the call
+        return True
+
     def output_conversion(
         self, cpp_type: CppType, input_cpp_var: str, output_py_var: str
     ) -> Optional[Code]:
@@ -2566,9 +2791,55 @@ class StdVectorAsNumpyConverter(TypeConverterBase):
             # Handle nested vectors (2D arrays) - always copy for now
             (inner_tt,) = tt.template_args
             inner_type = self.converters.cython_type(inner_tt)
+            outer_inner_type = self.converters.cython_type(tt)
             dtype = self._get_numpy_dtype(inner_tt)
             ctype = self.CTYPE_MAP.get(dtype, "double")
-            
+
+            if dtype != "bool_":
+                # for references call_method gives a pointer
+                if cpp_type.is_ref:
+                    rows_ptr = input_cpp_var
+                else:
+                    rows_ptr = "address(%s)" % input_cpp_var
+                const = "const " if cpp_type.is_const else ""
+                code = Code().add(
+                    """
+                    |# Convert nested C++ vector to 2D numpy array (memcpy per row), rows
+                    |# of different lengths give a list of 1D arrays
+                    |cdef $const libcpp_vector[$outer_inner_type] * rows_$output_py_var = $rows_ptr
+                    |cdef size_t n_rows_$output_py_var = rows_$output_py_var.size()
+                    |cdef size_t n_cols_$output_py_var = deref(rows_$output_py_var)[0].size() if n_rows_$output_py_var > 0 else 0
+                    |cdef size_t i_$output_py_var, n_$output_py_var
+                    |cdef bint ragged_$output_py_var = False
+                    |for i_$output_py_var in range(n_rows_$output_py_var):
+                    |    if deref(rows_$output_py_var)[i_$output_py_var].size() != n_cols_$output_py_var:
+                    |        ragged_$output_py_var = True
+                    |        break
+                    |cdef $ctype[:, ::1] mv_$output_py_var
+                    |cdef $ctype[::1] row_mv_$output_py_var
+                    |cdef object row_$output_py_var
+                    |cdef object $output_py_var
+                    |if not ragged_$output_py_var:
+                    |    $output_py_var = numpy.empty((n_rows_$output_py_var, n_cols_$output_py_var), dtype=numpy.$dtype)
+                    |    if n_cols_$output_py_var > 0:
+                    |        mv_$output_py_var = $output_py_var
+                    |        with nogil:
+                    |            for i_$output_py_var in range(n_rows_$output_py_var):
+                    |                memcpy(&mv_$output_py_var[i_$output_py_var, 0], deref(rows_$output_py_var)[i_$output_py_var].data(), n_cols_$output_py_var * sizeof($ctype))
+                    |else:
+                    |    $output_py_var = []
+                    |    for i_$output_py_var in range(n_rows_$output_py_var):
+                    |        n_$output_py_var = deref(rows_$output_py_var)[i_$output_py_var].size()
+                    |        row_$output_py_var = numpy.empty(n_$output_py_var, dtype=numpy.$dtype)
+                    |        if n_$output_py_var > 0:
+                    |            row_mv_$output_py_var = row_$output_py_var
+                    |            memcpy(&row_mv_$output_py_var[0], deref(rows_$output_py_var)[i_$output_py_var].data(), n_$output_py_var * sizeof($ctype))
+                    |        $output_py_var.append(row_$output_py_var)
+                    """,
+                    locals(),
+                )
+                return code
+
             code = Code().add(
                 """
                 |# Convert nested C++ vector to 2D numpy array (copy)
@@ -2645,12 +2916,26 @@ class StdVectorAsNumpyConverter(TypeConverterBase):
                     )
                 return code
             else:
-                # Value return - use owning wrapper (data is already a copy via move/swap)
+                # Value return - use owning wrapper (data is already a copy via move/swap),
+                # the vector is handed over in C++ instead of calling the def method
+                # set_data, which would convert it to a Python list and back
+                # element type of the vector in the ArrayWrapper, e.g. int32_t for Int32
+                wrapper_type = {"Float": "float", "Double": "double"}.get(
+                    wrapper_suffix, wrapper_suffix.lower() + "_t"
+                )
+                if str(inner_type) == wrapper_type:
+                    fill = "|_wrapper_$output_py_var.vec.swap($input_cpp_var)"
+                else:
+                    # e.g. int and int32_t are different types for Cython
+                    fill = """|with nogil:
+                    |    _wrapper_$output_py_var.vec.assign($input_cpp_var.begin(), $input_cpp_var.end())"""
                 code = Code().add(
                     """
                     |# Convert C++ vector to numpy array using owning wrapper (data already copied)
                     |cdef ArrayWrapper$wrapper_suffix _wrapper_$output_py_var = ArrayWrapper$wrapper_suffix()
-                    |_wrapper_$output_py_var.set_data($input_cpp_var)
+                    """
+                    + fill
+                    + """
                     |cdef object $output_py_var = numpy.asarray(_wrapper_$output_py_var)
                     """,
                     dict(
@@ -2662,6 +2947,224 @@ class StdVectorAsNumpyConverter(TypeConverterBase):
                 return code
 
 
+class ArrayViewConverter(TypeConverterBase):
+    """
+    Converter for AutowrapArrayView - passes numpy arrays to C++ without
+    copying.
+
+    AutowrapArrayView<T> (see autowrap_tools.hpp) is a read-only pointer and
+    length pair. The C++ function is called with a view of the data of the
+    array, which must be one-dimensional, C-contiguous and of exactly the
+    matching dtype, otherwise a ValueError is raised. The view is only valid
+    during the call. Return values of this type are not supported.
+
+    Usage in PXD:
+        from AutowrapArrayView cimport AutowrapArrayView
+
+        cdef extern from "mylib.hpp":
+            cdef cppclass MyClass:
+                double sum(AutowrapArrayView[double] data)
+
+    with the C++ signature
+        double sum(autowrap::AutowrapArrayView<double> data);
+    """
+
+    def get_base_types(self) -> List[str]:
+        return ["AutowrapArrayView"]
+
+    def _dtype(self, cpp_type: CppType) -> Optional[str]:
+        (tt,) = cpp_type.template_args
+        name = tt.base_type
+        if tt.is_unsigned:
+            name = "unsigned " + name
+        return StdVectorAsNumpyConverter.NUMPY_DTYPE_MAP.get(name)
+
+    def matches(self, cpp_type: CppType) -> bool:
+        (tt,) = cpp_type.template_args
+        dtype = self._dtype(cpp_type)
+        return dtype is not None and dtype != "bool_" and not tt.template_args
+
+    def matching_python_type(self, cpp_type: CppType) -> str:
+        return ""
+
+    def matching_python_type_full(self, cpp_type: CppType) -> str:
+        dtype = self._dtype(cpp_type)
+        return f"numpy.ndarray[numpy.{dtype}_t, ndim=1]"
+
+    def type_check_expression(self, cpp_type: CppType, argument_var: str) -> str:
+        # dtype and contiguity are checked by the memoryview in input_conversion
+        return f"isinstance({argument_var}, numpy.ndarray)"
+
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return self.type_check_expression(cpp_type, argument_var)
+
+    def input_conversion(
+        self, cpp_type: CppType, argument_var: str, arg_num: int
+    ) -> Tuple[Code, str, Union[Code, str]]:
+        (tt,) = cpp_type.template_args
+        inner = self.converters.cython_type(tt)
+        dtype = self._dtype(cpp_type)
+        ctype = StdVectorAsNumpyConverter.CTYPE_MAP[dtype]
+        # make_array_view deduces the element type from the pointer, as Cython
+        # can not parse AutowrapArrayView[unsigned int](...). The pointer is
+        # not const, otherwise the view would be AutowrapArrayView[const T].
+        code = Code().add(
+            """
+            |# View of the numpy array, raises ValueError for other dtypes or strides
+            |cdef const $ctype[::1] mv_$arg_num = $argument_var
+            |cdef $inner * ptr_$arg_num = NULL
+            |if mv_$arg_num.shape[0] > 0:
+            |    ptr_$arg_num = <$inner *>&mv_$arg_num[0]
+            """,
+            locals(),
+        )
+        call_as = "make_array_view(ptr_%d, <size_t>mv_%d.shape[0])" % (arg_num, arg_num)
+        return code, call_as, ""
+
+    def call_as_without_gil(self, cpp_type: CppType) -> bool:
+        # pointer and length of the memoryview
+        return True
+
+    def output_conversion(
+        self, cpp_type: CppType, input_cpp_var: str, output_py_var: str
+    ) -> Optional[Code]:
+        raise Exception("AutowrapArrayView is only supported for arguments, not for %s" % cpp_type)
+
+
+class StdVectorAsViewConverter(TypeConverterBase):
+    """
+    Converter for libcpp_vector_as_view - returns std::vector<T> of wrapped
+    classes as a sequence object which owns the C++ vector.
+
+    The elements are only created on access and share the ownership of the
+    vector (aliasing shared_ptr), so no element is copied and changes of an
+    element are visible in the sequence. For inputs such a sequence is passed
+    without copying, lists of wrapped objects are accepted as well.
+
+    The sequence classes are created by the CodeGenerator for all element
+    types used with libcpp_vector_as_view, see view_class_name.
+
+    Usage in PXD:
+        from libcpp.vector cimport vector as libcpp_vector_as_view
+
+        cdef extern from "mylib.hpp":
+            cdef cppclass MyClass:
+                libcpp_vector_as_view[Peak] getPeaks()
+                void setPeaks(libcpp_vector_as_view[Peak] peaks)
+    """
+
+    def get_base_types(self) -> List[str]:
+        return ["libcpp_vector_as_view"]
+
+    def matches(self, cpp_type: CppType) -> bool:
+        (tt,) = cpp_type.template_args
+        return (
+            tt.base_type in self.converters.names_of_wrapper_classes
+            and not tt.is_ptr
+            and not tt.template_args
+        )
+
+    @staticmethod
+    def view_class_name(element_type: CppType) -> str:
+        return "_%sVectorView" % element_type.base_type
+
+    def matching_python_type(self, cpp_type: CppType) -> str:
+        return ""
+
+    def matching_python_type_full(self, cpp_type: CppType) -> str:
+        (tt,) = cpp_type.template_args
+        return "Sequence[%s]" % tt.base_type
+
+    def type_check_expression(self, cpp_type: CppType, argument_var: str) -> str:
+        (tt,) = cpp_type.template_args
+        view = self.view_class_name(tt)
+        return (
+            "isinstance(%s, %s) or (isinstance(%s, list) and all(isinstance(li, %s) for li in %s))"
+            % (argument_var, view, argument_var, tt.base_type, argument_var)
+        )
+
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        (tt,) = cpp_type.template_args
+        return "isinstance(%s, (%s, list))" % (argument_var, self.view_class_name(tt))
+
+    def input_conversion(
+        self, cpp_type: CppType, argument_var: str, arg_num: int
+    ) -> Tuple[Code, str, Union[Code, str]]:
+        (tt,) = cpp_type.template_args
+        inner = self.converters.cython_type(tt)
+        py_tt = tt.base_type
+        view = self.view_class_name(tt)
+        temp_var = "v%d" % arg_num
+        item = "item%d" % arg_num
+        if cpp_type.is_ref and not cpp_type.is_const:
+            # the elements handed out by a view refer to its vector, so a
+            # vector which may be resized is a copy which replaces the
+            # vector of the view afterwards
+            code = Code().add(
+                """
+                |cdef shared_ptr[libcpp_vector[$inner]] $temp_var
+                |cdef $py_tt $item
+                |if isinstance($argument_var, $view):
+                |    $temp_var = shared_ptr[libcpp_vector[$inner]](
+                |        new libcpp_vector[$inner](deref((<$view>$argument_var).vec.get())))
+                |else:
+                """,
+                locals(),
+            )
+            cleanup = Code().add(
+                """
+                |if isinstance($argument_var, $view):
+                |    (<$view>$argument_var).vec = $temp_var
+                |else:
+                |    $argument_var[:] = $view._create($temp_var)
+                """,
+                locals(),
+            )
+        else:
+            code = Code().add(
+                """
+                |cdef shared_ptr[libcpp_vector[$inner]] $temp_var
+                |cdef $py_tt $item
+                |if isinstance($argument_var, $view):
+                |    $temp_var = (<$view>$argument_var).vec
+                |else:
+                """,
+                locals(),
+            )
+            cleanup = ""
+        code.add(
+            """
+            |    $temp_var = shared_ptr[libcpp_vector[$inner]](new libcpp_vector[$inner]())
+            |    $temp_var.get().reserve(len($argument_var))
+            |    for $item in $argument_var:
+            |        $temp_var.get().push_back(deref($item.inst.get()))
+            """,
+            locals(),
+        )
+        return code, "deref(%s.get())" % temp_var, cleanup
+
+    def call_method(self, res_type: CppType, cy_call_str: str, with_const: bool = True) -> str:
+        t = self.converters.cython_type(res_type)
+        if t.is_ptr:
+            cy_call_str = "deref(%s)" % cy_call_str
+        (tt,) = t.template_args
+        return "cdef libcpp_vector[%s] _r = %s" % (tt, cy_call_str)
+
+    def output_conversion(self, cpp_type: CppType, input_cpp_var: str, output_py_var: str) -> Code:
+        (tt,) = cpp_type.template_args
+        inner = self.converters.cython_type(tt)
+        view = self.view_class_name(tt)
+        vec = "vec_" + output_py_var
+        return Code().add(
+            """
+            |cdef shared_ptr[libcpp_vector[$inner]] $vec = shared_ptr[libcpp_vector[$inner]](new libcpp_vector[$inner]())
+            |$vec.get().swap($input_cpp_var)
+            |cdef $view $output_py_var = $view._create($vec)
+            """,
+            locals(),
+        )
+
+
 class StdStringConverter(TypeConverterBase):
     """
     This converter deals with functions that expect/return a C++ std::string.
@@ -2695,6 +3198,12 @@ class StdStringConverter(TypeConverterBase):
     def type_check_expression(self, cpp_type: CppType, argument_var: str) -> str:
         return "isinstance(%s, bytes)" % argument_var
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return self.type_check_expression(cpp_type, argument_var)
+
+    def typed_signature_part(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "%s %s not None" % (self.matching_python_type(cpp_type), argument_var)
+
     def output_conversion(
         self, cpp_type: CppType, input_cpp_var: str, output_py_var: str
     ) -> Optional[str]:
@@ -2749,6 +3258,11 @@ class StdStringUnicodeConverter(StdStringConverter):
     def type_check_expression(self, cpp_type: CppType, argument_var: str) -> str:
         return "isinstance(%s, (bytes, str))" % argument_var
 
+    def typed_signature_part(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        # the argument can not be typed, but the conversion to libcpp_string
+        # raises a TypeError for anything but bytes once str is encoded
+        return argument_var
+
 
 class StdStringUnicodeOutputConverter(StdStringUnicodeConverter):
     """
@@ -2831,6 +3345,9 @@ class SharedPtrConverter(TypeConverterBase):
         (tt,) = cpp_type.template_args
         return "isinstance(%s, %s)" % (argument_var, tt)
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return self.type_check_expression(cpp_type, argument_var)
+
     def output_conversion(self, cpp_type: CppType, input_cpp_var: str, output_py_var: str) -> Code:
         # L.info("Output conversion for %s" % (cpp_type))
         (tt,) = cpp_type.template_args
@@ -2935,6 +3452,9 @@ class StdUnorderedMapConverter(TypeConverterBase):
             .render()
         )
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "isinstance(%s, dict)" % argument_var
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[Code, str, Union[Code, str]]:
@@ -3019,7 +3539,7 @@ class StdUnorderedMapConverter(TypeConverterBase):
                     |cdef $py_tt_key $item_key
                     |while $it != $temp_var.end():
                     |   $item_key = $py_tt_key.__new__($py_tt_key)
-                    |   $item_key.inst = shared_ptr[$cy_tt_key](new $cy_tt_key((deref($it)).first))
+                    |   $item_key.inst = make_shared[$cy_tt_key]((deref($it)).first)
                     |   replace[$item_key] = $value_conv_out
                     |   inc($it)
                     |$argument_var.clear()
@@ -3043,7 +3563,7 @@ class StdUnorderedMapConverter(TypeConverterBase):
                     |cdef $cy_tt $item
                     |while $it != $temp_var.end():
                     |   $item = $cy_tt.__new__($cy_tt)
-                    |   $item.inst = shared_ptr[$cy_tt_value](new $cy_tt_value((deref($it)).second))
+                    |   $item.inst = make_shared[$cy_tt_value]((deref($it)).second)
                     |   replace[$key_conv_out] = $item
                     |   inc($it)
                     |$argument_var.clear()
@@ -3069,9 +3589,9 @@ class StdUnorderedMapConverter(TypeConverterBase):
                     |cdef $cy_tt $item_val
                     |while $it != $temp_var.end():
                     |   $item_key = $py_tt_key.__new__($py_tt_key)
-                    |   $item_key.inst = shared_ptr[$cy_tt_key](new $cy_tt_key((deref($it)).first))
+                    |   $item_key.inst = make_shared[$cy_tt_key]((deref($it)).first)
                     |   $item_val = $cy_tt.__new__($cy_tt)
-                    |   $item_val.inst = shared_ptr[$cy_tt_value](new $cy_tt_value((deref($it)).second))
+                    |   $item_val.inst = make_shared[$cy_tt_value]((deref($it)).second)
                     |   replace[$item_key] = $item_val
                     |   inc($it)
                     |$argument_var.clear()
@@ -3132,9 +3652,9 @@ class StdUnorderedMapConverter(TypeConverterBase):
                 |cdef $cy_tt_val $item_val
                 |while $it != $input_cpp_var.end():
                 |   $item_key = $cy_tt_k.__new__($cy_tt_k)
-                |   $item_key.inst = shared_ptr[$cy_tt_key](new $cy_tt_key((deref($it)).first))
+                |   $item_key.inst = make_shared[$cy_tt_key]((deref($it)).first)
                 |   $item_val = $cy_tt_val.__new__($cy_tt_val)
-                |   $item_val.inst = shared_ptr[$cy_tt_value](new $cy_tt_value((deref($it)).second))
+                |   $item_val.inst = make_shared[$cy_tt_value]((deref($it)).second)
                 |   $output_py_var[$item_key] = $item_val
                 |   inc($it)
                 """,
@@ -3153,7 +3673,7 @@ class StdUnorderedMapConverter(TypeConverterBase):
                 |cdef $py_tt_key $item_key
                 |while $it != $input_cpp_var.end():
                 |   $item_key = $py_tt_key.__new__($py_tt_key)
-                |   $item_key.inst = shared_ptr[$cy_tt_key](new $cy_tt_key((deref($it)).first))
+                |   $item_key.inst = make_shared[$cy_tt_key]((deref($it)).first)
                 |   $output_py_var[$item_key] = $value_conv
                 |   inc($it)
                 """,
@@ -3176,7 +3696,7 @@ class StdUnorderedMapConverter(TypeConverterBase):
                 |cdef $cy_tt $item
                 |while $it != $input_cpp_var.end():
                 |   $item = $cy_tt.__new__($cy_tt)
-                |   $item.inst = shared_ptr[$cy_tt_value](new $cy_tt_value((deref($it)).second))
+                |   $item.inst = make_shared[$cy_tt_value]((deref($it)).second)
                 |   $output_py_var[$key_conv] = $item
                 |   inc($it)
                 """,
@@ -3317,6 +3837,9 @@ class StdUnorderedSetConverter(TypeConverterBase):
             .render()
         )
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "isinstance(%s, set)" % argument_var
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[Code, str, Union[Code, str]]:
@@ -3377,7 +3900,7 @@ class StdUnorderedSetConverter(TypeConverterBase):
                     |cdef $cy_tt $item_out
                     |while $it != $temp_var.end():
                     |   $item_out = $cy_tt.__new__($cy_tt)
-                    |   $item_out.inst = shared_ptr[$inner](new $inner(deref($it)))
+                    |   $item_out.inst = make_shared[$inner](deref($it))
                     |   replace.add($item_out)
                     |   inc($it)
                     |$argument_var.clear()
@@ -3520,7 +4043,7 @@ class StdUnorderedSetConverter(TypeConverterBase):
                 |cdef $cy_tt $item
                 |while $it != $input_cpp_var.end():
                 |   $item = $cy_tt.__new__($cy_tt)
-                |   $item.inst = shared_ptr[$inner](new $inner(deref($it)))
+                |   $item.inst = make_shared[$inner](deref($it))
                 |   $output_py_var.add($item)
                 |   inc($it)
                 """,
@@ -3622,6 +4145,9 @@ class StdDequeConverter(TypeConverterBase):
             .render()
         )
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "isinstance(%s, list)" % argument_var
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[Code, str, Union[Code, str]]:
@@ -3716,7 +4242,7 @@ class StdDequeConverter(TypeConverterBase):
                 |cdef $cy_tt $item
                 |for i in range($input_cpp_var.size()):
                 |   $item = $cy_tt.__new__($cy_tt)
-                |   $item.inst = shared_ptr[$inner](new $inner($input_cpp_var.at(i)))
+                |   $item.inst = make_shared[$inner]($input_cpp_var.at(i))
                 |   $output_py_var.append($item)
                 """,
                 locals(),
@@ -3786,6 +4312,9 @@ class StdListConverter(TypeConverterBase):
             .render()
         )
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return "isinstance(%s, list)" % argument_var
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[Code, str, Union[Code, str]]:
@@ -3892,7 +4421,7 @@ class StdListConverter(TypeConverterBase):
                 |cdef $cy_tt $item
                 |while $it != $input_cpp_var.end():
                 |   $item = $cy_tt.__new__($cy_tt)
-                |   $item.inst = shared_ptr[$inner](new $inner(deref($it)))
+                |   $item.inst = make_shared[$inner](deref($it))
                 |   $output_py_var.append($item)
                 |   inc($it)
                 """,
@@ -3963,6 +4492,14 @@ class StdOptionalConverter(TypeConverterBase):
         inner_check = inner_conv.type_check_expression(tt, arg_var)
         return "(%s is None or %s)" % (arg_var, inner_check)
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        (tt,) = cpp_type.template_args
+        inner_conv = self.converters.get(tt)
+        inner_check = inner_conv.type_only_check_expression(tt, argument_var)
+        if inner_check is None:
+            return None
+        return "(%s is None or %s)" % (argument_var, inner_check)
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[Code, str, Union[Code, str]]:
@@ -4004,7 +4541,7 @@ class StdOptionalConverter(TypeConverterBase):
                 """
                 |if $input_cpp_var.has_value():
                 |   $output_py_var = $cy_tt.__new__($cy_tt)
-                |   $output_py_var.inst = shared_ptr[$inner](new $inner($input_cpp_var.value()))
+                |   $output_py_var.inst = make_shared[$inner]($input_cpp_var.value())
                 |else:
                 |   $output_py_var = None
                 """,
@@ -4063,6 +4600,9 @@ class StdStringViewConverter(TypeConverterBase):
     def type_check_expression(self, cpp_type: CppType, arg_var: str) -> str:
         return "isinstance(%s, (bytes, str))" % arg_var
 
+    def type_only_check_expression(self, cpp_type: CppType, argument_var: str) -> Optional[str]:
+        return self.type_check_expression(cpp_type, argument_var)
+
     def input_conversion(
         self, cpp_type: CppType, argument_var: str, arg_num: int
     ) -> Tuple[Code, str, Union[Code, str]]:
@@ -4096,10 +4636,16 @@ class ConverterRegistry(object):
     then call .matches on them to find the finally matching converters
 
     Therefore TypeConverterBase has methods .get_base_types and .matches
+
+    The result of this lookup is cached per type (including failed lookups),
+    the cache is cleared whenever a new converter is registered.
     """
 
     def __init__(self, instance_mapping, names_of_classes_to_wrap, names_of_enums_to_wrap):
         self.lookup = defaultdict(list)
+        self._cache = dict()
+        self.cache_hits = 0
+        self.cache_misses = 0
 
         self.names_of_wrapper_classes = list(instance_mapping.keys())
         # add everything with a const prefix again
@@ -4121,6 +4667,8 @@ class ConverterRegistry(object):
         self.instance_mapping = dict()
         for alias, type_ in instance_mapping.items():
             self.instance_mapping[alias] = type_.transformed(map_)
+        # results of cython_type() for the current instance_mapping
+        self._cython_types = dict()
 
     def register(self, converter):
         assert isinstance(converter, TypeConverterBase)
@@ -4133,6 +4681,27 @@ class ConverterRegistry(object):
 
         for base_type in converter.get_base_types():
             self.lookup[base_type].append(converter)
+        self._cache.clear()
+
+    @staticmethod
+    def _cache_key(cpp_type: CppType):
+        # str() covers base type, template args and all flags besides is_enum
+        return str(cpp_type), cpp_type.is_enum
+
+    def _find(self, cpp_type: CppType) -> Optional[TypeConverterBase]:
+        key = self._cache_key(cpp_type)
+        try:
+            converter = self._cache[key]
+        except KeyError:
+            self.cache_misses += 1
+            rv = [conv for conv in self.lookup[cpp_type.base_type] if conv.matches(cpp_type)]
+            # always take the latest converter which allows overwriting existing
+            # standard converters (externally)!
+            converter = rv[-1] if rv else None
+            self._cache[key] = converter
+        else:
+            self.cache_hits += 1
+        return converter
 
     def get(self, cpp_type: CppType) -> TypeConverterBase:
         """
@@ -4143,25 +4712,18 @@ class ConverterRegistry(object):
         :return: TypeConverterBase
         :except: NameError
         """
-        rv = [conv for conv in self.lookup[cpp_type.base_type] if conv.matches(cpp_type)]
-        if len(rv) < 1:
+        converter = self._find(cpp_type)
+        if converter is None:
             raise NameError("no converter for %s in: %s" % (cpp_type, str(self.lookup)))
-
-        # always take the latest converter which allows overwriting existing
-        # standard converters (externally)!
-        return rv[-1]
+        return converter
 
     def __contains__(self, cpp_type):
-        try:
-            self.get(cpp_type)
-            return True
-        except NameError:
-            return False
+        return self._find(cpp_type) is not None
 
     def cython_type(self, type_: Union[CppType, AnyStr]) -> CppType:
         if isinstance(type_, (str, bytes)):
             type_ = CppType(type_)
-        return type_.transformed(self.instance_mapping)
+        return type_.transformed(self.instance_mapping, self._cython_types)
 
 
 special_converters = []
@@ -4185,6 +4747,8 @@ def setup_converter_registry(classes_to_wrap, enums_to_wrap, instance_map):
     converters.register(StdStringUnicodeConverter())
     converters.register(StdStringUnicodeOutputConverter())
     converters.register(StdVectorAsNumpyConverter())
+    converters.register(StdVectorAsViewConverter())
+    converters.register(ArrayViewConverter())
     converters.register(StdVectorConverter())
     converters.register(StdSetConverter())
     converters.register(StdMapConverter())
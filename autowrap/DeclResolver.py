@@ -90,6 +90,10 @@ __doc__ = """
                      operator== function.
                      Note that the only requirement for a hash function is that
                      equal objects produce equal values
+        - wrap-freelist: keep up to the given number of freed Python objects
+                         of the class for reuse (Cython's freelist). Meant
+                         for small classes of which many objects are
+                         created.
 
     Thus a class could look like this:
 
@@ -177,6 +181,7 @@ class ResolvedClass(object):
     wrap_manual_memory: Union[bool, List[AnyStr]]
     wrap_hash: List[AnyStr]
     wrap_len: List[AnyStr]
+    wrap_freelist: List[AnyStr]
     local_map: Dict
     instance_map: Dict
     pxd_import_path: Optional[AnyStr]
@@ -208,6 +213,7 @@ class ResolvedClass(object):
         assert isinstance(self.wrap_manual_memory, list)
         self.wrap_hash = decl.annotations.get("wrap-hash", [])
         self.wrap_len = decl.annotations.get("wrap-len", [])
+        self.wrap_freelist = decl.annotations.get("wrap-freelist", [])
         self.local_map = local_map
         self.instance_map = instance_map
         self.pxd_import_path = None
@@ -246,37 +252,71 @@ class ResolvedFunction(ResolvedMethod):
     pass
 
 
-def resolve_decls_from_files(paths, root, num_processes=1, cython_warn_level=1):
+def resolve_decls_from_files(paths, root, num_processes=1, cython_warn_level=1, cache_dir=None):
+    """Parses and resolves the given pxd files.
+
+    If `cache_dir` is given, the declarations parsed from each file are
+    stored there (see PXDParser.PXDParseCache) and unchanged files are not
+    parsed by Cython again in later runs.
+    """
+    cache = None
+    if cache_dir is not None:
+        cache = PXDParser.PXDParseCache(cache_dir)
     if num_processes > 1:
-        return resolve_decls_from_files_multi_thread(paths, root, num_processes, cython_warn_level)
+        result = resolve_decls_from_files_multi_thread(
+            paths, root, num_processes, cython_warn_level, cache
+        )
     else:
-        return resolve_decls_from_files_single_thread(paths, root, cython_warn_level)
+        result = resolve_decls_from_files_single_thread(paths, root, cython_warn_level, cache)
+    if cache is not None:
+        cache.report()
+    return result
 
 
-def resolve_decls_from_files_single_thread(paths, root, cython_warn_level=1):
+def resolve_decls_from_files_single_thread(paths, root, cython_warn_level=1, cache=None):
     decls = []
     for k, path in enumerate(paths):
         full_path = os.path.join(root, path)
         if k % 50 == 0:
             logger.log(25, "parsing progress %s out of %s" % (k, len(paths)))
-        decls.extend(PXDParser.parse_pxd_file(full_path, cython_warn_level))
+        if cache is not None:
+            decls.extend(PXDParser.parse_pxd_file_cached(full_path, cache, cython_warn_level))
+        else:
+            decls.extend(PXDParser.parse_pxd_file(full_path, cython_warn_level))
     return _resolve_decls(decls)
 
 
-def resolve_decls_from_files_multi_thread(paths, root, num_processes, cython_warn_level=1):
+def resolve_decls_from_files_multi_thread(
+    paths, root, num_processes, cython_warn_level=1, cache=None
+):
     """Perform parsing with multiple threads
 
     This function distributes the work on `num_processes` processes and each
     process works on 10 files at a time until there are no more files left to
-    work on.
+    work on. Files found in `cache` are not sent to the worker processes.
     """
     import multiprocessing as mp
     from functools import partial
 
-    pool = mp.Pool(processes=num_processes)
     full_paths = [os.path.join(root, path) for path in paths]
 
     decls = []
+    cache_keys = dict()
+    if cache is not None:
+        to_parse = []
+        for full_path in full_paths:
+            key = cache.key_for(full_path)
+            cached = cache.load(key)
+            if cached is None:
+                cache_keys[full_path] = key
+                to_parse.append(full_path)
+            else:
+                decls.extend(cached)
+        full_paths = to_parse
+        if not full_paths:
+            return _resolve_decls(decls)
+
+    pool = mp.Pool(processes=num_processes)
     while len(full_paths) > 0:
         n_work = len(full_paths)
         remaining = max(0, n_work - num_processes * CONCURRENT_FILES_PER_CORE)
@@ -288,7 +328,9 @@ def resolve_decls_from_files_multi_thread(paths, root, num_processes, cython_war
         )
         parse_pxd_file_warn = partial(PXDParser.parse_pxd_file, warn_level=cython_warn_level)
         res = pool.map(parse_pxd_file_warn, args)
-        for r in res:
+        for full_path, r in zip(args, res):
+            if cache is not None:
+                cache.store(cache_keys[full_path], r)
             decls.extend(r)
 
     return _resolve_decls(decls)
@@ -347,12 +389,17 @@ def _resolve_decls(decls):
 
     instance_mapping.update(enum_mapping)
 
-    functions = [_resolve_function(f, instance_mapping, typedef_mapping) for f in function_decls]
+    # inverse of instance_mapping for _resolve_alias, built only once
+    inverted = Types.inverted_typemap(instance_mapping)
+
+    functions = [
+        _resolve_function(f, instance_mapping, typedef_mapping, inverted) for f in function_decls
+    ]
 
     enums = [ResolvedEnum(e) for e in enum_decls]
     typedefs = [ResolvedTypeDef(t) for t in typedef_decls]
 
-    classes = _resolve_class_decls(class_decls, typedef_mapping, instance_mapping)
+    classes = _resolve_class_decls(class_decls, typedef_mapping, instance_mapping, inverted)
 
     return classes + enums + functions + typedefs, instance_mapping
 
@@ -533,16 +580,18 @@ def parse_inst_decl(str_: AnyStr) -> Tuple[AnyStr, Types.CppType]:
         raise Exception("could not parse instance declaration '%s'" % str_)
 
 
-def _resolve_class_decls(class_decls, typedef_mapping, instance_mapping):
+def _resolve_class_decls(class_decls, typedef_mapping, instance_mapping, inverted=None):
     """ """
     all_resolved_classes = []
     for class_decl in class_decls:
-        resolved_classes = _resolve_class_decl(class_decl, typedef_mapping, instance_mapping)
+        resolved_classes = _resolve_class_decl(
+            class_decl, typedef_mapping, instance_mapping, inverted
+        )
         all_resolved_classes.extend(resolved_classes)
     return all_resolved_classes
 
 
-def _resolve_class_decl(class_decl, typedef_mapping, i_mapping):
+def _resolve_class_decl(class_decl, typedef_mapping, i_mapping, inverted=None):
     # one decl can produce multiple classes !
 
     logger.info("resolve class decl %s" % class_decl.name)
@@ -554,7 +603,7 @@ def _resolve_class_decl(class_decl, typedef_mapping, i_mapping):
 
         r_attributes = []
         for adcl in class_decl.attributes:
-            r_attributes.append(_resolve_attribute(adcl, i_mapping, local_mapping))
+            r_attributes.append(_resolve_attribute(adcl, i_mapping, local_mapping, inverted))
 
         r_methods = []
         for mname, mdcls in class_decl.methods.items():
@@ -563,9 +612,11 @@ def _resolve_class_decl(class_decl, typedef_mapping, i_mapping):
                 if ignore:
                     continue
                 if mdcl.name == class_decl.name:
-                    r_method = _resolve_constructor(cinst_name, mdcl, i_mapping, local_mapping)
+                    r_method = _resolve_constructor(
+                        cinst_name, mdcl, i_mapping, local_mapping, inverted
+                    )
                 else:
-                    r_method = _resolve_method(mdcl, i_mapping, local_mapping)
+                    r_method = _resolve_method(mdcl, i_mapping, local_mapping, inverted)
                 r_methods.append(r_method)
         r_class = ResolvedClass(
             cinst_name, r_methods, r_attributes, class_decl, i_mapping, local_mapping
@@ -587,10 +638,10 @@ def _build_local_typemap(t_param_mapping, typedef_mapping):
     return local_map
 
 
-def _resolve_constructor(cinst_name, method_decl, instance_mapping, local_type_map):
+def _resolve_constructor(cinst_name, method_decl, instance_mapping, local_type_map, inverted=None):
     logger.info("resolve method decl: '%s'" % method_decl)
     result = _resolve_method_or_function(
-        method_decl, instance_mapping, local_type_map, ResolvedMethod
+        method_decl, instance_mapping, local_type_map, ResolvedMethod, inverted
     )
     result.name = cinst_name
     # logger.info("result             : '%s'" % result)
@@ -598,34 +649,38 @@ def _resolve_constructor(cinst_name, method_decl, instance_mapping, local_type_m
     return result
 
 
-def _resolve_method(method_decl, instance_mapping, local_type_map):
+def _resolve_method(method_decl, instance_mapping, local_type_map, inverted=None):
     logger.info("resolve method decl: '%s'" % method_decl)
     result = _resolve_method_or_function(
-        method_decl, instance_mapping, local_type_map, ResolvedMethod
+        method_decl, instance_mapping, local_type_map, ResolvedMethod, inverted
     )
     # logger.info("result             : '%s'" % result)
     # logger.info("")
     return result
 
 
-def _resolve_function(method_decl, instance_mapping, local_type_map):
+def _resolve_function(method_decl, instance_mapping, local_type_map, inverted=None):
     logger.info("resolve function decl: '%s'" % method_decl)
     result = _resolve_method_or_function(
-        method_decl, instance_mapping, local_type_map, ResolvedFunction
+        method_decl, instance_mapping, local_type_map, ResolvedFunction, inverted
     )
     # logger.info("result               : '%s'" % result)
     # logger.info("")
     return result
 
 
-def _resolve_method_or_function(method_decl, instance_mapping, local_type_map, clz):
+def _resolve_method_or_function(method_decl, instance_mapping, local_type_map, clz, inverted=None):
     """
     resolves aliases in return and argument types
     """
-    result_type = _resolve_alias(method_decl.result_type, instance_mapping, local_type_map)
+    if inverted is None:
+        inverted = Types.inverted_typemap(instance_mapping)
+    result_type = _resolve_alias(
+        method_decl.result_type, instance_mapping, local_type_map, inverted
+    )
     args = []
     for arg_name, arg_type in method_decl.arguments:
-        arg_type = _resolve_alias(arg_type, instance_mapping, local_type_map)
+        arg_type = _resolve_alias(arg_type, instance_mapping, local_type_map, inverted)
         args.append((arg_name, arg_type))
     name = method_decl.annotations.get("wrap-as", method_decl.name)
 
@@ -640,12 +695,12 @@ def _resolve_method_or_function(method_decl, instance_mapping, local_type_map, c
     )
 
 
-def _resolve_attribute(adecl, instance_mapping, type_map):
-    type_ = _resolve_alias(adecl.type_, instance_mapping, type_map)
+def _resolve_attribute(adecl, instance_mapping, type_map, inverted=None):
+    type_ = _resolve_alias(adecl.type_, instance_mapping, type_map, inverted)
     return ResolvedAttribute(adecl.name, type_, adecl)
 
 
-def _resolve_alias(cpp_type, wrap_inst_decls, type_map):
+def _resolve_alias(cpp_type, wrap_inst_decls, type_map, inverted=None):
     cpp_type = cpp_type.transformed(type_map)
-    alias = cpp_type.inv_transformed(wrap_inst_decls)
+    alias = cpp_type.inv_transformed(wrap_inst_decls, inverted)
     return alias
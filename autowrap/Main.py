@@ -72,6 +72,13 @@ def _main(argv):
     parser.add_option("--addons", action="append", metavar="addon")
     parser.add_option("--converters", action="append", metavar="converter")
     parser.add_option("--out", action="store", nargs=1, metavar="pyx file")
+    parser.add_option(
+        "--parse-cache",
+        action="store",
+        nargs=1,
+        metavar="directory",
+        help="cache parsed pxd declarations in this directory",
+    )
 
     options, input_ = parser.parse_args(argv)
 
@@ -118,7 +125,7 @@ def _main(argv):
     print("   %5d type converter files to consider" % len(converters))
     print("\n")
 
-    run(pxds, addons, converters, out)
+    run(pxds, addons, converters, out, cache_dir=options.parse_cache)
 
 
 def collect_manual_code(addons):
@@ -191,6 +198,23 @@ def run_cython(inc_dirs, extra_opts, out, warn_level=1):
     compile(out, options=options)
 
 
+def run_cython_parallel(inc_dirs, extra_opts, outs, jobs=None, force=False, warn_level=1):
+    """Runs Cython on several pyx files in a process pool, see
+    autowrap.Utils.build_modules. Files whose .cpp output is up to date are
+    skipped unless force is set."""
+    import autowrap.Utils
+
+    return autowrap.Utils.build_modules(
+        outs,
+        inc_dirs,
+        jobs=jobs,
+        force=force,
+        compile_extensions=False,
+        extra_opts=extra_opts,
+        warn_level=warn_level,
+    )
+
+
 def create_wrapper_code(
     decls,
     instance_map,
@@ -220,8 +244,8 @@ def create_wrapper_code(
     return inc_dirs
 
 
-def run(pxds, addons, converters, out, extra_inc_dirs=None, extra_opts=None):
-    decls, instance_map = autowrap.parse(pxds, ".")
+def run(pxds, addons, converters, out, extra_inc_dirs=None, extra_opts=None, cache_dir=None):
+    decls, instance_map = autowrap.parse(pxds, ".", cache_dir=cache_dir)
     return create_wrapper_code(
         decls, instance_map, addons, converters, out, extra_inc_dirs, extra_opts
     )
@@ -512,11 +512,18 @@ class CppAttributeDecl(BaseDecl):
 
 
 class CppMethodOrFunctionDecl(BaseDecl):
-    def __init__(self, result_type, name, arguments, is_static, annotations, pxd_path):
+    # declarations restored from caches written by older versions lack it
+    is_nogil = False
+
+    def __init__(
+        self, result_type, name, arguments, is_static, annotations, pxd_path, is_nogil=False
+    ):
         super(CppMethodOrFunctionDecl, self).__init__(name, annotations, pxd_path)
         self.result_type = result_type
         self.arguments = arguments
         self.is_static = is_static
+        # declared nogil, directly or by a nogil class or extern block
+        self.is_nogil = is_nogil
 
     def transformed(self, typemap):
         result_type = self.result_type.transformed(typemap)
@@ -528,6 +535,7 @@ class CppMethodOrFunctionDecl(BaseDecl):
             self.is_static,
             self.annotations,
             self.pxd_path,
+            self.is_nogil,
         )
 
     def matches(self, other):
@@ -603,7 +611,99 @@ class MethodOrAttributeDecl(object):
             tt = _extract_type(arg.base_type, argdecl)
             args.append((argname, tt))
 
-        return CppMethodOrFunctionDecl(result_type, name, args, is_static, annotations, pxd_path)
+        is_nogil = bool(getattr(decl, "nogil", False))
+        return CppMethodOrFunctionDecl(
+            result_type, name, args, is_static, annotations, pxd_path, is_nogil
+        )
+
+
+class PXDParseCache(object):
+    """
+    On-disk cache for the declarations which parse_pxd_file extracts from a
+    .pxd file.
+
+    Entries are keyed by the absolute path and the content hash of the file
+    together with the autowrap and Cython versions, so an entry is only reused
+    for a byte-identical file parsed by the same toolchain. Stale entries are
+    never deleted, they simply are not looked up anymore.
+    """
+
+    # bump if the pickled declaration classes change incompatibly
+    FORMAT_VERSION = 1
+
+    def __init__(self, cache_dir):
+        self.cache_dir = os.path.abspath(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, path) -> str:
+        import hashlib
+        from Cython.Compiler.Version import version as cython_version
+        from autowrap.version import __version__ as autowrap_version
+
+        path = os.path.abspath(path)
+        hasher = hashlib.sha256()
+        for item in (self.FORMAT_VERSION, autowrap_version, cython_version, path):
+            hasher.update(str(item).encode("utf-8"))
+            hasher.update(b"\0")
+        with open(path, "rb") as fp:
+            hasher.update(fp.read())
+        return hasher.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + ".pickle")
+
+    def load(self, key):
+        """returns the cached declarations for key or None on a cache miss"""
+        import pickle
+
+        try:
+            with open(self._entry_path(key), "rb") as fp:
+                decls = pickle.load(fp)
+        except FileNotFoundError:
+            decls = None
+        except Exception as e:
+            # corrupt or incompatible entry: parse again and overwrite it
+            logger.warning("ignore unreadable pxd cache entry %s: %s" % (key, e))
+            decls = None
+        if decls is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return decls
+
+    def store(self, key, decls):
+        import pickle
+        import tempfile
+
+        # write to a temporary file first, so that concurrent runs never see
+        # half written entries:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                pickle.dump(decls, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._entry_path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def report(self):
+        logger.log(
+            25,
+            "pxd parse cache %s: %d hits, %d misses" % (self.cache_dir, self.hits, self.misses),
+        )
+
+
+def parse_pxd_file_cached(path, cache: PXDParseCache, warn_level=1):
+    """parse_pxd_file which skips Cython parsing if the file is in the cache"""
+    key = cache.key_for(path)
+    decls = cache.load(key)
+    if decls is None:
+        decls = parse_pxd_file(path, warn_level)
+        cache.store(key, decls)
+    return decls
 
 
 def parse_str(what):
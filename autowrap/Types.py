@@ -32,12 +32,18 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 import copy
+import weakref
 import re
 
 import logging as L
 
 from typing import AnyStr, Dict
 
+# fields of CppType which are part of its string form
+_STR_FIELDS = frozenset(
+    ("base_type", "template_args", "is_ptr", "is_ref", "is_unsigned", "is_long", "is_const")
+)
+
 
 class CppType(object):
     CTYPES = ["int", "long", "double", "float", "char", "void"]
@@ -87,40 +93,76 @@ class CppType(object):
         for t in self.template_args:
             t.set_is_ref_rec()
 
-    def transformed(self, typemap):
-        copied = self.copy()
-        copied._transform(typemap, 0)
-        copied.check_for_recursion()
-        return copied
-
-    def _transform(self, typemap, indent):
+    def transformed(self, typemap, memo=None):
+        """Returns the type with all base types found in typemap replaced
+
+        The type itself is not modified. Sub trees which are not affected by
+        typemap are shared with the original type, and if nothing is replaced
+        the type itself is returned.
+
+        memo is an optional dict which caches the results for this typemap,
+        it must only be used as long as typemap is not modified.
+        """
+        if memo is not None:
+            # types which only differ in flags not shown in their string
+            # form compare equal, so the structural key is used
+            key = self.frozen()._key
+            try:
+                return memo[key]
+            except KeyError:
+                pass
+        result = self._transformed(typemap)
+        result.check_for_recursion()
+        if memo is not None:
+            memo[key] = result
+        return result
+
+    def _transformed(self, typemap):
         aliased_t = typemap.get(self.base_type)
-        if aliased_t is not None:
-            if self.template_args is not None:
-                if aliased_t.template_args is not None:
-                    map_ = printable(typemap, "\n    ")
-                    m = "invalid transform of %s with:\n    %s" % (self, map_)
-                    raise Exception(m)
-                self._overwrite_base_type(aliased_t)
-            else:
-                self._overwrite_base_type(aliased_t)
-                self.template_args = aliased_t.template_args
-        for t in self.template_args or []:
-            t._transform(typemap, indent + 1)
+        if aliased_t is None:
+            if not self.template_args:
+                return self
+            template_args = tuple(t._transformed(typemap) for t in self.template_args)
+            if all(new is old for new, old in zip(template_args, self.template_args)):
+                return self
+            result = copy.copy(self)
+            result.template_args = template_args
+            return result
+
+        if self.template_args is not None and aliased_t.template_args is not None:
+            map_ = printable(typemap, "\n    ")
+            m = "invalid transform of %s with:\n    %s" % (self, map_)
+            raise Exception(m)
+        result = copy.copy(self)
+        result._overwrite_base_type(aliased_t)
+        if self.template_args is None:
+            result.template_args = aliased_t.template_args
+        if result.template_args:
+            result.template_args = tuple(t._transformed(typemap) for t in result.template_args)
+        return result
 
     def _rm_flags(self):
         rv = self.copy()
         rv.is_ptr = rv.is_ref = False
         return rv
 
-    def inv_transformed(self, typemap):
-        inv_typemap = dict((v, CppType(k)) for (k, v) in typemap.items())
-        return self._inv_transform(inv_typemap)
-
-    def _inv_transform(self, inv_typemap):
-        pure = self._rm_flags()
-        if pure in inv_typemap:
-            res = inv_typemap.get(pure)
+    def inv_transformed(self, typemap, inverted=None):
+        """Replaces types occurring as values in typemap by their key
+
+        inverted is the result of inverted_typemap(typemap) and can be passed
+        to avoid building the inverse for each call with the same typemap.
+        """
+        if inverted is None:
+            inverted = inverted_typemap(typemap)
+        return self._inv_transform(inverted)
+
+    def _inv_transform(self, inverted):
+        # string form without top level ptr / ref, same as str(self._rm_flags())
+        pure = str(self)
+        if self.is_ptr or self.is_ref:
+            pure = pure[:-1].rstrip()
+        if pure in inverted:
+            res = CppType(inverted[pure])
             if self.is_ptr:
                 res.is_ptr = True
             elif self.is_ref:
@@ -128,9 +170,12 @@ class CppType(object):
             elif self.is_enum:
                 res.is_enum = True
             return res
-        if self.template_args is not None:
-            trans_targs = [t._inv_transform(inv_typemap) for t in self.template_args]
-            self.template_args = trans_targs
+        if self.template_args:
+            template_args = tuple(t._inv_transform(inverted) for t in self.template_args)
+            if any(new is not old for new, old in zip(template_args, self.template_args)):
+                result = copy.copy(self)
+                result.template_args = template_args
+                return result
         return self
 
     def _overwrite_base_type(self, other):
@@ -147,6 +192,12 @@ class CppType(object):
         self.is_long = self.is_long or other.is_long
         self.is_enum = self.is_enum or other.is_enum
 
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in _STR_FIELDS:
+            # the cached string form (see __str__) is outdated
+            self.__dict__.pop("_str", None)
+
     def __hash__(self):
         """for using Types as dict keys"""
         return hash(str(self))
@@ -162,8 +213,40 @@ class CppType(object):
     def copy(self):
         return copy.deepcopy(self)
 
+    def frozen(self) -> FrozenCppType:
+        """Returns the interned immutable FrozenCppType for this type"""
+        if self.template_args is None:
+            template_args = None
+        else:
+            template_args = tuple(t.frozen() for t in self.template_args)
+        return FrozenCppType._intern(
+            self.base_type,
+            template_args,
+            self.is_ptr,
+            self.is_ref,
+            self.is_unsigned,
+            self.is_long,
+            self.is_const,
+            self.is_enum,
+            None if self.enum_items is None else tuple(self.enum_items),
+            self.topmost_is_ref,
+            self.topmost_is_const,
+        )
+
     def __str__(self):
-        return self.toString(withConst=True)
+        # the string form is used for hashing and comparison, so it is cached.
+        # __setattr__ drops the cache, and as template arguments could be
+        # modified in place, it is only used while their strings are unchanged.
+        cached = self.__dict__.get("_str")
+        if self.template_args is None:
+            arg_strs = None
+        else:
+            arg_strs = tuple(map(str, self.template_args))
+        if cached is not None and cached[1] == arg_strs:
+            return cached[0]
+        str_ = self.toString(withConst=True)
+        self.__dict__["_str"] = (str_, arg_strs)
+        return str_
 
     def toString(self, withConst):
         if self.is_unsigned and self.base_type != "size_t":
@@ -208,13 +291,19 @@ class CppType(object):
             raise Exception("re check for '%s' failed" % self)
 
     def _check_for_recursion(self, seen_base_types):
+        # seen_base_types holds the base types on the path from the root, so
+        # B[X,X] is fine.
         # Currently, only nested std::vector<> can be handled
         if self.base_type in seen_base_types and not self.base_type in ["libcpp_vector", "libcpp_vector_as_np"]:
             raise Exception("recursion check failed")
+        if not self.template_args:
+            return
+        added = self.base_type not in seen_base_types
         seen_base_types.add(self.base_type)
-        for t in self.template_args or []:
-            # copy is needed, else B[X,X] would fail
-            t._check_for_recursion(seen_base_types.copy())
+        for t in self.template_args:
+            t._check_for_recursion(seen_base_types)
+        if added:
+            seen_base_types.discard(self.base_type)
 
     def all_occuring_base_types(self):
         base_types = set()
@@ -289,6 +378,139 @@ class CppType(object):
         return CppType(base_type, t_types, is_ref=is_ref, is_ptr=is_ptr)
 
 
+class FrozenCppType(object):
+    """Immutable, interned variant of CppType
+
+    Instances are created with CppType.frozen(). Structurally identical types
+    are represented by the same object, the string form and the hash are
+    computed once on creation. Comparison and hashing follow CppType (i.e.
+    the string form), so frozen types, CppType objects and strings can be
+    mixed as dict keys.
+
+    copy() and thawed() return a mutable CppType.
+    """
+
+    __slots__ = (
+        "base_type",
+        "template_args",
+        "is_ptr",
+        "is_ref",
+        "is_unsigned",
+        "is_long",
+        "is_const",
+        "is_enum",
+        "enum_items",
+        "topmost_is_ref",
+        "topmost_is_const",
+        "_str",
+        "_hash",
+        "_key",
+        "__weakref__",
+    )
+
+    _interned = weakref.WeakValueDictionary()
+
+    def __init__(self, *a, **kw):
+        raise TypeError("use CppType.frozen() to create a FrozenCppType")
+
+    @classmethod
+    def _intern(cls, *fields):
+        # unlike __eq__, the key distinguishes all fields, also of the
+        # template arguments (e.g. topmost_is_ref or is_enum)
+        template_args = fields[1]
+        if template_args is not None:
+            template_args = tuple(t._key for t in template_args)
+        key = (fields[0], template_args) + fields[2:]
+        try:
+            return cls._interned[key]
+        except KeyError:
+            pass
+        self = object.__new__(cls)
+        for name, value in zip(cls.__slots__, fields):
+            object.__setattr__(self, name, value)
+        str_ = CppType.toString(self, withConst=True)
+        object.__setattr__(self, "_str", str_)
+        object.__setattr__(self, "_hash", hash(str_))
+        object.__setattr__(self, "_key", key)
+        return cls._interned.setdefault(key, self)
+
+    def _fields(self):
+        return tuple(getattr(self, name) for name in self.__slots__[:11])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FrozenCppType is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("FrozenCppType is immutable")
+
+    def __reduce__(self):
+        return FrozenCppType._intern, self._fields()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, FrozenCppType):
+            return self._str == other._str
+        return self._str == str(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __str__(self):
+        return self._str
+
+    def __repr__(self):
+        return "FrozenCppType(%r)" % self._str
+
+    toString = CppType.toString
+    check_for_recursion = CppType.check_for_recursion
+    _check_for_recursion = CppType._check_for_recursion
+    all_occuring_base_types = CppType.all_occuring_base_types
+    _collect_base_types = CppType._collect_base_types
+
+    def frozen(self) -> FrozenCppType:
+        return self
+
+    def thawed(self) -> CppType:
+        """Returns an equivalent mutable CppType"""
+        result = CppType(self.base_type)
+        if self.template_args is not None:
+            result.template_args = tuple(t.thawed() for t in self.template_args)
+        result.is_ptr = self.is_ptr
+        result.is_ref = self.is_ref
+        result.is_unsigned = self.is_unsigned
+        result.is_long = self.is_long
+        result.is_const = self.is_const
+        result.is_enum = self.is_enum
+        result.enum_items = None if self.enum_items is None else list(self.enum_items)
+        result.topmost_is_ref = self.topmost_is_ref
+        result.topmost_is_const = self.topmost_is_const
+        return result
+
+    copy = thawed
+
+    def transformed(self, typemap, memo=None) -> FrozenCppType:
+        return self.thawed().transformed(typemap, memo).frozen()
+
+    def inv_transformed(self, typemap, inverted=None) -> FrozenCppType:
+        return self.thawed().inv_transformed(typemap, inverted).frozen()
+
+
+def inverted_typemap(typemap: Dict[AnyStr, CppType]) -> Dict[str, AnyStr]:
+    """Maps the string form of the values of typemap back to their keys, as
+    used by CppType.inv_transformed"""
+    return dict((str(v), k) for (k, v) in typemap.items())
+
+
 def printable(type_map: Dict[AnyStr, CppType], join_str: str = ", ") -> str:
     if not type_map:
         return "None"
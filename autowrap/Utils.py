@@ -33,6 +33,7 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 import sys
+from contextlib import contextmanager
 
 template = """
 
@@ -62,6 +63,23 @@ setup(cmdclass = {'build_ext' : build_ext},
 """
 
 
+def _compile_and_link_args():
+    compile_args = []
+    link_args = []
+
+    if sys.platform == "darwin":
+        compile_args += ["-stdlib=libc++", "-std=c++17"]
+        link_args += ["-stdlib=libc++"]
+
+    if sys.platform == "linux" or sys.platform == "linux2":
+        compile_args += ["-std=c++17"]
+
+    if sys.platform != "win32":
+        compile_args += ["-Wno-unused-but-set-variable"]
+
+    return compile_args, link_args
+
+
 def compile_and_import(name, source_files, include_dirs=None, **kws):
     if include_dirs is None:
         include_dirs = []
@@ -87,18 +105,7 @@ def compile_and_import(name, source_files, include_dirs=None, **kws):
         if os.path.exists(stub):
             shutil.copy(stub, os.path.join(tempdir, name + ".pyi"))
 
-    compile_args = []
-    link_args = []
-
-    if sys.platform == "darwin":
-        compile_args += ["-stdlib=libc++", "-std=c++17"]
-        link_args += ["-stdlib=libc++"]
-
-    if sys.platform == "linux" or sys.platform == "linux2":
-        compile_args += ["-std=c++17"]
-
-    if sys.platform != "win32":
-        compile_args += ["-Wno-unused-but-set-variable"]
+    compile_args, link_args = _compile_and_link_args()
 
     include_dirs = [os.path.abspath(d) for d in include_dirs]
     source_files = [os.path.basename(f) for f in source_files]
@@ -131,10 +138,7 @@ def compile_and_import(name, source_files, include_dirs=None, **kws):
         print("\n")
 
     assert (
-        subprocess.Popen(
-            "%s setup.py build_ext --force --inplace" % sys.executable, shell=True
-        ).wait()
-        == 0
+        subprocess.Popen("%s setup.py build_ext --inplace" % sys.executable, shell=True).wait() == 0
     )
     print("BUILT")
     result = __import__(name)
@@ -148,6 +152,192 @@ def compile_and_import(name, source_files, include_dirs=None, **kws):
     return result
 
 
+def _is_up_to_date(target, dependencies):
+    import os.path
+
+    if not os.path.exists(target):
+        return False
+    target_mtime = os.path.getmtime(target)
+    return all(os.path.getmtime(d) <= target_mtime for d in dependencies if os.path.exists(d))
+
+
+def _cython_dependencies(pyx, include_dirs):
+    """All files pyx depends on according to Cython, i.e. the pxd files it
+    cimports (transitively, including autowrap's own pxd files) and the files
+    it includes"""
+    from Cython.Build.Dependencies import DependencyTree
+    from Cython.Compiler.Main import Context, CompilationOptions, default_options
+    from Cython.Compiler.Options import get_directive_defaults
+
+    context = Context(
+        list(include_dirs), get_directive_defaults(), options=CompilationOptions(default_options)
+    )
+    return sorted(DependencyTree(context, quiet=True).all_dependencies(pyx))
+
+
+def _build_module(task):
+    """Cythonizes and compiles a single module, runs in a worker process
+
+    Returns a (module name, cythonize seconds, compile seconds) tuple, where
+    the timings are None for steps which were skipped as up to date.
+    """
+    import os.path
+    import sysconfig
+    import time
+    import autowrap.Main
+
+    pyx, dependencies, include_dirs, extra_opts, build_dir, force, compile_, warn_level = task
+    name = os.path.splitext(os.path.basename(pyx))[0]
+    cpp = os.path.splitext(pyx)[0] + ".cpp"
+
+    cythonize_time = None
+    if force or not _is_up_to_date(
+        cpp, [pyx] + dependencies + _cython_dependencies(pyx, include_dirs)
+    ):
+        start = time.time()
+        autowrap.Main.run_cython(include_dirs, extra_opts, pyx, warn_level)
+        cythonize_time = time.time() - start
+
+    compile_time = None
+    if compile_:
+        lib = os.path.join(build_dir, name + sysconfig.get_config_var("EXT_SUFFIX"))
+        if force or cythonize_time is not None or not _is_up_to_date(lib, [cpp]):
+            from setuptools import Distribution, Extension
+
+            compile_args, link_args = _compile_and_link_args()
+            ext = Extension(
+                name,
+                sources=[cpp],
+                language="c++",
+                include_dirs=[os.path.abspath(d) for d in include_dirs],
+                extra_compile_args=compile_args,
+                extra_link_args=link_args,
+            )
+            dist = Distribution(dict(name=name, ext_modules=[ext]))
+            cmd = dist.get_command_obj("build_ext")
+            cmd.build_lib = build_dir
+            cmd.build_temp = os.path.join(build_dir, "build", name)
+            # we already know that the module is outdated
+            cmd.force = True
+            start = time.time()
+            cmd.ensure_finalized()
+            cmd.run()
+            compile_time = time.time() - start
+
+    return name, cythonize_time, compile_time
+
+
+def build_modules(
+    pyx_files,
+    include_dirs,
+    build_dir=None,
+    jobs=None,
+    force=False,
+    compile_extensions=True,
+    extra_opts=None,
+    warn_level=1,
+):
+    """Cythonizes and compiles several generated modules in parallel
+
+    Each module is processed in its own worker process of a pool with jobs
+    processes (default: number of CPUs), jobs=1 builds serially in this
+    process. With compile_extensions=False the modules are only cythonized.
+    A .cpp file is only regenerated if it is older than its pyx file, any
+    file Cython reports as a dependency of it (cimported pxd files, also of
+    autowrap itself, and included files) or any of the pxd files of the
+    modules built together (modules generated for a multi-module build
+    cimport each other), and an extension is only compiled if it is older
+    than its .cpp file, unless force is set.
+
+    The compiled extensions are placed in build_dir (default: directory of
+    the pyx file). Returns a dict mapping module names to a
+    (cythonize seconds, compile seconds) tuple, with None for skipped steps.
+    """
+    import os
+    import os.path
+    from autowrap import logger
+
+    pxd_files = [os.path.splitext(p)[0] + ".pxd" for p in pyx_files]
+    tasks = []
+    for pyx in pyx_files:
+        target_dir = build_dir if build_dir is not None else os.path.dirname(os.path.abspath(pyx))
+        tasks.append(
+            (
+                pyx,
+                pxd_files,
+                include_dirs,
+                extra_opts,
+                target_dir,
+                force,
+                compile_extensions,
+                warn_level,
+            )
+        )
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(tasks)))
+    if jobs == 1:
+        results = [_build_module(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_build_module, tasks))
+
+    timings = dict()
+    for name, cythonize_time, compile_time in results:
+        timings[name] = (cythonize_time, compile_time)
+        report = []
+        for step, t in (("cythonize", cythonize_time), ("compile", compile_time)):
+            if t is None:
+                if step == "compile" and not compile_extensions:
+                    continue
+                report.append("%s up to date" % step)
+            else:
+                report.append("%s %.2fs" % (step, t))
+        logger.log(25, "module %s: %s" % (name, ", ".join(report)))
+    return timings
+
+
+@contextmanager
+def output_file(path, write_only_changed=False, written=None, unchanged=None):
+    """Context manager yielding a file object to stream the content of path
+    into
+
+    With write_only_changed set, the content goes to a temporary file first,
+    and an existing file with identical content is left untouched, so that
+    its mtime does not trigger rebuilds. path is appended to the list written
+    or unchanged, if given.
+    """
+    import filecmp
+    import os
+    import os.path
+    from autowrap import logger
+
+    if write_only_changed and os.path.exists(path):
+        tmp_path = path + ".tmp"
+    else:
+        tmp_path = path
+    try:
+        with open(tmp_path, "w") as fp:
+            yield fp
+    except BaseException:
+        if tmp_path != path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if tmp_path != path:
+        if filecmp.cmp(tmp_path, path, shallow=False):
+            os.remove(tmp_path)
+            logger.info("skip writing unchanged file %s" % path)
+            if unchanged is not None:
+                unchanged.append(path)
+            return
+        os.replace(tmp_path, path)
+    if written is not None:
+        written.append(path)
+
+
 def remove_labels(graph):
     _remove_labels = lambda succ_list: [s for s, label in succ_list]
     pure_graph = dict((n0, _remove_labels(ni)) for n0, ni in graph.items())
@@ -162,25 +352,36 @@ def find_cycle(graph_as_dict):
     nodes = list(graph_as_dict.keys())
     for n in graph_as_dict.values():
         nodes.extend(n)
-    todo = list(set(nodes))
+    nodes = list(set(nodes))
+    # set for fast membership tests, start nodes are taken from the end of nodes
+    todo = set(nodes)
     while todo:
-        node = todo.pop()
+        node = nodes.pop()
+        if node not in todo:
+            continue
+        todo.remove(node)
         stack = [node]
+        on_stack = set(stack)
+        successors = [iter(graph_as_dict.get(node, []))]
         while stack:
-            top = stack[-1]
-            for node in graph_as_dict.get(top, []):
-                if node in stack:
+            for node in successors[-1]:
+                if node in on_stack:
                     return stack[stack.index(node) :]
                 if node in todo:
-                    stack.append(node)
                     todo.remove(node)
+                    stack.append(node)
+                    on_stack.add(node)
+                    successors.append(iter(graph_as_dict.get(node, [])))
                     break
             else:
-                node = stack.pop()
+                on_stack.remove(stack.pop())
+                successors.pop()
     return None
 
 
 def _check_for_cycles_in_mapping(mapping):
+    """raises an exception if mapping contains cycles, returns the
+    dependency graph (alias -> all base types used in its type)"""
     # detect cylces in typedefs
     graph = dict()
     for alias, type_ in mapping.items():
@@ -191,6 +392,7 @@ def _check_for_cycles_in_mapping(mapping):
     if cycle is not None:
         info = " -> ".join(map(str, cycle))
         raise Exception("mapping contains cycle: " + info)
+    return graph
 
 
 def print_map(mapping):
@@ -210,13 +412,28 @@ def flatten(mapping):
         C -> Z
         D -> Y
     """
-    _check_for_cycles_in_mapping(mapping)
-    # this loop only terminates for cylce free mappings:
-    while True:
-        for name, type_ in mapping.items():
-            transformed = type_.transformed(mapping)
-            if transformed != type_:
-                mapping[name] = transformed
-                break
-        else:
-            break
+    graph = _check_for_cycles_in_mapping(mapping)
+
+    # Resolve the aliases in topological order (depth first, post order), so
+    # that all aliases a type refers to are already flattened when it gets
+    # transformed. Then a single transformation per alias suffices.
+    order = []
+    visited = set()
+    for root in graph:
+        if root in visited:
+            continue
+        visited.add(root)
+        stack = [(root, iter(graph[root]))]
+        while stack:
+            name, successors = stack[-1]
+            for succ in successors:
+                if succ in graph and succ not in visited:
+                    visited.add(succ)
+                    stack.append((succ, iter(graph[succ])))
+                    break
+            else:
+                stack.pop()
+                order.append(name)
+
+    for name in order:
+        mapping[name] = mapping[name].transformed(mapping)
@@ -65,10 +65,12 @@ The autowrap process consists of two steps:
 """
 
 
-def parse(files, root, num_processes=1, cython_warn_level=1):
+def parse(files, root, num_processes=1, cython_warn_level=1, cache_dir=None):
     import autowrap.DeclResolver
 
-    return DeclResolver.resolve_decls_from_files(files, root, num_processes, cython_warn_level)
+    return DeclResolver.resolve_decls_from_files(
+        files, root, num_processes, cython_warn_level, cache_dir=cache_dir
+    )
 
 
 def generate_code(
@@ -81,6 +83,11 @@ def generate_code(
     include_numpy=False,
     all_decl=[],
     add_relative=False,
+    write_only_changed=False,
+    overload_dispatch="table",
+    typed_signatures=False,
+    nogil_default=False,
+    scoped_enum_type="IntEnum",
 ):
     import autowrap.CodeGenerator
 
@@ -94,6 +101,11 @@ def generate_code(
         add_relative=add_relative,
     )
     gen.include_numpy = include_numpy
+    gen.write_only_changed = write_only_changed
+    gen.overload_dispatch = overload_dispatch
+    gen.typed_signatures = typed_signatures
+    gen.nogil_default = nogil_default
+    gen.scoped_enum_type = scoped_enum_type
     gen.create_pyx_file(debug)
     includes = gen.get_include_dirs()
     print(
@@ -103,6 +115,87 @@ def generate_code(
     return includes
 
 
+def generate_sharded_code(
+    decls,
+    instance_map,
+    target_dir,
+    module_name,
+    num_shards,
+    debug=False,
+    manual_code=None,
+    extra_cimports=None,
+    include_numpy=False,
+    write_only_changed=False,
+    overload_dispatch="table",
+    typed_signatures=False,
+    nogil_default=False,
+    scoped_enum_type="IntEnum",
+):
+    """
+    Generates the wrapper code for decls as num_shards separate modules
+    "<module_name>_<i>.pyx" (plus pxd files) in target_dir, which can be
+    cythonized and compiled in parallel. An __init__.py re-exporting all
+    wrapped names is written as well, so target_dir can be used as a package.
+
+    Returns the list of generated pyx files and the include dirs.
+    """
+    import os
+    import autowrap.CodeGenerator
+    import autowrap.DeclResolver
+    import autowrap.Utils
+
+    if manual_code is None:
+        manual_code = dict()
+
+    shards = CodeGenerator.split_into_shards(decls, num_shards, module_name)
+    typedefs = [d for d in decls if isinstance(d, DeclResolver.ResolvedTypeDef)]
+    # manual code for classes goes to the shard of the class, the rest to
+    # the first shard
+    shard_of = dict((d.name, m) for m, s in shards.items() for d in s["decls"])
+    first = sorted(shards)[0]
+
+    targets = []
+    includes = []
+    wrapped = [0, 0, 0]
+    for modname in sorted(shards):
+        own_decls = [d for d in shards[modname]["decls"] if d not in typedefs]
+        shard_manual_code = dict(
+            (k, v) for k, v in manual_code.items() if shard_of.get(k, first) == modname
+        )
+        target = os.path.join(target_dir, "%s.pyx" % modname)
+        gen = CodeGenerator.CodeGenerator(
+            own_decls + typedefs,
+            instance_map,
+            pyx_target_path=target,
+            manual_code=shard_manual_code,
+            extra_cimports=extra_cimports,
+            all_decl=shards,
+            add_relative=True,
+        )
+        gen.include_numpy = include_numpy
+        gen.write_only_changed = write_only_changed
+        gen.overload_dispatch = overload_dispatch
+        gen.typed_signatures = typed_signatures
+        gen.nogil_default = nogil_default
+        gen.scoped_enum_type = scoped_enum_type
+        gen.create_pyx_file(debug)
+        includes = gen.get_include_dirs()
+        targets.append(target)
+        wrapped[0] += gen.wrapped_classes_cnt
+        wrapped[1] += gen.wrapped_methods_cnt
+        wrapped[2] += gen.wrapped_enums_cnt
+
+    init_code = CodeGenerator.create_shard_init_code(shards)
+    # same check for unchanged content as for the shards, keeps the mtime
+    with Utils.output_file(os.path.join(target_dir, "__init__.py"), write_only_changed) as fp:
+        fp.write(init_code)
+    print(
+        "Autowrap has wrapped %s classes, %s methods and %s enums in %s modules"
+        % (wrapped[0], wrapped[1], wrapped[2], len(shards))
+    )
+    return targets, includes
+
+
 def parse_and_generate_code(
     files,
     root,
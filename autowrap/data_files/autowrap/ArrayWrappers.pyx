@@ -11,15 +11,18 @@ Owning wrappers directly hold a std::vector and transfer ownership via swap.
 For reference returns, Cython memory views are used instead (see ConversionProvider).
 
 Supported types: float, double, int8, int16, int32, int64, uint8, uint16, uint32, uint64
+
+_numpy_input converts numpy arrays and other buffers passed as arguments.
 """
 
-from cpython.buffer cimport PyBUF_FORMAT, PyBUF_ND, PyBUF_STRIDES, PyBUF_WRITABLE
+from cpython.buffer cimport PyBUF_FORMAT, PyBUF_ND, PyBUF_STRIDES, PyBUF_WRITABLE, PyObject_CheckBuffer
 from cpython cimport Py_buffer
 from libcpp.vector cimport vector as libcpp_vector
 from libcpp cimport bool as cbool
 from libc.stdint cimport int8_t, int16_t, int32_t, int64_t, uint8_t, uint16_t, uint32_t, uint64_t
 cimport cython
 from libc.stdlib cimport malloc, free
+import numpy
 
 
 # Static format strings for buffer protocol
@@ -695,3 +698,32 @@ cdef class ArrayWrapperUInt64:
             buffer.internal = NULL
 
 
+#############################################################################
+# Input Conversion
+#############################################################################
+
+
+cdef object _numpy_input(object obj, object dtype, bint contiguous=True):
+    """
+    Returns obj, a numpy array or another object supporting the buffer
+    protocol, as a numpy array of dtype (C-contiguous if contiguous is set).
+
+    The array itself is returned if it already fits. Other dtypes are only
+    converted if no values are lost: casts numpy considers safe (e.g. float32
+    to float64, int16 to int32), numbers to a smaller float type (like double
+    to float in C++) and integers to a smaller integer type if all values fit.
+    Otherwise a TypeError (e.g. floats for integers) or a ValueError (integers
+    out of range) is raised.
+    """
+    arr = numpy.asarray(obj)
+    if arr.dtype != dtype and not numpy.can_cast(arr.dtype, dtype, "safe"):
+        target = numpy.dtype(dtype)
+        if target.kind in "iu" and arr.dtype.kind in "iu":
+            info = numpy.iinfo(target)
+            if arr.size and (arr.min() < info.min or arr.max() > info.max):
+                raise ValueError("values out of the range of %s" % target)
+        elif not (target.kind == "f" and arr.dtype.kind in "iuf"):
+            raise TypeError("can not convert values of %s to %s" % (arr.dtype, target))
+    if contiguous:
+        return numpy.ascontiguousarray(arr, dtype=dtype)
+    return arr.astype(dtype, copy=False)
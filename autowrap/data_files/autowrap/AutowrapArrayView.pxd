@@ -0,0 +1,14 @@
+from libcpp cimport bool
+
+cdef extern from "autowrap_tools.hpp" namespace "autowrap":
+
+    cdef cppclass AutowrapArrayView[T]:
+
+        AutowrapArrayView()
+        AutowrapArrayView(const T *, size_t)
+        const T * data()
+        size_t size()
+        bool empty()
+        const T & operator[](size_t)
+
+    AutowrapArrayView[T] make_array_view[T](const T *, size_t)
@@ -1,9 +1,26 @@
+#pragma once
+#include <algorithm>
+#include <atomic>
+#include <condition_variable>
+#include <deque>
+#include <exception>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <vector>
 
 inline char * _cast_const_away(const char *p)
 {
     return const_cast<char *>(p);
 }
 
+// shared_ptr to a part of an object, sharing the ownership of the object
+template<class T, class U> std::shared_ptr<T> _aliasing_shared_ptr(const std::shared_ptr<U>& owner, T * ptr)
+{
+    return std::shared_ptr<T>(owner, ptr);
+}
+
 template<class A> void _iadd(A * a1, const A * a2)
 {
     (*a1) += (*a2);
@@ -131,4 +148,218 @@ namespace autowrap {
             }
     };
 
+    // Read-only, non-owning view of contiguous data, e.g. of a numpy array
+    // passed to a function without copying. The data is only valid during
+    // the call, so the view must not be stored.
+    template <class X>
+    class AutowrapArrayView {
+
+        private:
+
+            const X* _data;
+            size_t _size;
+
+        public:
+
+            AutowrapArrayView(): _data(NULL), _size(0) {}
+
+            AutowrapArrayView(const X *data, size_t size): _data(data), _size(size)
+            {
+            }
+
+            const X* data() const
+            {
+                return _data;
+            }
+
+            size_t size() const
+            {
+                return _size;
+            }
+
+            bool empty() const
+            {
+                return _size == 0;
+            }
+
+            const X& operator[](size_t i) const
+            {
+                return _data[i];
+            }
+
+            const X* begin() const
+            {
+                return _data;
+            }
+
+            const X* end() const
+            {
+                return _data + _size;
+            }
+    };
+
+    // The element type is deduced from the pointer, as Cython can not parse
+    // template arguments like "unsigned int" in expressions.
+    template <class X>
+    AutowrapArrayView<X> make_array_view(const X *data, size_t size)
+    {
+        return AutowrapArrayView<X>(data, size);
+    }
+
+    // Threads which run the tasks of parallel_for, they are started when
+    // they are needed first and live until the module is unloaded.
+    class AutowrapThreadPool {
+
+        private:
+
+            std::vector<std::thread> _workers;
+            std::deque<std::function<void()> > _tasks;
+            std::mutex _mutex;
+            std::condition_variable _wakeup;
+            bool _stop;
+
+            void work()
+            {
+                for (;;)
+                {
+                    std::function<void()> task;
+                    {
+                        std::unique_lock<std::mutex> lock(_mutex);
+                        _wakeup.wait(lock, [this] { return _stop || !_tasks.empty(); });
+                        if (_tasks.empty()) return;
+                        task = std::move(_tasks.front());
+                        _tasks.pop_front();
+                    }
+                    task();
+                }
+            }
+
+        public:
+
+            AutowrapThreadPool(): _stop(false)
+            {
+            }
+
+            ~AutowrapThreadPool()
+            {
+                {
+                    std::lock_guard<std::mutex> lock(_mutex);
+                    _stop = true;
+                }
+                _wakeup.notify_all();
+                for (std::thread& worker : _workers) worker.join();
+            }
+
+            // starts workers until there are at least n_workers
+            void reserve(size_t n_workers)
+            {
+                std::lock_guard<std::mutex> lock(_mutex);
+                while (_workers.size() < n_workers)
+                {
+                    _workers.emplace_back([this] { work(); });
+                }
+            }
+
+            void submit(std::function<void()> task)
+            {
+                {
+                    std::lock_guard<std::mutex> lock(_mutex);
+                    _tasks.push_back(std::move(task));
+                }
+                _wakeup.notify_one();
+            }
+
+            static AutowrapThreadPool& instance()
+            {
+                static AutowrapThreadPool pool;
+                return pool;
+            }
+    };
+
+    // Calls body(i, context) for 0 <= i < n on up to n_threads threads (one
+    // per core for n_threads <= 0, and never more than one per core, as the
+    // workers of the pool are kept), the calling thread is one of them.
+    // Returns when all calls are done. If a call throws, the remaining
+    // indices are skipped and the first exception is rethrown.
+    inline void parallel_for(size_t n, int n_threads, void (*body)(size_t, void *), void * context)
+    {
+        struct State {
+            size_t n, chunk;
+            void (*body)(size_t, void *);
+            void * context;
+            std::atomic<size_t> next;
+            std::atomic<bool> failed;
+            std::exception_ptr error;
+            std::mutex mutex;
+            std::condition_variable finished;
+            int active;
+            bool closed;
+
+            void run()
+            {
+                while (!failed)
+                {
+                    size_t begin = next.fetch_add(chunk);
+                    if (begin >= n) return;
+                    size_t end = std::min(n, begin + chunk);
+                    try
+                    {
+                        for (size_t i = begin; i < end; ++i) body(i, context);
+                    }
+                    catch (...)
+                    {
+                        std::lock_guard<std::mutex> lock(mutex);
+                        if (!error) error = std::current_exception();
+                        failed = true;
+                    }
+                }
+            }
+        };
+
+        size_t threads = std::max(1u, std::thread::hardware_concurrency());
+        if (n_threads > 0) threads = std::min(threads, (size_t) n_threads);
+        threads = std::min(threads, n);
+        if (threads <= 1)
+        {
+            for (size_t i = 0; i < n; ++i) body(i, context);
+            return;
+        }
+        AutowrapThreadPool& pool = AutowrapThreadPool::instance();
+        pool.reserve(threads - 1);
+
+        std::shared_ptr<State> state = std::make_shared<State>();
+        state->n = n;
+        // small chunks balance the load, but not smaller than one call
+        state->chunk = std::max((size_t) 1, n / (threads * 16));
+        state->body = body;
+        state->context = context;
+        state->next = 0;
+        state->failed = false;
+        state->active = 0;
+        state->closed = false;
+
+        for (size_t i = 1; i < threads; ++i)
+        {
+            pool.submit([state] {
+                {
+                    std::lock_guard<std::mutex> lock(state->mutex);
+                    // the work is done already, e.g. if all workers were busy
+                    if (state->closed) return;
+                    ++state->active;
+                }
+                state->run();
+                std::lock_guard<std::mutex> lock(state->mutex);
+                if (--state->active == 0) state->finished.notify_all();
+            });
+        }
+
+        state->run();
+        {
+            std::unique_lock<std::mutex> lock(state->mutex);
+            state->closed = true;
+            state->finished.wait(lock, [&state] { return state->active == 0; });
+        }
+        if (state->error) std::rethrow_exception(state->error);
+    }
+
 };
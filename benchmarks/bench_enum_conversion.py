@@ -0,0 +1,130 @@
+"""
+Benchmark for the conversion of enum arguments and results.
+
+A class is wrapped with methods taking an int (for reference), an unscoped
+enum with 3 values, unscoped enums with 16 values without and with gaps in
+their values and a scoped enum, and with a method returning a scoped enum.
+The C++ methods do nothing, so the numbers are dominated by the type check
+and the conversion of the enum. The mean time per call is reported for
+scoped enums wrapped as IntEnum classes and as classes derived from the
+extension type _ScopedEnum (scoped_enum_type="cdef").
+
+Needs a C++ compiler, run with:
+
+    python benchmarks/bench_enum_conversion.py
+"""
+
+from __future__ import print_function
+
+import os
+import tempfile
+import timeit
+
+import autowrap
+import autowrap.Utils
+
+LARGE = ["V%d" % i for i in range(16)]
+SPARSE = ["W%d = %d" % (i, 2 * i) for i in range(16)]
+
+HPP = """\
+enum Small { S0, S1, S2 };
+enum Large { %s };
+enum Sparse { %s };
+enum class Color { RED, GREEN, BLUE };
+
+class Enums {
+  public:
+    int takeInt(int i) { return i; }
+    int takeSmall(Small s) { return s; }
+    int takeLarge(Large l) { return l; }
+    int takeSparse(Sparse s) { return s; }
+    int takeScoped(Color c) { return static_cast<int>(c); }
+    Color returnScoped(int i) { return static_cast<Color>(i); }
+};
+""" % (
+    ", ".join(LARGE),
+    ", ".join(SPARSE),
+)
+
+PXD = """\
+# cython: language_level=3
+
+cdef extern from "enums.hpp":
+
+    cpdef enum Small:
+        S0, S1, S2
+
+    cpdef enum Large:
+        %s
+
+    cpdef enum Sparse:
+        %s
+
+    cpdef enum class Color:
+        RED, GREEN, BLUE
+
+    cdef cppclass Enums:
+        Enums()
+        int takeInt(int i)
+        int takeSmall(Small s)
+        int takeLarge(Large l)
+        int takeSparse(Sparse s)
+        int takeScoped(Color c)
+        Color returnScoped(int i)
+""" % (
+    ", ".join(LARGE),
+    ", ".join(SPARSE),
+)
+
+
+def build(directory, scoped_enum_type):
+    with open(os.path.join(directory, "enums.hpp"), "w") as fp:
+        fp.write(HPP)
+    with open(os.path.join(directory, "enums.pxd"), "w") as fp:
+        fp.write(PXD)
+    decls, instance_map = autowrap.parse(["enums.pxd"], root=directory)
+    name = "enums_%s" % scoped_enum_type
+    target = os.path.join(directory, "%s.pyx" % name)
+    include_dirs = autowrap.generate_code(
+        decls, instance_map, target=target, scoped_enum_type=scoped_enum_type
+    )
+    return autowrap.Utils.compile_and_import(name, [target], include_dirs + [directory])
+
+
+def times_per_call(calls, number=200000, repeat=7):
+    """mean time per call for each of the (method, argument) pairs, the best
+    of repeat runs, the pairs are timed alternately"""
+    best = [float("inf")] * len(calls)
+    for __ in range(repeat):
+        for i, (method, arg) in enumerate(calls):
+            best[i] = min(best[i], timeit.timeit(lambda: method(arg), number=number))
+    return [t / number for t in best]
+
+
+def cases(module):
+    enums = module.Enums()
+    assert enums.returnScoped(2) is module.Color.BLUE
+    return [
+        ("int argument", enums.takeInt, 2),
+        ("small enum argument", enums.takeSmall, module.Small.S2),
+        ("large enum argument", enums.takeLarge, module.Large.V15),
+        ("sparse enum argument", enums.takeSparse, module.Sparse.W15),
+        ("scoped enum argument", enums.takeScoped, module.Color.BLUE),
+        ("scoped enum result", enums.returnScoped, 2),
+    ]
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    intenum_cases = cases(build(directory, "IntEnum"))
+    cdef_cases = cases(build(directory, "cdef"))
+
+    print()
+    print("%22s %18s %18s" % ("case", "IntEnum [us/call]", "cdef [us/call]"))
+    for (name, m0, a0), (__, m1, a1) in zip(intenum_cases, cdef_cases):
+        t_intenum, t_cdef = times_per_call([(m0, a0), (m1, a1)])
+        print("%22s %18.3f %18.3f" % (name, t_intenum * 1e6, t_cdef * 1e6))
+
+
+if __name__ == "__main__":
+    main()
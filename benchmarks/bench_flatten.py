@@ -0,0 +1,71 @@
+"""
+Benchmark for autowrap.Utils.flatten on synthetic typedef chains.
+
+Each mapping consists of chains of typedefs of the given length which end in
+a builtin type, plus a template typedef for every tenth alias referring to two
+aliases of the chain:
+
+    T0 -> T1 -> ... -> Tn -> int
+    P0 -> libcpp_pair[T0,T1], P10 -> libcpp_pair[T10,T11], ...
+
+The previous fixed point implementation (restart after every substitution)
+is timed for comparison on the smaller sizes.
+
+Run with:
+
+    python benchmarks/bench_flatten.py
+"""
+
+from __future__ import print_function
+
+import time
+
+from autowrap.Types import CppType
+import autowrap.Utils
+
+
+def make_mapping(n, chains=4):
+    mapping = dict()
+    for c in range(chains):
+        for i in range(n - 1):
+            mapping["T%d_%d" % (c, i)] = CppType("T%d_%d" % (c, i + 1))
+        mapping["T%d_%d" % (c, n - 1)] = CppType("int")
+        for i in range(0, n - 1, 10):
+            args = [CppType("T%d_%d" % (c, i)), CppType("T%d_%d" % (c, i + 1))]
+            mapping["P%d_%d" % (c, i)] = CppType("libcpp_pair", args)
+    return mapping
+
+
+def flatten_fixed_point(mapping):
+    autowrap.Utils._check_for_cycles_in_mapping(mapping)
+    while True:
+        for name, type_ in mapping.items():
+            transformed = type_.transformed(mapping)
+            if transformed != type_:
+                mapping[name] = transformed
+                break
+        else:
+            break
+
+
+def timed(function, mapping):
+    start = time.perf_counter()
+    function(mapping)
+    return time.perf_counter() - start
+
+
+def main():
+    print("%8s %8s %14s %14s" % ("chain", "aliases", "flatten [s]", "fixed point [s]"))
+    for n in (10, 50, 100, 250, 1000, 2500, 10000):
+        mapping = make_mapping(n)
+        size = len(mapping)
+        t_new = timed(autowrap.Utils.flatten, mapping)
+        if n <= 50:
+            t_old = "%14.4f" % timed(flatten_fixed_point, make_mapping(n))
+        else:
+            t_old = "%14s" % "-"
+        print("%8d %8d %14.4f %s" % (n, size, t_new, t_old))
+
+
+if __name__ == "__main__":
+    main()
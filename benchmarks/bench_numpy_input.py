@@ -0,0 +1,93 @@
+"""
+Benchmark for passing numpy arrays to libcpp_vector_as_np arguments.
+
+A method taking libcpp_vector_as_np[double] is called with arrays which are
+contiguous float64 (copied with memcpy), strided float64 and contiguous
+float32 (both converted by numpy before the copy, see _numpy_input). A method
+taking AutowrapArrayView[double], which does not copy the data, is included
+for comparison. The C++ methods only return the size of their argument, so
+the numbers are dominated by the conversion. The mean time per call is
+reported for arrays of 1000 and of 1000000 elements.
+
+Needs a C++ compiler and numpy, run with:
+
+    python benchmarks/bench_numpy_input.py
+"""
+
+from __future__ import print_function
+
+import os
+import tempfile
+import timeit
+
+import numpy
+
+import autowrap
+import autowrap.Utils
+
+HPP = """\
+#include <vector>
+#include "autowrap_tools.hpp"
+
+class Inputs {
+  public:
+    size_t vectorSize(const std::vector<double>& data) { return data.size(); }
+    size_t viewSize(autowrap::AutowrapArrayView<double> data) { return data.size(); }
+};
+"""
+
+PXD = """\
+# cython: language_level=3
+from libcpp.vector cimport vector as libcpp_vector_as_np
+from AutowrapArrayView cimport AutowrapArrayView
+
+cdef extern from "inputs.hpp":
+
+    cdef cppclass Inputs:
+        Inputs()
+        size_t vectorSize(libcpp_vector_as_np[double] data)
+        size_t viewSize(AutowrapArrayView[double] data)
+"""
+
+
+def build(directory):
+    with open(os.path.join(directory, "inputs.hpp"), "w") as fp:
+        fp.write(HPP)
+    with open(os.path.join(directory, "inputs.pxd"), "w") as fp:
+        fp.write(PXD)
+    decls, instance_map = autowrap.parse(["inputs.pxd"], root=directory)
+    target = os.path.join(directory, "inputs_wrapper.pyx")
+    include_dirs = autowrap.generate_code(decls, instance_map, target=target, include_numpy=True)
+    return autowrap.Utils.compile_and_import(
+        "inputs_wrapper", [target], include_dirs + [directory, numpy.get_include()]
+    )
+
+
+def time_per_call(method, data, number, repeat=7):
+    """mean time per call, the best of repeat runs"""
+    return min(timeit.repeat(lambda: method(data), number=number, repeat=repeat)) / number
+
+
+def main():
+    module = build(tempfile.mkdtemp())
+    inputs = module.Inputs()
+
+    print()
+    print("%10s %22s %16s" % ("elements", "input", "time [us/call]"))
+    for n in (1000, 1000000):
+        number = max(10, 1000000 // n)
+        contiguous = numpy.arange(n, dtype=numpy.float64)
+        cases = [
+            ("contiguous float64", inputs.vectorSize, contiguous),
+            ("strided float64", inputs.vectorSize, numpy.arange(2 * n, dtype=numpy.float64)[::2]),
+            ("contiguous float32", inputs.vectorSize, contiguous.astype(numpy.float32)),
+            ("view, no copy", inputs.viewSize, contiguous),
+        ]
+        for name, method, data in cases:
+            assert method(data) == n
+            t = time_per_call(method, data, number)
+            print("%10d %22s %16.3f" % (n, name, t * 1e6))
+
+
+if __name__ == "__main__":
+    main()
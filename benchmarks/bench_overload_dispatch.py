@@ -0,0 +1,148 @@
+"""
+Benchmark for the dispatch of overloaded methods in generated wrappers.
+
+A class with methods having 2, 5 and 15 overloads is wrapped twice, once
+with the if/elif chain of full type checks ("chain") and once with the
+dispatch by arity and a cached table of argument types ("table"). Every
+overload is called with matching arguments and the mean time per call is
+reported, with containers of 3 and of 1000 elements. The C++ methods do
+nothing, so the numbers are dominated by the dispatch and the argument
+conversion. The strategies are timed alternately to reduce the influence of
+other load on the machine.
+
+Needs a C++ compiler, run with:
+
+    python benchmarks/bench_overload_dispatch.py
+"""
+
+from __future__ import print_function
+
+import os
+import tempfile
+import timeit
+
+import autowrap
+import autowrap.Utils
+
+
+def overloads(n):
+    """(C++ argument types, Python arguments) for each overload, containers
+    have n elements"""
+    return [
+        (["int"], (1,)),
+        (["double"], (1.5,)),
+        (["libcpp_string"], (b"ab",)),
+        (["libcpp_vector[int]"], (list(range(n)),)),
+        (["int", "int"], (1, 2)),
+        (["libcpp_vector[double]"], ([1.5] * n,)),
+        (["libcpp_vector[libcpp_string]"], ([b"a"] * n,)),
+        (["libcpp_set[int]"], (set(range(n)),)),
+        (["libcpp_map[int,int]"], (dict((i, i) for i in range(n)),)),
+        (["int", "double"], (1, 1.5)),
+        (["double", "int"], (1.5, 1)),
+        (["double", "double"], (1.5, 1.5)),
+        (["libcpp_string", "int"], (b"ab", 1)),
+        (["int", "int", "int"], (1, 2, 3)),
+        (["double", "double", "double"], (1.5, 1.5, 1.5)),
+    ]
+
+
+SIZES = (2, 5, 15)
+
+CPP_TYPES = {
+    "libcpp_string": "std::string",
+    "libcpp_vector": "std::vector",
+    "libcpp_set": "std::set",
+    "libcpp_map": "std::map",
+}
+
+PXD_HEADER = """\
+# cython: language_level=3
+from libcpp.string cimport string as libcpp_string
+from libcpp.vector cimport vector as libcpp_vector
+from libcpp.set cimport set as libcpp_set
+from libcpp.map cimport map as libcpp_map
+
+cdef extern from "overloads.hpp":
+
+    cdef cppclass Overloads:
+        Overloads()
+"""
+
+
+def cpp_type(t):
+    for name, cpp_name in CPP_TYPES.items():
+        t = t.replace(name, cpp_name)
+    return t.replace("[", "<").replace("]", ">")
+
+
+def write_sources(directory):
+    hpp = ["#include <map>", "#include <set>", "#include <string>", "#include <vector>", ""]
+    hpp.append("class Overloads {")
+    hpp.append("  public:")
+    pxd = [PXD_HEADER]
+    for n in SIZES:
+        for i, (types, __) in enumerate(overloads(0)[:n]):
+            args = ", ".join("const %s&" % cpp_type(t) for t in types)
+            hpp.append("    int run%d(%s) { return %d; }" % (n, args, i))
+            pxd.append("        int run%d(%s)" % (n, ", ".join(types)))
+    hpp.append("};")
+    with open(os.path.join(directory, "overloads.hpp"), "w") as fp:
+        fp.write("\n".join(hpp) + "\n")
+    with open(os.path.join(directory, "overloads.pxd"), "w") as fp:
+        fp.write("\n".join(pxd) + "\n")
+
+
+def build(directory, strategy):
+    decls, instance_map = autowrap.parse(["overloads.pxd"], root=directory)
+    target = os.path.join(directory, "overloads_%s.pyx" % strategy)
+    include_dirs = autowrap.generate_code(
+        decls, instance_map, target=target, overload_dispatch=strategy
+    )
+    return autowrap.Utils.compile_and_import(
+        "overloads_%s" % strategy, [target], include_dirs + [directory]
+    )
+
+
+def times_per_call(methods, calls, number, repeat=7):
+    """mean time per call for each of the methods, the best of repeat runs"""
+    runs = []
+    for method in methods:
+
+        def run(method=method):
+            for args in calls:
+                method(*args)
+
+        runs.append(run)
+    best = [float("inf")] * len(runs)
+    for __ in range(repeat):
+        for i, run in enumerate(runs):
+            best[i] = min(best[i], timeit.timeit(run, number=number))
+    return [t / number / len(calls) for t in best]
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    write_sources(directory)
+    modules = dict((strategy, build(directory, strategy)) for strategy in ("chain", "table"))
+
+    print()
+    print(
+        "%10s %10s %16s %16s %10s"
+        % ("overloads", "elements", "chain [us/call]", "table [us/call]", "speedup")
+    )
+    for elements in (3, 1000):
+        for n in SIZES:
+            calls = [args for (__, args) in overloads(elements)[:n]]
+            methods = []
+            for strategy in ("chain", "table"):
+                method = getattr(modules[strategy].Overloads(), "run%d" % n)
+                assert [method(*args) for args in calls] == list(range(n))
+                methods.append(method)
+            times = times_per_call(methods, calls, number=max(10, 20000 // elements))
+            chain, table = [t * 1e6 for t in times]
+            print("%10d %10d %16.3f %16.3f %10.2f" % (n, elements, chain, table, chain / table))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#include <cstddef>
+#include <cstdlib>
+#include <new>
+
+// Counts the C++ allocations of the extension module this header is
+// compiled into: the replaced global operator new is used by the code of
+// the module, including std::make_shared and the shared_ptr control blocks.
+static std::size_t allocation_count = 0;
+
+void* operator new(std::size_t size)
+{
+    ++allocation_count;
+    if (void* p = std::malloc(size ? size : 1))
+        return p;
+    throw std::bad_alloc();
+}
+
+void operator delete(void* p) noexcept { std::free(p); }
+void operator delete(void* p, std::size_t) noexcept { std::free(p); }
+
+inline std::size_t allocations() { return allocation_count; }
+
+class CountedPoint {
+  public:
+    double x;
+    double y;
+
+    CountedPoint() : x(0), y(0) {}
+    CountedPoint(double x, double y) : x(x), y(y) {}
+    CountedPoint(const CountedPoint& other) = default;
+
+    double getX() const { return x; }
+    CountedPoint shifted(double dx) const { return CountedPoint(x + dx, y); }
+    CountedPoint operator+(const CountedPoint& other) const
+    {
+        return CountedPoint(x + other.x, y + other.y);
+    }
+};
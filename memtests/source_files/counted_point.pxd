@@ -0,0 +1,11 @@
+cdef extern from "counted_point.hpp":
+
+    size_t allocations()
+
+    cdef cppclass CountedPoint:
+        CountedPoint()
+        CountedPoint(double x, double y)
+        CountedPoint(CountedPoint &)
+        double getX()
+        CountedPoint shifted(double dx)
+        CountedPoint operator+(CountedPoint)
@@ -0,0 +1,13 @@
+cdef extern from "counted_point.hpp":
+
+    size_t allocations()
+
+    cdef cppclass CountedPoint:
+        # wrap-freelist:
+        #   64
+        CountedPoint()
+        CountedPoint(double x, double y)
+        CountedPoint(CountedPoint &)
+        double getX()
+        CountedPoint shifted(double dx)
+        CountedPoint operator+(CountedPoint)
@@ -0,0 +1,87 @@
+"""
+Allocations per object of a small wrapped class with and without the
+wrap-freelist annotation.
+
+CountedPoint (source_files/counted_point.hpp) counts the calls of the global
+operator new in the extension module it is compiled into. The C++ object
+is always allocated together with the control block of its shared_ptr
+(make_shared). The class is wrapped once as it is and once annotated with
+wrap-freelist, which keeps freed Python objects for reuse. For objects created
+by the constructor, returned by a method and returned by operator+ the C++
+allocations per object and the time per object, which includes the Python
+object, are reported.
+
+Needs a C++ compiler, run with:
+
+    python memtests/test_freelist.py
+"""
+
+from __future__ import print_function
+
+import os
+import timeit
+
+import autowrap
+import autowrap.Utils
+
+source_files = os.path.join(os.path.dirname(os.path.abspath(__file__)), "source_files")
+
+
+def build(variant):
+    name = "counted_point%s_wrapper" % variant
+    target = os.path.join(source_files, name + ".pyx")
+    include_dirs = autowrap.parse_and_generate_code(
+        ["counted_point%s.pxd" % variant], root=source_files, target=target, debug=True
+    )
+    try:
+        return autowrap.Utils.compile_and_import(name, [target], include_dirs)
+    finally:
+        for ext in (".pyx", ".pxd", ".pyi"):
+            if os.path.exists(os.path.join(source_files, name + ext)):
+                os.remove(os.path.join(source_files, name + ext))
+
+
+def measure(module, n=100000):
+    """(name, C++ allocations per object, seconds per object) per case"""
+    p = module.CountedPoint(1.0, 2.0)
+    cases = [
+        ("constructor", lambda: module.CountedPoint(1.0, 2.0)),
+        ("returned value", lambda: p.shifted(1.0)),
+        ("operator+", lambda: p + p),
+    ]
+    results = []
+    for name, create in cases:
+        start = module.allocations()
+        for __ in range(n):
+            create()
+        allocations = float(module.allocations() - start) / n
+        seconds = min(timeit.repeat(create, number=n, repeat=5)) / n
+        results.append((name, allocations, seconds))
+    return results
+
+
+def test_freelist():
+    plain = measure(build(""), 1000)
+    freelist = measure(build("_freelist"), 1000)
+    for (name, allocations, __), (__, freelist_allocations, __) in zip(plain, freelist):
+        assert allocations == 1, name
+        assert freelist_allocations == 1, name
+
+
+def main():
+    plain = measure(build(""))
+    freelist = measure(build("_freelist"))
+    print()
+    print(
+        "%16s %16s %16s %16s %16s"
+        % ("case", "allocs/object", "freelist", "time [us]", "freelist [us]")
+    )
+    for (name, allocations, seconds), (__, f_allocations, f_seconds) in zip(plain, freelist):
+        print(
+            "%16s %16.2f %16.2f %16.3f %16.3f"
+            % (name, allocations, f_allocations, seconds * 1e6, f_seconds * 1e6)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -65,3 +65,79 @@ def test():
     assert lines[3] == "    else:", repr(lines[3])
     assert lines[4] == "        return 2*x", repr(lines[4])
     assert len(lines) == 5
+
+
+def test_write_to():
+    import io
+
+    Code = autowrap.Code.Code
+    c = Code()
+    c.add("def fun(x):")
+    inner = Code()
+    inner.add("if x:")
+    inner2 = Code()
+    inner2.add("return 1")
+    inner.add(inner2)
+    inner.add(Code())
+    inner.add("return 0")
+    c.add(inner)
+
+    fp = io.StringIO()
+    c.write_to(fp, indent=2)
+    assert fp.getvalue() == c.render(indent=2)
+    assert fp.getvalue().split("\n") == [
+        "  def fun(x):",
+        "      if x:",
+        "          return 1",
+        "      return 0",
+    ]
+
+    # deep nesting does not run into the recursion limit
+    deep = Code()
+    current = deep
+    for i in range(5000):
+        nested = Code()
+        current.add(nested)
+        current = nested
+    current.add("x")
+    assert deep.render().strip() == "x"
+
+
+def test_template_cache():
+    Code = autowrap.Code.Code
+    templates = [
+        ("""
+            |def $name(self, $args):
+            |    return $value""", dict(name="foo", args="x, y", value="x + y")),
+        ("""
+            |cdef $type * _r = new $type(
+            +    $args)""", dict(type="Bar", args="a, b")),
+        ("$$x = $a", dict(a=3)),
+        # values which need the slow path: newlines and line start values
+        # which would be joined or split by "+" or "|"
+        ("""
+            |$body
+            |pass""", dict(body="a\n    |b")),
+        ("""
+            |x = 1
+            |$cont""", dict(cont="   + 2")),
+        ("""
+            |x = 1
+            |$empty
+            |y = 2""", dict(empty="")),
+    ]
+    for template, kw in templates:
+        for _ in range(2):
+            c = Code()
+            c.add(template, kw)
+            expected = Code()
+            expected._add_template_uncached(template, kw)
+            assert c.content == expected.content
+    assert autowrap.Code.template_stats["hits"] > 0
+
+    try:
+        Code().add("$a $b", a=1)
+    except KeyError:
+        pass
+    else:
+        assert False, "missing placeholder not detected"
@@ -42,8 +42,11 @@ import autowrap.Utils
 import autowrap.Code
 import autowrap.Main
 import autowrap
+import copy
 import os
+import pickle
 import math
+import subprocess
 import sys
 
 test_files = os.path.join(os.path.dirname(__file__), "test_files")
@@ -122,6 +125,85 @@ def test_enums():
     with pytest.raises(Exception):
         foo.process(mod.Foo2.MyEnum.A)
 
+    # Test 7: Returned scoped enums are the members of the Python enum class
+    assert foo.intToEnum(1) is mod.Foo.MyEnum.B
+    with pytest.raises(ValueError):
+        foo.intToEnum(7)
+
+    # Test 8: Unscoped enums with many values are checked with a range check
+    # or, if their values have gaps, with a frozenset
+    assert foo.digitToInt(mod.Digit.NINE) == 9
+    assert foo.digitToInt(0) == 0
+    with pytest.raises(AssertionError):
+        foo.digitToInt(10)
+    assert foo.powerToInt(mod.Power.P256) == 256
+    with pytest.raises(AssertionError):
+        foo.powerToInt(3)
+    assert foo.describe(mod.Digit.THREE) == b"Digit"
+    assert foo.describe(256) == b"Power"
+    # other integers are accepted like by the comparisons of small enums
+    np = pytest.importorskip("numpy")
+    assert foo.describe(np.int64(3)) == b"Digit"
+    assert foo.describe(np.uint16(256)) == b"Power"
+    for value in (np.int64(10), None, 3.0):
+        with pytest.raises(Exception):
+            foo.describe(value)
+    with open(target) as fp:
+        pyx = fp.read()
+    assert "_enum_in_range(d, 0, 9)" in pyx
+
+    # Test 9: Names and values of unscoped enums are translated with tables
+    # built at import
+    assert mod.Digit().getMapping()[9] == "NINE"
+    assert mod.Digit().getMapping() is mod.Digit().getMapping()
+    assert mod.Digit.fromName("TWO") == mod.Digit.TWO
+    assert mod.Power.toName(64) == "P64"
+    with pytest.raises(KeyError):
+        mod.Power.toName(3)
+    with pytest.raises(TypeError):
+        mod.Digit().getMapping()[10] = "TEN"
+    assert "cdef frozenset _enum_values_Power" in pyx
+    assert "_enum_values_Digit" not in pyx
+
+
+def test_enums_cdef():
+    """
+    The enums of test_enums with scoped_enum_type="cdef", which wraps scoped
+    enums as classes derived from the extension type _ScopedEnum instead of
+    IntEnum classes.
+    """
+    target = os.path.join(test_files, "generated", "enums_cdef.pyx")
+    decls, instance_map = autowrap.parse(["enums.pxd"], root=test_files)
+    include_dirs = autowrap.generate_code(
+        decls, instance_map, target=target, debug=True, scoped_enum_type="cdef"
+    )
+    mod = autowrap.Utils.compile_and_import("enummodule_cdef", [target], include_dirs)
+
+    MyEnum = mod.Foo.MyEnum
+    assert "Testing Enum documentation." in MyEnum.__doc__
+    assert list(MyEnum) == [MyEnum.A, MyEnum.B, MyEnum.C]
+    assert MyEnum(1) is MyEnum.B
+    assert MyEnum["C"] is MyEnum.C
+    assert (MyEnum.B.name, MyEnum.B.value) == ("B", 1)
+    with pytest.raises(ValueError):
+        MyEnum(7)
+
+    # members convert, compare and hash like their values
+    assert int(MyEnum.C) == 2
+    assert MyEnum.A == 0 and MyEnum.A == mod.Foo.MyEnum2.A
+    assert {1: "b"}[MyEnum.B] == "b"
+    assert pickle.loads(pickle.dumps(MyEnum.B)) is MyEnum.B
+
+    foo = mod.Foo()
+    assert foo.enumToInt(MyEnum.C) == 3
+    assert foo.intToEnum(1) is MyEnum.B
+    with pytest.raises(ValueError):
+        foo.intToEnum(7)
+    with pytest.raises(AssertionError):
+        foo.enumToInt(mod.Foo.MyEnum2.A)
+    assert foo.process(mod.Foo.MyEnum2.C) == b"MyEnum2"
+    assert mod._scoped_enum_registry["_PyFoo_MyEnum"] is MyEnum
+
 
 def test_number_conv():
     target = os.path.join(test_files, "generated", "number_conv.pyx")
@@ -325,6 +407,93 @@ def test_gil_unlock():
     assert g.get_greetings() == b"Hello Jack, How are you?"
 
 
+@pytest.mark.parametrize("nogil_default", [False, True])
+def test_gil_defaults(nogil_default):
+    # each method returns True if it runs without the GIL
+    name = "gil_defaults_%s" % ("nogil" if nogil_default else "class")
+    target = os.path.join(test_files, "generated", "%s.pyx" % name)
+    decls, instance_map = autowrap.parse(["gil_defaults.pxd"], root=test_files)
+    include_dirs = autowrap.generate_code(
+        decls, instance_map, target=target, nogil_default=nogil_default
+    )
+    wrapped = autowrap.Utils.compile_and_import(name, [target], include_dirs)
+
+    worker = wrapped.GilWorker()
+    assert worker.withInt(3)
+    assert worker.withPoint(wrapped.GilPoint(3))
+    # the conversion of the string is part of the call
+    assert not worker.withString(b"abc")
+    assert not worker.withGil()
+    assert not worker.notDeclaredNogil()
+
+    plain = wrapped.GilPlain()
+    assert plain.annotated()
+    assert plain.declaredNogil() == nogil_default
+    assert wrapped.gilReleasedInFunction(3) == nogil_default
+
+
+def test_freelist():
+    target = os.path.join(test_files, "generated", "freelist_test.pyx")
+    include_dirs = autowrap.parse_and_generate_code(
+        ["freelist_test.pxd"], root=test_files, target=target, debug=True
+    )
+    with open(target) as fp:
+        pyx = fp.read()
+    assert "@cython.freelist(16)\ncdef class FreelistPoint:" in pyx
+    # one allocation for the object and the control block
+    assert "new _FreelistPoint" not in pyx
+    assert "make_shared[_FreelistPoint]" in pyx
+
+    wrapped = autowrap.Utils.compile_and_import("freelist_wrapper", [target], include_dirs)
+    points = [wrapped.FreelistPoint(float(i), 2.0) for i in range(100)]
+    assert [p.getX() for p in points] == list(range(100))
+    del points
+    p = wrapped.FreelistPoint(1.0, 2.0).shifted(3.0)
+    assert (p.getX(), p.getY()) == (4.0, 2.0)
+    p = p + wrapped.FreelistPoint(1.0, 1.0)
+    assert (p.getX(), p.getY()) == (5.0, 3.0)
+    c = copy.copy(p)
+    assert c is not p and c.getX() == 5.0
+    assert wrapped.FreelistPoint(p).getY() == 3.0
+    assert wrapped.FreelistPoint().origin().getX() == 0.0
+
+
+def test_freelist_invalid_size(tmpdir):
+    decls, instance_map = autowrap.parse(["freelist_test.pxd"], root=test_files)
+    decls[0].cpp_decl.annotations["wrap-freelist"] = ["many"]
+    decls[0].wrap_freelist = ["many"]
+    with pytest.raises(ValueError):
+        autowrap.generate_code(decls, instance_map, target=tmpdir.join("f.pyx").strpath)
+
+
+def test_returned_values_are_moved():
+    target = os.path.join(test_files, "generated", "move_test.pyx")
+    include_dirs = autowrap.parse_and_generate_code(
+        ["move_test.pxd"], root=test_files, target=target, debug=True
+    )
+    with open(target) as fp:
+        pyx = fp.read()
+    assert "new _Payload" not in pyx
+
+    wrapped = autowrap.Utils.compile_and_import("move_test_wrapper", [target], include_dirs)
+    p = wrapped.Payload(3)
+    copies = p.getCopies()
+    # temporaries returned by value are moved into the new wrapper
+    assert p.grown(2).size() == 5
+    assert p.checkedGrown(2).size() == 5
+    assert (p + p).size() == 6
+    assert p.getCopies() == copies
+    with pytest.raises(ValueError):
+        p.checkedGrown(-1)
+    # references are still copied, the original stays intact
+    r = p.ref()
+    assert r.size() == 3 and p.size() == 3
+    assert p.getCopies() == copies + 1
+    c = copy.copy(p)
+    assert c.size() == 3
+    assert p.getCopies() == copies + 2
+
+
 def test_automatic_string_conversion():
     target = os.path.join(test_files, "generated", "libcpp_utf8_string_test.pyx")
     include_dirs = autowrap.parse_and_generate_code(
@@ -997,14 +1166,23 @@ def test_cross_module_scoped_enum_imports(tmpdir):
             f"EnumConsumer.pyx content:\n{consumer_pyx}"
         )
 
-        # Test 2: Verify isinstance checks use _get_scoped_enum_class() helper for late binding
-        # The helper looks up enums via registry and sys.modules for cross-module support
-        assert "_get_scoped_enum_class('_PyTask_TaskStatus')" in consumer_pyx, (
-            f"Expected isinstance check with _get_scoped_enum_class('_PyTask_TaskStatus') for wrap-attach enum.\n"
+        # Test 2: Verify isinstance checks use a _ScopedEnumLookup for late binding
+        # The lookup resolves the enum once via _get_scoped_enum_class(), which
+        # searches the registry and sys.modules for cross-module support
+        assert "_ScopedEnumLookup('_PyTask_TaskStatus')" in consumer_pyx, (
+            f"Expected _ScopedEnumLookup('_PyTask_TaskStatus') for wrap-attach enum.\n"
+            f"EnumConsumer.pyx content:\n{consumer_pyx}"
+        )
+        assert "isinstance(s, _scoped_enum__PyTask_TaskStatus.get())" in consumer_pyx, (
+            f"Expected isinstance check with the lookup of _PyTask_TaskStatus.\n"
+            f"EnumConsumer.pyx content:\n{consumer_pyx}"
+        )
+        assert "_ScopedEnumLookup('Priority')" in consumer_pyx, (
+            f"Expected _ScopedEnumLookup('Priority') for non-wrap-attach enum.\n"
             f"EnumConsumer.pyx content:\n{consumer_pyx}"
         )
-        assert "_get_scoped_enum_class('Priority')" in consumer_pyx, (
-            f"Expected isinstance check with _get_scoped_enum_class('Priority') for non-wrap-attach enum.\n"
+        assert "isinstance(p, _scoped_enum_Priority.get())" in consumer_pyx, (
+            f"Expected isinstance check with the lookup of Priority.\n"
             f"EnumConsumer.pyx content:\n{consumer_pyx}"
         )
 
@@ -1145,3 +1323,306 @@ setup(
 
     finally:
         os.chdir(curdir)
+
+
+def test_cross_module_scoped_enum_cdef(tmpdir):
+    """
+    A scoped enum with scoped_enum_type="cdef" used in another module, both
+    built as sibling modules outside a package. The members are no ints, so
+    until the enum class is found, they are checked by their value and
+    __index__.
+    """
+    import shutil
+    from importlib import import_module
+
+    enum_test_files = os.path.join(test_files, "enum_cross_module")
+    for f in ["EnumProvider.hpp", "EnumConsumer.hpp", "StatusProvider.pxd", "StatusConsumer.pxd"]:
+        shutil.copy(os.path.join(enum_test_files, f), tmpdir.strpath)
+
+    curdir = os.getcwd()
+    os.chdir(tmpdir.strpath)
+    try:
+        mnames = ["status_provider_cdef", "status_consumer_cdef"]
+        pxd_files = [
+            os.path.join(tmpdir.strpath, f) for f in ["StatusProvider.pxd", "StatusConsumer.pxd"]
+        ]
+        decls, instance_map = autowrap.parse(pxd_files, tmpdir.strpath, num_processes=1)
+        masterDict = {}
+        for modname, pxd_file in zip(mnames, pxd_files):
+            masterDict[modname] = {
+                "decls": [d for d in decls if d.cpp_decl.pxd_path == pxd_file],
+                "addons": [],
+                "files": [pxd_file],
+            }
+        targets = []
+        for modname in mnames:
+            target = os.path.join(tmpdir.strpath, modname + ".pyx")
+            include_dirs = autowrap.generate_code(
+                masterDict[modname]["decls"],
+                instance_map,
+                target=target,
+                all_decl=masterDict,
+                scoped_enum_type="cdef",
+            )
+            targets.append(target)
+        autowrap.Utils.build_modules(targets, include_dirs + [tmpdir.strpath], jobs=1)
+
+        sys.path.insert(0, tmpdir.strpath)
+        try:
+            provider, consumer = [import_module(m) for m in mnames]
+        finally:
+            sys.path.remove(tmpdir.strpath)
+    finally:
+        os.chdir(curdir)
+
+    TaskStatus = provider.Task.TaskStatus
+    assert not isinstance(TaskStatus.RUNNING, int)
+
+    # the enum class is not found yet: members are accepted, but returned as
+    # their values
+    registry = provider._scoped_enum_registry
+    cls = registry.pop("_PyTask_TaskStatus")
+    tracker = consumer.StatusTracker()
+    tracker.setStatus(TaskStatus.RUNNING)
+    assert tracker.getStatus() == 1
+    with pytest.raises(AssertionError):
+        tracker.setStatus(1)
+    with pytest.raises(AssertionError):
+        tracker.setStatus(None)
+
+    # the class is found in the registry of the sibling module
+    registry["_PyTask_TaskStatus"] = cls
+    assert tracker.getStatus() is TaskStatus.RUNNING
+    tracker.setStatus(TaskStatus.COMPLETED)
+    tracker.setStatus(tracker.getStatus())
+    assert tracker.getStatus() is TaskStatus.COMPLETED
+    with pytest.raises(AssertionError):
+        tracker.setStatus(2)
+
+
+def test_write_only_changed(tmpdir):
+    """
+    Regenerating identical code must not touch the output files, so that build
+    tools do not recompile the extension. Per class digests allow to find out
+    which classes changed.
+    """
+    from autowrap.CodeGenerator import CodeGenerator
+
+    decls, instance_map = autowrap.parse(["enums.pxd"], root=test_files)
+    target = os.path.join(tmpdir.strpath, "enums_wrapper.pyx")
+
+    def generate(manual_code=None):
+        cg = CodeGenerator(decls, instance_map, pyx_target_path=target, manual_code=manual_code)
+        cg.write_only_changed = True
+        cg.create_pyx_file()
+        return cg
+
+    first = generate()
+    assert first.written_files == [target[:-4] + ".pyi", target]
+    assert set(first.class_digests) >= {"Foo", "Foo2"}
+
+    os.utime(target, (0, 0))
+    second = generate()
+    assert second.written_files == []
+    assert len(second.unchanged_files) == 2
+    assert os.stat(target).st_mtime == 0
+    assert second.class_digests == first.class_digests
+    assert set(second.profile) >= {"classes", "enums", "writing", "template processing"}
+    assert second.profile["total"] >= second.profile["classes"]
+
+    manual = {"Foo": autowrap.Code.Code().add("def extra(self):\n    return 42")}
+    third = generate(manual)
+    assert target in third.written_files
+    changed = [n for n, d in third.class_digests.items() if first.class_digests[n] != d]
+    assert changed == ["Foo"]
+
+    digest_file = os.path.join(tmpdir.strpath, "digests.json")
+    assert third.write_class_digests(digest_file)
+    assert not third.write_class_digests(digest_file)
+
+
+def test_converter_registry_cache():
+    from autowrap.ConversionProvider import setup_converter_registry, IntegerConverter
+    from autowrap.DeclResolver import ResolvedClass, ResolvedEnum
+    from autowrap.Types import CppType
+
+    decls, instance_map = autowrap.parse(["enums.pxd"], root=test_files)
+    classes = [d for d in decls if isinstance(d, ResolvedClass)]
+    enums = [d for d in decls if isinstance(d, ResolvedEnum)]
+    cr = setup_converter_registry(classes, enums, instance_map)
+
+    int_converter = cr.get(CppType("int"))
+    assert (cr.cache_hits, cr.cache_misses) == (0, 1)
+    # equal types share the cache entry
+    assert cr.get(CppType.from_string("int")) is int_converter
+    assert (cr.cache_hits, cr.cache_misses) == (1, 1)
+
+    # failed lookups are cached as well
+    assert CppType("Unknown") not in cr
+    assert CppType("Unknown") not in cr
+    assert (cr.cache_hits, cr.cache_misses) == (2, 2)
+    with pytest.raises(NameError):
+        cr.get(CppType("Unknown"))
+
+    # registering a converter invalidates the cache, the latest one wins
+    new_converter = IntegerConverter()
+    cr.register(new_converter)
+    assert cr.get(CppType("int")) is new_converter
+    assert cr.cache_misses == 3
+
+
+def test_overload_dispatch():
+    """
+    Dispatching overloads by a table of argument types must pick the same
+    overloads as checking them one after the other.
+    """
+    from autowrap.CodeGenerator import CodeGenerator
+
+    decls, instance_map = autowrap.parse(["overload_dispatch.pxd"], root=test_files)
+    modules = dict()
+    for strategy in ("chain", "table"):
+        target = os.path.join(test_files, "generated", "overload_dispatch_%s.pyx" % strategy)
+        cg = CodeGenerator(decls, instance_map, pyx_target_path=target)
+        cg.overload_dispatch = strategy
+        cg.overload_cache_size = 3
+        cg.create_pyx_file()
+        include_dirs = cg.get_include_dirs()
+        with open(target) as fp:
+            code = fp.read()
+        assert ("_OverloadDispatch_run_overloads" in code) == (strategy == "table")
+        modules[strategy] = autowrap.Utils.compile_and_import(
+            "overload_dispatch_%s" % strategy, [target], include_dirs
+        )
+
+    cases = [
+        ((1,), b"int"),
+        ((True,), b"int"),  # bool is an int, and the int overload comes first
+        ((1.5,), b"double"),
+        (([1, 2],), b"vector<int>"),
+        (([b"a"],), b"vector<string>"),
+        (([1.0],), b"vector<double>"),
+        (([],), b"vector<int>"),
+        ((3, [1, 2]), b"int, vector<int>"),
+    ]
+    for module in modules.values():
+        o = module.OverloadDispatch()
+        assert o.getValue() == 0
+        assert module.OverloadDispatch(3).getValue() == 3
+        assert module.OverloadDispatch([1, 2]).getValue() == 2
+        # twice, the second call uses the cached dispatch
+        for _ in range(2):
+            for args, expected in cases:
+                assert o.run(*args) == expected
+            for args in [(b"x",), ([1, b"x"],), (1, 2), (1, 2, 3)]:
+                with pytest.raises(Exception):
+                    o.run(*args)
+
+    # an overload which is the only one taking two arguments is still checked
+    # by the dispatcher, and not only by the asserts of the overload. Other
+    # numbers of arguments raise a TypeError, too.
+    for args in [(1, 2), (1, None), (None, [1]), (1, 2, 3)]:
+        with pytest.raises(TypeError):
+            modules["table"].OverloadDispatch().run(*args)
+    # also without the asserts
+    script = """if 1:
+        import overload_dispatch_table as m
+        for args in [(1, None), ([1, None],), (1, [None])]:
+            try:
+                m.OverloadDispatch().run(*args)
+            except TypeError:
+                pass
+            else:
+                raise SystemExit(1)
+        """
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(modules["table"].__file__))
+    assert subprocess.call([sys.executable, "-O", "-c", script], env=env) == 0
+
+    # the cache of argument types is bounded
+    table = modules["table"]._OverloadDispatch_run_overloads
+    assert len(table) == 3
+    table.clear()
+    o = modules["table"].OverloadDispatch()
+    for arg in (1, True, 1.5, [1]):
+        o.run(arg)
+    # int was evicted, bool and list need the full checks
+    assert table == {bool: -1, float: 2, list: -1}
+
+
+def test_typed_signatures():
+    """
+    With typed_signatures, Cython checks the argument types in the signature
+    and in the conversion of lists instead of the asserts.
+    """
+    target = os.path.join(test_files, "generated", "overload_dispatch_typed.pyx")
+    decls, instance_map = autowrap.parse(["overload_dispatch.pxd"], root=test_files)
+    include_dirs = autowrap.generate_code(
+        decls, instance_map, target=target, typed_signatures=True
+    )
+    with open(target) as fp:
+        code = fp.read()
+    assert "def sumValues(self, list items not None )" in code
+    assert "def scale(self, double factor , list values not None )" in code
+    assert "assert isinstance" not in code
+
+    m = autowrap.Utils.compile_and_import("overload_dispatch_typed", [target], include_dirs)
+    o = m.OverloadDispatch(1)
+    items = [m.OverloadDispatch(2), m.OverloadDispatch(3)]
+    assert o.sumValues(items) == 5
+    assert o.sumValues([]) == 0
+    assert o.scale(2, [1, 2]) == 6.0
+    assert o.run(2, [1, 2]) == b"int, vector<int>"
+
+    for call in [
+        lambda: o.sumValues(None),
+        lambda: o.sumValues(items + [None]),
+        lambda: o.sumValues(items + [1]),
+        lambda: o.scale(b"x", [1]),
+        lambda: o.scale(2.0, [1, "x"]),
+        lambda: o.run(2, None),
+    ]:
+        with pytest.raises(TypeError):
+            call()
+
+
+def test_vector_view():
+    """
+    libcpp_vector_as_view returns a sequence which owns the C++ vector and
+    creates the elements on access.
+    """
+    target = os.path.join(test_files, "generated", "vector_view_wrapper.pyx")
+    decls, instance_map = autowrap.parse(["vector_view.pxd"], root=test_files)
+    include_dirs = autowrap.generate_code(decls, instance_map, target=target)
+    m = autowrap.Utils.compile_and_import("vector_view_wrapper", [target], include_dirs)
+
+    cloud = m.ViewCloud(5)
+    points = cloud.getPoints()
+    assert len(points) == 5
+    assert [p.getX() for p in points] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert points[-1].getX() == 4.0
+    assert [p.getX() for p in points[1:3]] == [1.0, 2.0]
+    with pytest.raises(IndexError):
+        points[5]
+
+    # elements refer to the vector of the view and keep it alive
+    first = points[0]
+    first.setX(10.0)
+    del points
+    assert first.getX() == 10.0
+    assert cloud.getPointsRef()[0].getX() == 0.0
+
+    # views are passed without copying, lists are accepted as well
+    points = cloud.getPointsRef()
+    assert cloud.sumX(points) == 10.0
+    assert cloud.sumX([m.ViewPoint(1.5), m.ViewPoint(2.0)]) == 3.5
+    first = points[0]
+    cloud.shift(points, 1.0)
+    assert [p.getX() for p in points] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    # the vector is replaced, elements taken before still refer to the old one
+    assert first.getX() == 0.0
+    plain = [m.ViewPoint(1.0)]
+    cloud.shift(plain, 1.0)
+    assert plain[0].getX() == 2.0
+    cloud.setPoints(points)
+    assert cloud.sumX(cloud.getPoints()) == 15.0
+    with pytest.raises(AssertionError):
+        cloud.sumX([1.0])
@@ -837,3 +837,41 @@ cdef extern from "A.h":
     assert method.with_nogil
     (method,) = instance.methods.get("Cheap")
     assert not method.with_nogil
+
+
+def test_parse_cache(tmpdir):
+    root = os.path.join(os.path.dirname(__file__), "test_files")
+    cache_dir = tmpdir.strpath
+
+    resolved, map_ = DeclResolver.resolve_decls_from_files(
+        ["minimal.pxd"], root=root, cache_dir=cache_dir
+    )
+    assert len(os.listdir(cache_dir)) == 1
+
+    # second run must not call Cython at all
+    orig = autowrap.PXDParser.parse_pxd_file
+    autowrap.PXDParser.parse_pxd_file = None
+    try:
+        cache = autowrap.PXDParser.PXDParseCache(cache_dir)
+        decls = autowrap.PXDParser.parse_pxd_file_cached(
+            os.path.join(root, "minimal.pxd"), cache
+        )
+        assert (cache.hits, cache.misses) == (1, 0)
+        resolved2, map2_ = DeclResolver.resolve_decls_from_files(
+            ["minimal.pxd"], root=root, cache_dir=cache_dir, num_processes=2
+        )
+    finally:
+        autowrap.PXDParser.parse_pxd_file = orig
+
+    assert [d.name for d in decls] == [d.name for d in orig(os.path.join(root, "minimal.pxd"))]
+    assert sorted(r.name for r in resolved) == sorted(r.name for r in resolved2)
+    assert sorted(map_.keys()) == sorted(map2_.keys())
+    (cdcl,) = [r for r in resolved2 if r.name == "Minimal"]
+    assert "compute" in cdcl.methods
+
+    # the key depends on the content of the file
+    pxd = tmpdir.join("changed.pxd")
+    pxd.write("cdef extern from '*':\n    int foo()\n")
+    key = cache.key_for(pxd.strpath)
+    pxd.write("cdef extern from '*':\n    int bar()\n")
+    assert cache.key_for(pxd.strpath) != key
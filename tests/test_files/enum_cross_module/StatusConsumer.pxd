@@ -0,0 +1,12 @@
+# cython: language_level=3
+#
+# Uses the scoped enum of StatusProvider, see StatusProvider.pxd
+#
+from StatusProvider cimport Task_TaskStatus
+
+cdef extern from "EnumConsumer.hpp":
+
+    cdef cppclass StatusTracker:
+        StatusTracker()
+        void setStatus(Task_TaskStatus s)
+        Task_TaskStatus getStatus()
@@ -0,0 +1,24 @@
+# cython: language_level=3
+#
+# Test file for scoped enums of scoped_enum_type "cdef" used in another
+# module, which is built as a sibling module outside a package.
+#
+cdef extern from "EnumProvider.hpp":
+
+    cdef cppclass Task:
+        Task()
+        void setStatus(Task_TaskStatus s)
+        Task_TaskStatus getStatus()
+
+
+cdef extern from "EnumProvider.hpp" namespace "Task":
+
+    cpdef enum class Task_TaskStatus "Task::TaskStatus":
+        # wrap-attach:
+        #   Task
+        # wrap-as:
+        #   TaskStatus
+        PENDING
+        RUNNING
+        COMPLETED
+        FAILED
@@ -17,6 +17,19 @@
 
 #include <string>
 
+// Unscoped enum with more values than are compared one by one in the
+// generated type check
+enum Digit
+{
+  ZERO, ONE, TWO, THREE, FOUR, FIVE, SIX, SEVEN, EIGHT, NINE
+};
+
+// ... and with gaps in its values
+enum Power
+{
+  P1 = 1, P2 = 2, P4 = 4, P8 = 8, P16 = 16, P32 = 32, P64 = 64, P128 = 128, P256 = 256
+};
+
 // Class with nested scoped enums
 class Foo
 {
@@ -50,6 +63,15 @@ public:
     // Python should correctly dispatch based on the enum type passed
     std::string process(MyEnum e) { return "MyEnum"; }
     std::string process(MyEnum2 e) { return "MyEnum2"; }
+
+    // Returns a scoped enum and accepts an unscoped enum with many values
+    MyEnum intToEnum(int i) { return static_cast<MyEnum>(i); }
+    int digitToInt(Digit d) { return static_cast<int>(d); }
+    int powerToInt(Power p) { return static_cast<int>(p); }
+
+    // Overloads dispatched by the values of unscoped enums with many values
+    std::string describe(Digit d) { return "Digit"; }
+    std::string describe(Power p) { return "Power"; }
 };
 
 // Separate namespace with an enum of the same name as Foo::MyEnum
@@ -48,6 +48,11 @@ cdef extern from "enums.hpp":
         # Overloaded methods for testing enum-based overload resolution
         libcpp_string process(Foo_MyEnum e)
         libcpp_string process(Foo_MyEnum2 e)
+        Foo_MyEnum intToEnum(int i)
+        int digitToInt(Digit d)
+        int powerToInt(Power p)
+        libcpp_string describe(Digit d)
+        libcpp_string describe(Power p)
 
 cdef extern from "enums.hpp":
      cdef cppclass Foo2:
@@ -55,6 +60,18 @@ cdef extern from "enums.hpp":
          pass
 
 
+# -----------------------------------------------------------------------------
+# Unscoped enums with many values
+# -----------------------------------------------------------------------------
+cdef extern from "enums.hpp":
+
+    cpdef enum Digit:
+        ZERO, ONE, TWO, THREE, FOUR, FIVE, SIX, SEVEN, EIGHT, NINE
+
+    cpdef enum Power:
+        P1 = 1, P2 = 2, P4 = 4, P8 = 8, P16 = 16, P32 = 32, P64 = 64, P128 = 128, P256 = 256
+
+
 # -----------------------------------------------------------------------------
 # Enums in the "Foo" namespace
 # -----------------------------------------------------------------------------
@@ -0,0 +1,20 @@
+class FreelistPoint {
+  public:
+    double x;
+    double y;
+
+    FreelistPoint() : x(0), y(0) {}
+    FreelistPoint(double x, double y) : x(x), y(y) {}
+    FreelistPoint(const FreelistPoint& other) = default;
+
+    double getX() const { return x; }
+    double getY() const { return y; }
+
+    FreelistPoint shifted(double dx) const { return FreelistPoint(x + dx, y); }
+    const FreelistPoint* origin() const { static FreelistPoint o; return &o; }
+
+    FreelistPoint operator+(const FreelistPoint& other) const
+    {
+        return FreelistPoint(x + other.x, y + other.y);
+    }
+};
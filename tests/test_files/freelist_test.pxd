@@ -0,0 +1,15 @@
+# cython: language_level=3
+
+cdef extern from "freelist_test.hpp":
+
+    cdef cppclass FreelistPoint:
+        # wrap-freelist:
+        #   16
+        FreelistPoint()
+        FreelistPoint(double x, double y)
+        FreelistPoint(FreelistPoint &)
+        double getX()
+        double getY()
+        FreelistPoint shifted(double dx) nogil # wrap-with-no-gil
+        const FreelistPoint * origin()
+        FreelistPoint operator+(FreelistPoint)
@@ -0,0 +1,33 @@
+// test the class and module defaults for releasing the GIL
+
+#include <string>
+#include <Python.h>
+
+static bool gilReleased() {
+    return !PyGILState_Check();
+}
+
+class GilPoint {
+  public:
+    GilPoint(int x): x_(x) {}
+    int x_;
+};
+
+class GilWorker {
+  public:
+    GilWorker() {}
+    bool withInt(int i) { return gilReleased(); }
+    bool withPoint(const GilPoint& p) { return gilReleased(); }
+    bool withString(const std::string& s) { return gilReleased(); }
+    bool withGil() { return gilReleased(); }
+    bool notDeclaredNogil() { return gilReleased(); }
+};
+
+class GilPlain {
+  public:
+    GilPlain() {}
+    bool declaredNogil() { return gilReleased(); }
+    bool annotated() { return gilReleased(); }
+};
+
+bool gilReleasedInFunction(int i) { return gilReleased(); }
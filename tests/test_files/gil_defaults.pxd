@@ -0,0 +1,24 @@
+# cython: language_level=3
+from libcpp cimport bool
+from libcpp.string cimport string as libcpp_string
+
+cdef extern from "gil_defaults.hpp":
+
+    cdef cppclass GilPoint:
+        GilPoint(int x)
+
+    cdef cppclass GilWorker:
+        # wrap-with-no-gil
+        GilWorker()
+        bool withInt(int i) nogil
+        bool withPoint(GilPoint p) nogil
+        bool withString(libcpp_string s) nogil
+        bool withGil() nogil # wrap-with-gil
+        bool notDeclaredNogil()
+
+    cdef cppclass GilPlain:
+        GilPlain()
+        bool declaredNogil() nogil
+        bool annotated() nogil # wrap-with-no-gil
+
+    bool gilReleasedInFunction(int i) nogil
@@ -0,0 +1,29 @@
+#include <stdexcept>
+#include <vector>
+
+// counts how often its payload is copied, moves are free
+class Payload {
+  public:
+    std::vector<double> data;
+
+    Payload() {}
+    Payload(int n) : data(n, 1.0) {}
+    Payload(const Payload& other) : data(other.data) { ++copies(); }
+    Payload(Payload&& other) = default;
+    Payload& operator=(const Payload& other) { data = other.data; ++copies(); return *this; }
+    Payload& operator=(Payload&& other) = default;
+
+    static int& copies() { static int n = 0; return n; }
+    int getCopies() const { return copies(); }
+    int size() const { return data.size(); }
+
+    Payload grown(int n) const { return Payload(size() + n); }
+    Payload checkedGrown(int n) const
+    {
+        if (n < 0) throw std::invalid_argument("n must not be negative");
+        return Payload(size() + n);
+    }
+    const Payload& ref() const { return *this; }
+
+    Payload operator+(const Payload& other) const { return Payload(size() + other.size()); }
+};
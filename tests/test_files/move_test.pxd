@@ -0,0 +1,14 @@
+# cython: language_level=3
+
+cdef extern from "move_test.hpp":
+
+    cdef cppclass Payload:
+        Payload()
+        Payload(int n)
+        Payload(Payload &)
+        int getCopies()
+        int size()
+        Payload grown(int n)
+        Payload checkedGrown(int n) except +
+        const Payload & ref()
+        Payload operator+(Payload)
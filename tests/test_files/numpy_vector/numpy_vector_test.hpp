@@ -1,5 +1,7 @@
 #pragma once
+#include <stdexcept>
 #include <vector>
+#include "autowrap_tools.hpp"
 
 class NumpyVectorTest
 {
@@ -45,6 +47,14 @@ public:
         return sum;
     }
     
+    double sumFloatVector(const std::vector<float>& data) {
+        double sum = 0.0;
+        for (float val : data) {
+            sum += val;
+        }
+        return sum;
+    }
+
     std::vector<float> createFloatVector(size_t size) {
         std::vector<float> result;
         for (size_t i = 0; i < size; i++) {
@@ -75,4 +85,75 @@ public:
         }
         return sum;
     }
+
+    // rows of length 0, 1, ..., rows - 1
+    std::vector<std::vector<int>> createRaggedVector(size_t rows) {
+        std::vector<std::vector<int>> result(rows);
+        for (size_t i = 0; i < rows; i++) {
+            for (size_t j = 0; j < i; j++) {
+                result[i].push_back(static_cast<int>(j));
+            }
+        }
+        return result;
+    }
+
+    const std::vector<std::vector<double>>& getConstRef2DVector() {
+        static std::vector<std::vector<double>> data = {{1.0, 2.0}, {3.0, 4.0}};
+        return data;
+    }
+
+    // row i of the input, to check the order of the elements
+    std::vector<int> getRow(const std::vector<std::vector<int>>& data, size_t i) {
+        return data[i];
+    }
+
+    // Test zero-copy input
+    double sumView(autowrap::AutowrapArrayView<double> data) {
+        double sum = 0.0;
+        for (double val : data) {
+            sum += val;
+        }
+        return sum;
+    }
+
+    // address of the first element, to check that the data was not copied
+    size_t viewAddress(autowrap::AutowrapArrayView<int> data) {
+        return reinterpret_cast<size_t>(data.data());
+    }
+
+    double sumUnsignedView(autowrap::AutowrapArrayView<unsigned int> data) {
+        double sum = 0.0;
+        for (unsigned int val : data) {
+            sum += val;
+        }
+        return sum;
+    }
+
+    // Test methods wrapped with wrap-batch
+    double weightedValue(double value, int factor) const {
+        return value * factor;
+    }
+
+    unsigned int addOne(unsigned int value) const {
+        return value + 1;
+    }
+
+    void accumulate(double value) {
+        accumulated_ += value;
+    }
+
+    double getAccumulated() const {
+        return accumulated_;
+    }
+
+private:
+    double accumulated_ = 0.0;
 };
+
+// Test free functions with a "<name>_parallel" variant
+inline double scaledSquare(double value, int factor) {
+    if (value < 0) {
+        throw std::invalid_argument("negative value");
+    }
+    return value * value * factor;
+}
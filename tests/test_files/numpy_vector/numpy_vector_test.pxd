@@ -1,4 +1,5 @@
 from libcpp.vector cimport vector as libcpp_vector_as_np
+from AutowrapArrayView cimport AutowrapArrayView
 
 cdef extern from "numpy_vector_test.hpp":
     cdef cppclass NumpyVectorTest:
@@ -14,8 +15,26 @@ cdef extern from "numpy_vector_test.hpp":
         
         # Test different numeric types
         int sumIntVector(libcpp_vector_as_np[int] data)
+        double sumFloatVector(libcpp_vector_as_np[float] data)
         libcpp_vector_as_np[float] createFloatVector(size_t size)
         
         # Test nested vectors (2D arrays)
         libcpp_vector_as_np[libcpp_vector_as_np[double]] create2DVector(size_t rows, size_t cols)
         double sum2DVector(libcpp_vector_as_np[libcpp_vector_as_np[double]] data)
+        libcpp_vector_as_np[libcpp_vector_as_np[int]] createRaggedVector(size_t rows)
+        const libcpp_vector_as_np[libcpp_vector_as_np[double]]& getConstRef2DVector()
+        libcpp_vector_as_np[int] getRow(libcpp_vector_as_np[libcpp_vector_as_np[int]] data, size_t i)
+
+        # Test zero-copy input
+        double sumView(AutowrapArrayView[double] data)
+        size_t viewAddress(AutowrapArrayView[int] data)
+        double sumUnsignedView(AutowrapArrayView[unsigned int] data)
+
+        # Test methods with a "<name>_batch" variant
+        double weightedValue(double value, int factor) nogil # wrap-with-no-gil wrap-batch
+        unsigned int addOne(unsigned int value) # wrap-batch
+        void accumulate(double value) # wrap-batch
+        double getAccumulated()
+
+    # Test free functions with a "<name>_parallel" variant
+    double scaledSquare(double value, int factor) except + nogil # wrap-parallel
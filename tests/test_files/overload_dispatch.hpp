@@ -0,0 +1,37 @@
+// test dispatch of overloaded methods
+
+#include <string>
+#include <vector>
+
+class OverloadDispatch {
+  public:
+
+    OverloadDispatch() : value_(0) {}
+    OverloadDispatch(int value) : value_(value) {}
+    OverloadDispatch(const std::vector<int>& values) : value_(values.size()) {}
+
+    int getValue() { return value_; }
+
+    int sumValues(const std::vector<OverloadDispatch>& items) {
+        int result = 0;
+        for (size_t i = 0; i < items.size(); i++) result += items[i].value_;
+        return result;
+    }
+
+    double scale(double factor, const std::vector<int>& values) {
+        double result = 0;
+        for (size_t i = 0; i < values.size(); i++) result += factor * values[i];
+        return result;
+    }
+
+    std::string run(int) { return "int"; }
+    std::string run(bool) { return "bool"; }
+    std::string run(double) { return "double"; }
+    std::string run(const std::vector<int>&) { return "vector<int>"; }
+    std::string run(const std::vector<std::string>&) { return "vector<string>"; }
+    std::string run(const std::vector<double>&) { return "vector<double>"; }
+    std::string run(int, const std::vector<int>&) { return "int, vector<int>"; }
+
+  private:
+    int value_;
+};
@@ -0,0 +1,23 @@
+# cython: language_level=3
+from libcpp.string cimport string as libcpp_string
+from libcpp.vector cimport vector as libcpp_vector
+from libcpp cimport bool
+
+cdef extern from "overload_dispatch.hpp":
+
+    cdef cppclass OverloadDispatch:
+        OverloadDispatch()
+        OverloadDispatch(int value)
+        OverloadDispatch(libcpp_vector[int] values)
+
+        int getValue()
+        int sumValues(libcpp_vector[OverloadDispatch] items)
+        double scale(double factor, libcpp_vector[int] values)
+
+        libcpp_string run(int)
+        libcpp_string run(bool)
+        libcpp_string run(double)
+        libcpp_string run(libcpp_vector[int])
+        libcpp_string run(libcpp_vector[libcpp_string])
+        libcpp_string run(libcpp_vector[double])
+        libcpp_string run(int, libcpp_vector[int])
@@ -0,0 +1,43 @@
+#include <vector>
+
+class ViewPoint {
+  public:
+    double x;
+
+    ViewPoint() : x(0.0) {}
+    ViewPoint(double x) : x(x) {}
+    ViewPoint(const ViewPoint& other) : x(other.x) {}
+
+    double getX() const { return x; }
+    void setX(double v) { x = v; }
+};
+
+class ViewCloud {
+  public:
+    std::vector<ViewPoint> points;
+
+    ViewCloud() {}
+    ViewCloud(int n) {
+        for (int i = 0; i < n; i++) {
+            points.push_back(ViewPoint(i));
+        }
+    }
+
+    std::vector<ViewPoint> getPoints() const { return points; }
+    const std::vector<ViewPoint>& getPointsRef() const { return points; }
+    void setPoints(const std::vector<ViewPoint>& p) { points = p; }
+
+    void shift(std::vector<ViewPoint>& p, double dx) {
+        for (auto& point : p) {
+            point.x += dx;
+        }
+    }
+
+    double sumX(const std::vector<ViewPoint>& p) const {
+        double sum = 0.0;
+        for (const auto& point : p) {
+            sum += point.x;
+        }
+        return sum;
+    }
+};
@@ -0,0 +1,20 @@
+# cython: language_level=3
+from libcpp.vector cimport vector as libcpp_vector_as_view
+
+cdef extern from "vector_view.hpp":
+
+    cdef cppclass ViewPoint:
+        ViewPoint()
+        ViewPoint(double x)
+        ViewPoint(ViewPoint &)
+        double getX()
+        void setX(double v)
+
+    cdef cppclass ViewCloud:
+        ViewCloud()
+        ViewCloud(int n)
+        libcpp_vector_as_view[ViewPoint] getPoints()
+        const libcpp_vector_as_view[ViewPoint] & getPointsRef()
+        void setPoints(libcpp_vector_as_view[ViewPoint] p)
+        void shift(libcpp_vector_as_view[ViewPoint] & p, double dx)
+        double sumX(libcpp_vector_as_view[ViewPoint] p)
@@ -291,3 +291,80 @@ def test_full_lib(tmpdir):
     assert Dsecond.i_ == 11
     Dsecond.runB(Bsecond)
     assert Dsecond.i_ == 8
+
+
+def test_sharded_lib(tmpdir):
+    """
+    The same library as in test_full_lib, but split automatically into shards
+    by autowrap.generate_sharded_code, built in parallel and imported through
+    the generated package __init__.py.
+    """
+    import sys
+    from importlib import import_module
+
+    curdir = os.getcwd()
+    workdir = tmpdir.strpath + "/shardpkg"
+    os.makedirs(workdir)
+    os.chdir(workdir)
+
+    try:
+        pxd_files = ["A.pxd", "B.pxd", "C.pxd", "D.pxd"]
+        full_pxd_files = [os.path.join(test_files, f) for f in pxd_files]
+        decls, instance_map = autowrap.parse(full_pxd_files, ".")
+
+        shards = autowrap.CodeGenerator.split_into_shards(decls, 3, "_shard")
+        assert sorted(shards) == ["_shard_0", "_shard_1", "_shard_2"]
+        assert all(shards[m]["decls"] for m in shards)
+        # wrap-attach keeps nested classes and enums with their parent class
+        for m, shard in shards.items():
+            names = set(d.name for d in shard["decls"])
+            if "B_KlassKlass" in names:
+                assert "Bklass" in names
+
+        targets, include_dirs = autowrap.generate_sharded_code(
+            decls, instance_map, workdir, "_shard", 3
+        )
+        assert [os.path.basename(t) for t in targets] == [
+            "_shard_0.pyx",
+            "_shard_1.pyx",
+            "_shard_2.pyx",
+        ]
+        with open("__init__.py") as fp:
+            init_code = fp.read()
+        assert "import Bklass" in init_code
+        assert "KlassKlass" not in init_code
+
+        # regenerating identical code leaves all files untouched
+        generated = targets + [os.path.join(workdir, "__init__.py")]
+        for path in generated:
+            os.utime(path, (0, 0))
+        autowrap.generate_sharded_code(
+            decls, instance_map, workdir, "_shard", 3, write_only_changed=True
+        )
+        assert all(os.stat(path).st_mtime == 0 for path in generated)
+
+        # cythonize and compile all shards in parallel
+        timings = autowrap.Utils.build_modules(targets, include_dirs, jobs=3)
+        assert sorted(timings) == sorted(shards)
+        assert all(c is not None and t is not None for c, t in timings.values())
+        # nothing changed, so nothing is rebuilt
+        timings = autowrap.Main.run_cython_parallel(include_dirs, None, targets, jobs=3)
+        assert all(t == (None, None) for t in timings.values())
+
+        sys.path.insert(0, tmpdir.strpath)
+        try:
+            pkg = import_module("shardpkg")
+        finally:
+            sys.path.remove(tmpdir.strpath)
+    finally:
+        os.chdir(curdir)
+
+    Aobj = pkg.Aalias(5)
+    assert Aobj.i_ == 5
+    Bsecond = pkg.B_second(8)
+    Bsecond.processA(Aobj)
+    assert Bsecond.i_ == 15
+    Dsecond = pkg.D_second(11)
+    Dsecond.runB(Bsecond)
+    assert Dsecond.i_ == 15
+    assert pkg.Bklass.KlassKlass is not None
@@ -204,16 +204,102 @@ class TestVectorInputs:
         assert result == 0.0
     
     def test_sum_requires_numpy_array(self, numpy_vector_module):
-        """Test that passing a Python list raises TypeError (numpy array required)."""
+        """Test that passing a Python list fails (numpy array or buffer required)."""
         import numpy as np
         m = numpy_vector_module
         t = m.NumpyVectorTest()
         
         data = [1.0, 2.0, 3.0]
-        # Should raise TypeError because only numpy arrays are accepted
-        with pytest.raises(TypeError):
+        # Should fail because only numpy arrays and other buffers are accepted
+        with pytest.raises(AssertionError):
             t.sumVector(data)
 
+    def test_sum_buffers(self, numpy_vector_module):
+        """Other objects supporting the buffer protocol are accepted."""
+        import array
+        m = numpy_vector_module
+        t = m.NumpyVectorTest()
+
+        assert t.sumVector(array.array("d", [1.0, 2.5])) == 3.5
+        assert t.sumVector(memoryview(array.array("f", [1.0, 2.0]))) == 3.0
+        assert t.sumIntVector(array.array("h", [1, 2, 3])) == 6
+
+    def test_no_values_are_lost(self, numpy_vector_module):
+        """Arrays are only converted if the values fit into the vector."""
+        import numpy as np
+        m = numpy_vector_module
+        t = m.NumpyVectorTest()
+
+        # integers which fit are converted, also to smaller integer types
+        assert t.sumIntVector(np.array([2**31 - 1, -(2**31)], dtype=np.int64)) == -1
+        with pytest.raises(TypeError):
+            t.sumIntVector(np.array([1.7, -2.5]))
+        with pytest.raises(ValueError):
+            t.sumIntVector(np.array([2**40]))
+        # numbers are converted to smaller float types
+        assert t.sumFloatVector(np.array([0.5, 2**40])) == 0.5 + 2**40
+        with pytest.raises(TypeError):
+            t.getRow(np.ones((2, 2)), 0)
+        with pytest.raises(ValueError):
+            t.getRow(np.full((2, 2), 2**40), 0)
+
+    def test_sum_strided_and_other_dtypes(self, numpy_vector_module):
+        """Strided arrays and arrays of other dtypes are converted, not misread."""
+        import numpy as np
+        m = numpy_vector_module
+        t = m.NumpyVectorTest()
+
+        data = np.arange(10, dtype=np.float64)
+        assert t.sumVector(data[::2]) == 20.0
+        assert t.sumVector(data[::-1]) == 45.0
+        assert t.sumVector(data.astype(np.float32)) == 45.0
+        assert t.sumVector(np.arange(10)) == 45.0
+        assert t.sumIntVector(np.arange(10, dtype=np.int64)[1::3]) == 12
+        assert t.sum2DVector(np.ones((4, 6), dtype=np.float32)[:, ::2]) == 12.0
+        with pytest.raises(ValueError):
+            t.sumVector(np.ones((2, 2)))
+
+
+class TestArrayView:
+    """Tests for AutowrapArrayView inputs, which pass the data without copying."""
+
+    def test_view_input(self, numpy_vector_module):
+        import numpy as np
+        m = numpy_vector_module
+        t = m.NumpyVectorTest()
+
+        data = np.arange(10, dtype=np.float64)
+        assert t.sumView(data) == 45.0
+        assert t.sumView(np.empty(0)) == 0.0
+        readonly = data.copy()
+        readonly.setflags(write=False)
+        assert t.sumView(readonly) == 45.0
+
+        ints = np.arange(5, dtype=np.int32)
+        assert t.viewAddress(ints) == ints.ctypes.data
+        assert t.viewAddress(ints[2:]) == ints.ctypes.data + 2 * ints.itemsize
+
+        uints = np.array([3, 4000000000, 7], dtype=np.uint32)
+        assert t.sumUnsignedView(uints) == 4000000010.0
+
+    def test_view_input_is_strict(self, numpy_vector_module):
+        import numpy as np
+        m = numpy_vector_module
+        t = m.NumpyVectorTest()
+
+        with pytest.raises(ValueError):
+            t.sumView(np.arange(10, dtype=np.float64)[::2])
+        with pytest.raises(ValueError):
+            t.sumView(np.arange(10, dtype=np.float32))
+        with pytest.raises(ValueError):
+            t.sumView(np.zeros((2, 2)))
+        with pytest.raises(ValueError):
+            t.sumUnsignedView(np.array([-1, 2], dtype=np.int32))
+        with pytest.raises(ValueError):
+            t.viewAddress(np.arange(5, dtype=np.uint32))
+        with pytest.raises(AssertionError):
+            t.sumView([1.0, 2.0])
+
 
 class TestDifferentNumericTypes:
     """Tests for different numeric types (int, float, double)."""
@@ -269,6 +355,33 @@ class TestNestedVectors:
         result = t.sum2DVector(data)
         assert result == 21.0
 
+    def test_ragged_and_ref_2d_vector(self, numpy_vector_module):
+        """Rows of different lengths give a list of 1D arrays."""
+        import numpy as np
+        m = numpy_vector_module
+        t = m.NumpyVectorTest()
+
+        result = t.createRaggedVector(4)
+        assert isinstance(result, list)
+        assert [row.tolist() for row in result] == [[], [0], [0, 1], [0, 1, 2]]
+        assert all(row.dtype == np.int32 for row in result)
+        assert t.createRaggedVector(0).shape == (0, 0)
+
+        result = t.getConstRef2DVector()
+        assert result.tolist() == [[1.0, 2.0], [3.0, 4.0]]
+
+    def test_2d_vector_input_strided(self, numpy_vector_module):
+        """Non-contiguous 2D inputs are copied element by element."""
+        import numpy as np
+        m = numpy_vector_module
+        t = m.NumpyVectorTest()
+
+        data = np.arange(24, dtype=np.int32).reshape(4, 6)
+        assert t.getRow(data, 1).tolist() == [6, 7, 8, 9, 10, 11]
+        assert t.getRow(data[:, ::2], 2).tolist() == [12, 14, 16]
+        assert t.getRow(data.T, 0).tolist() == [0, 6, 12, 18]
+        assert t.getRow(np.empty((2, 0), dtype=np.int32), 1).tolist() == []
+
 
 class TestPerformance:
     """Tests for performance and large arrays."""
@@ -284,3 +397,108 @@ class TestPerformance:
         result = t.sumVector(data)
         expected = np.sum(data)
         assert np.isclose(result, expected)
+
+
+class TestBatchMethods:
+    """Tests for the "<name>_batch" variants of methods annotated with wrap-batch."""
+
+    def test_batch_results(self, numpy_vector_module):
+        """Results are returned as numpy array, arguments of length 1 are repeated."""
+        import numpy as np
+        m = numpy_vector_module
+        t = m.NumpyVectorTest()
+
+        values = np.arange(5, dtype=np.float64)
+        result = t.weightedValue_batch(values, np.array([1, 2, 3, 4, 5], dtype=np.int32))
+        assert isinstance(result, np.ndarray)
+        assert result.dtype == np.float64
+        assert result.tolist() == [0.0, 2.0, 6.0, 12.0, 20.0]
+        # a scalar, a list and a strided array are accepted as well
+        assert t.weightedValue_batch(values[::2], 3).tolist() == [0.0, 6.0, 12.0]
+        assert t.weightedValue_batch(2.0, [1, 2]).tolist() == [2.0, 4.0]
+        assert t.weightedValue_batch(np.empty(0), 2).tolist() == []
+
+        result = t.addOne_batch(np.array([0, 41], dtype=np.uint32))
+        assert result.dtype == np.uint32
+        assert result.tolist() == [1, 42]
+
+    def test_batch_void_and_errors(self, numpy_vector_module):
+        """void methods return None, mismatching lengths raise ValueError."""
+        import numpy as np
+        m = numpy_vector_module
+        t = m.NumpyVectorTest()
+
+        assert t.accumulate_batch(np.array([1.0, 2.0, 3.5])) is None
+        assert t.getAccumulated() == 6.5
+
+        with pytest.raises(ValueError):
+            t.weightedValue_batch(np.zeros(3), np.zeros(2, dtype=np.int32))
+        with pytest.raises(ValueError):
+            t.weightedValue_batch(np.zeros((2, 2)), 1)
+        assert not hasattr(t, "getAccumulated_batch")
+
+    def test_batch_arguments_are_not_truncated(self, numpy_vector_module):
+        """Arguments are only converted if no values are lost."""
+        import numpy as np
+        m = numpy_vector_module
+        t = m.NumpyVectorTest()
+
+        # values which fit are converted, also to smaller integer types
+        assert t.weightedValue_batch(1.0, np.array([2, 3], dtype=np.int64)).tolist() == [2.0, 3.0]
+        assert t.addOne_batch(np.array([2**32 - 2], dtype=np.int64)).tolist() == [2**32 - 1]
+        with pytest.raises(TypeError):
+            t.weightedValue_batch(1.0, np.array([1.7, -2.5]))
+        with pytest.raises(ValueError):
+            t.weightedValue_batch(1.0, 2**40)
+        with pytest.raises(ValueError):
+            t.addOne_batch([1, -1])
+        with pytest.raises(TypeError):
+            t.addOne_batch(1.5)
+
+
+class TestParallelFunctions:
+    """Tests for the "<name>_parallel" variants of functions annotated with wrap-parallel."""
+
+    def test_parallel_results(self, numpy_vector_module):
+        """Results are in the order of the arguments for any number of threads."""
+        import numpy as np
+        m = numpy_vector_module
+
+        values = np.arange(10000, dtype=np.float64)
+        expected = [v * v * 3 for v in values.tolist()]
+        for n_threads in (0, 1, 4):
+            result = m.scaledSquare_parallel(values, 3, n_threads=n_threads)
+            assert isinstance(result, np.ndarray)
+            assert result.dtype == np.float64
+            assert result.tolist() == expected
+        assert m.scaledSquare_parallel([1.0, 2.0], [1, 2]).tolist() == [1.0, 8.0]
+        assert m.scaledSquare_parallel(np.empty(0), 2).tolist() == []
+
+    @pytest.mark.skipif(not os.path.isdir("/proc/self/task"), reason="needs /proc")
+    def test_parallel_threads_are_limited(self, numpy_vector_module):
+        """More threads than cores are not started, the pool keeps its threads."""
+        import numpy as np
+        m = numpy_vector_module
+
+        values = np.arange(10000, dtype=np.float64)
+        before = len(os.listdir("/proc/self/task"))
+        result = m.scaledSquare_parallel(values, 3, n_threads=20000)
+        assert result.tolist() == [v * v * 3 for v in values.tolist()]
+        assert len(os.listdir("/proc/self/task")) - before < os.cpu_count()
+
+    def test_parallel_errors(self, numpy_vector_module):
+        """C++ exceptions of the calls and mismatching lengths raise."""
+        import numpy as np
+        m = numpy_vector_module
+
+        values = np.arange(1000, dtype=np.float64)
+        values[700] = -1.0
+        with pytest.raises(ValueError, match="negative value"):
+            m.scaledSquare_parallel(values, 1, n_threads=4)
+        with pytest.raises(ValueError):
+            m.scaledSquare_parallel(np.zeros(3), np.zeros(2, dtype=np.int32))
+        # the arguments are converted like those of the _batch methods
+        with pytest.raises(TypeError):
+            m.scaledSquare_parallel(np.zeros(3), np.array([1.5]))
+        with pytest.raises(ValueError):
+            m.scaledSquare_parallel(np.zeros(3), 2**40)
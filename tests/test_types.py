@@ -206,3 +206,113 @@ def test_inv_transform():
     ABXXp.template_args[0].is_ptr = True
 
     check(ABXXp, map2, "A[Z *,X]")
+
+
+def test_frozen():
+    import copy
+    import pickle
+
+    from autowrap.Types import FrozenCppType
+
+    t = CppType.from_string("A[B[X],unsigned int] *")
+    f = t.frozen()
+    assert isinstance(f, FrozenCppType)
+    # interned: equal structure gives the same object, also for sub trees
+    assert CppType.from_string("A[B[X],unsigned int] *").frozen() is f
+    assert CppType.from_string("B[X]").frozen() is f.template_args[0]
+    assert CppType.from_string("A[B[X],unsigned int]").frozen() is not f
+
+    # compares and hashes like CppType
+    assert str(f) == str(t) == "A[B[X],unsigned int] *"
+    assert f == t and t == f and f == "A[B[X],unsigned int] *"
+    assert hash(f) == hash(t)
+    assert dict([(t, 1)])[f] == 1
+    assert f.all_occuring_base_types() == t.all_occuring_base_types()
+
+    try:
+        f.is_ptr = False
+    except AttributeError:
+        pass
+    else:
+        assert False, "FrozenCppType must be immutable"
+
+    assert copy.deepcopy(f) is f
+    assert pickle.loads(pickle.dumps(f)) is f
+
+    thawed = f.copy()
+    assert isinstance(thawed, CppType)
+    assert thawed == t
+    thawed.is_ptr = False
+    assert f.is_ptr
+
+    expected = CppType.from_string("A[B[Y],unsigned int] *").frozen()
+    assert f.transformed(dict(X=CppType("Y"))) is expected
+    assert str(f.inv_transformed(dict(Z=CppType.from_string("B[X]")))) == "A[Z,unsigned int] *"
+
+
+def test_transform_shares_structure():
+    t = CppType.from_string("A[B[X],C[Y]]")
+    orig = str(t)
+    B_X, C_Y = t.template_args
+
+    # nothing to replace: the type itself is returned
+    assert t.transformed(dict(Z=CppType("W"))) is t
+
+    # unchanged sub trees are shared, the input is not modified
+    res = t.transformed(dict(Y=CppType("V")))
+    assert str(res) == "A[B[X],C[V]]"
+    assert res.template_args[0] is B_X
+    assert res.template_args[1] is not C_Y
+    assert str(t) == orig
+
+    # the same holds for inv_transformed
+    res = t.inv_transformed(dict(Z=CppType.from_string("C[Y]")))
+    assert str(res) == "A[B[X],Z]"
+    assert res.template_args[0] is B_X
+    assert str(t) == orig
+
+    # results are memoized per typemap
+    memo = dict()
+    map_ = dict(X=CppType("U"))
+    first = t.transformed(map_, memo)
+    assert str(first) == "A[B[U],C[Y]]"
+    assert CppType.from_string("A[B[X],C[Y]]").transformed(map_, memo) is first
+    assert len(memo) == 1
+
+    # types which only differ in flags not shown in their string form get
+    # their own results
+    enum = CppType("E", enum_items=[("A", 0)])
+    assert enum == CppType("E")
+    assert CppType("E").transformed(map_, memo) is not enum
+    assert enum.transformed(map_, memo) is enum
+    assert enum.frozen() is not CppType("E").frozen()
+    assert not CppType("vector", [CppType("E")]).transformed(map_, memo).template_args[0].is_enum
+    assert CppType("vector", [enum]).transformed(map_, memo).template_args[0].is_enum
+    assert len(memo) == 5
+
+
+def test_cached_string_form():
+    import copy
+
+    t = CppType.from_string("A[B[X],int] *")
+    assert str(t) == "A[B[X],int] *"
+    assert str(t) is str(t)
+
+    # changes of the type itself and of its template arguments are seen
+    t.is_ptr = False
+    assert str(t) == "A[B[X],int]"
+    t.template_args[0].template_args[0].base_type = "Y"
+    assert str(t) == "A[B[Y],int]"
+    t.template_args = (CppType("Z"),)
+    assert str(t) == "A[Z]"
+    assert hash(t) == hash("A[Z]")
+
+    # copies do not share the changes
+    c = copy.copy(t)
+    c.is_ref = True
+    assert str(c) == "A[Z] &"
+    assert str(t) == "A[Z]"
+    d = t.copy()
+    d.template_args[0].is_const = True
+    assert str(d) == "A[const Z]"
+    assert str(t) == "A[Z]"
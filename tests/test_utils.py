@@ -81,3 +81,87 @@ def test_nested_mapping_flattening():
     assert str(mapping["B"]) == "Z[X,Y]"
     assert str(mapping["C"]) == "Z"
     assert str(mapping["D"]) == "Y"
+
+
+def test_flattening_long_chains():
+    from autowrap.Types import CppType
+
+    # T0 -> T1 -> ... -> T4999 -> int, and P_i -> pair[T_i, T_(i+1)]
+    n = 5000
+    mapping = dict(("T%d" % i, CppType("T%d" % (i + 1))) for i in range(n - 1))
+    mapping["T%d" % (n - 1)] = CppType("int")
+    for i in range(0, n - 1, 100):
+        mapping["P%d" % i] = CppType("pair", [CppType("T%d" % i), CppType("T%d" % (i + 1))])
+
+    autowrap.Utils.flatten(mapping)
+    assert all(str(t) in ("int", "pair[int,int]") for t in mapping.values())
+    # result is a fixed point
+    assert all(t.transformed(mapping) == t for t in mapping.values())
+
+    mapping = dict(A=CppType("B"), B=CppType("C", [CppType("A")]))
+    try:
+        autowrap.Utils.flatten(mapping)
+    except Exception as e:
+        assert "cycle" in str(e)
+    else:
+        assert False, "cycle not detected"
+
+
+def test_build_modules_tracks_cimported_pxds(tmpdir):
+    import os
+    import shutil
+
+    import autowrap
+
+    test_files = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_files")
+    for name in ("enums.pxd", "enums.hpp"):
+        shutil.copy(os.path.join(test_files, name), tmpdir.strpath)
+    target = tmpdir.join("enums_wrapper.pyx").strpath
+    include_dirs = autowrap.parse_and_generate_code(
+        ["enums.pxd"], root=tmpdir.strpath, target=target, debug=False
+    )
+
+    def cythonized():
+        timings = autowrap.Utils.build_modules(
+            [target], include_dirs, jobs=1, compile_extensions=False
+        )
+        return timings["enums_wrapper"][0] is not None
+
+    assert cythonized()
+    assert not cythonized()
+    # the wrapper cimports enums.pxd, which is not passed to build_modules
+    cpp_mtime = os.path.getmtime(target[:-4] + ".cpp")
+    os.utime(tmpdir.join("enums.pxd").strpath, (cpp_mtime + 10, cpp_mtime + 10))
+    assert cythonized()
+
+
+def test_output_file(tmpdir):
+    import os
+
+    path = tmpdir.join("out.txt").strpath
+    written, unchanged = [], []
+    with autowrap.Utils.output_file(path, True, written, unchanged) as fp:
+        fp.write("content\n")
+    assert written == [path] and unchanged == []
+
+    # identical content keeps the file and its mtime
+    os.utime(path, (0, 0))
+    with autowrap.Utils.output_file(path, True, written, unchanged) as fp:
+        fp.write("content\n")
+    assert os.stat(path).st_mtime == 0
+    assert unchanged == [path]
+
+    # without write_only_changed the file is always written
+    with autowrap.Utils.output_file(path) as fp:
+        fp.write("content\n")
+    assert os.stat(path).st_mtime != 0
+
+    # the old content survives errors while writing
+    try:
+        with autowrap.Utils.output_file(path, True) as fp:
+            fp.write("new content\n")
+            raise ValueError()
+    except ValueError:
+        pass
+    assert open(path).read() == "content\n"
+    assert os.listdir(tmpdir.strpath) == ["out.txt"]